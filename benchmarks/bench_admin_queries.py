@@ -0,0 +1,122 @@
+"""
+Benchmark: Django admin list pages over a large claims table, with and
+without the hot-query indexes.
+
+Drives the real admin views with the test client as a superuser, then
+drops the indexes added for these pages and repeats.
+
+Usage:
+    python benchmarks/bench_admin_queries.py [--claims 1000000] [--clauses 100000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from claims.estimates import DAMAGE_METADATA  # noqa: E402
+from claims.models import DamageClaim  # noqa: E402
+from core.models import InsurancePolicy, PolicyClause  # noqa: E402
+
+PAGES = {
+    'claims (unfiltered)': '/admin/claims/damageclaim/',
+    'claims status=eligible': '/admin/claims/damageclaim/?status__exact=eligible',
+    'claims vehicle_type=bus': '/admin/claims/damageclaim/?vehicle_type__exact=bus',
+    'claims damage type': '/admin/claims/damageclaim/?detected_damage_type=Door+Damage',
+    'claims search plate': '/admin/claims/damageclaim/?q=BA+12+PA',
+    'claims search email': '/admin/claims/damageclaim/?q=user4242',
+    'clauses is_covered=no': '/admin/core/policyclause/?is_covered__exact=0',
+}
+
+INDEXES = [
+    'claim_status_idx', 'claim_vehicle_type_idx', 'claim_damage_type_idx', 'claim_vehicle_number_idx',
+    'claim_email_idx', 'claim_full_name_idx', 'claim_policy_number_idx', 'clause_excluded_idx',
+]
+
+
+def seed(claims, clauses, rng):
+    statuses = ['pending'] * 90 + ['eligible'] * 4 + ['not_eligible'] * 4 + ['needs_info'] * 2
+    vehicles = ['car'] * 60 + ['motorcycle'] * 35 + ['truck'] * 4 + ['bus']
+    damage_names = [meta['name'] for meta in DAMAGE_METADATA.values()]
+    now = timezone.now().isoformat()
+    sql = (
+        f'INSERT INTO {DamageClaim._meta.db_table} (full_name, email, phone, vehicle_type, vehicle_number, '
+        'insurance_policy_number, damage_description, damage_image, image_hash, detected_damage_type, '
+        'damage_severity, analysis_status, ai_analysis, matched_clauses, status, eligibility_reason, '
+        "created_at, updated_at) VALUES (%s, %s, '98', %s, %s, %s, '', '', '', %s, 'minor', '', '{}', '[]', "
+        '%s, %s, %s, %s)'
+    )
+    rows = (
+        (f'Customer {i}', f'user{i}@example.com', rng.choice(vehicles),
+         f'BA {rng.randint(1, 99)} PA {rng.randint(1000, 9999)}', f'POL-{i:08d}',
+         rng.choice(damage_names), rng.choice(statuses), '', now, now)
+        for i in range(claims)
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+    policy = InsurancePolicy.objects.create(name='Bench', policy_type='vehicle', provider='Bench', description='')
+    PolicyClause.objects.bulk_create([
+        PolicyClause(policy=policy, clause_number=str(i), title=f'Clause {i}', description='',
+                     is_covered=rng.random() < 0.9)
+        for i in range(clauses)
+    ], batch_size=5000)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def time_pages(client, rounds):
+    results = {}
+    for label, url in PAGES.items():
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            response = client.get(url)
+            times.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, (url, response.status_code)
+        results[label] = statistics.median(times)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--claims', type=int, default=1_000_000)
+    parser.add_argument('--clauses', type=int, default=100_000)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed(args.claims, args.clauses, random.Random(0))
+    print(f'seeded {args.claims} claims, {args.clauses} clauses in {time.perf_counter() - start:.1f}s')
+
+    client = Client()
+    client.force_login(User.objects.create_superuser('bench', 'bench@example.com', 'bench'))
+
+    indexed = time_pages(client, args.rounds)
+    with connection.cursor() as cursor:
+        for name in INDEXES:
+            cursor.execute(f'DROP INDEX {name}')
+        cursor.execute('ANALYZE')
+    unindexed = time_pages(client, args.rounds)
+
+    print(f'{"admin page":28s} {"no indexes":>12s} {"indexed":>10s}')
+    for label in PAGES:
+        print(f'{label:28s} {unindexed[label]:10.1f}ms {indexed[label]:8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
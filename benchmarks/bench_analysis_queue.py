@@ -0,0 +1,94 @@
+"""
+Benchmark: inline vs. queued damage analysis with a slow model.
+
+Detection is replaced by a stand-in that sleeps ``--model-ms`` (a real
+model holds the request for seconds). Reports how long the upload request
+is held open and end-to-end throughput for different worker counts.
+
+Usage:
+    python benchmarks/bench_analysis_queue.py [--uploads 40] [--model-ms 300] [--workers 1 2 4]
+"""
+import argparse
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from claims import jobs, views  # noqa: E402
+from claims.models import DamageClaim  # noqa: E402
+
+
+def photo_bytes(rng):
+    image = Image.effect_noise((1600, 1200), rng.randint(20, 80)).convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def upload(client, url, data):
+    start = time.perf_counter()
+    response = client.post(url, {'image': SimpleUploadedFile('damage.jpg', data, content_type='image/jpeg')})
+    return response, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--uploads', type=int, default=40)
+    parser.add_argument('--model-ms', type=float, default=300)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+    rng = random.Random(0)
+    photos = [photo_bytes(rng) for _ in range(args.uploads)]
+
+    real_detect = views.detect_damage
+
+    def slow_detect(ingested):
+        time.sleep(args.model_ms / 1000)
+        return real_detect(ingested)
+
+    views.detect_damage = slow_detect
+    views.ANALYSIS_CACHE.maxsize = 0  # every photo runs the model
+    client = Client()
+
+    with override_settings(MEDIA_ROOT=_tmp.name):
+        start = time.perf_counter()
+        held = [upload(client, '/api/claims/analyze/', data)[1] for data in photos]
+        elapsed = time.perf_counter() - start
+        print(f'inline:           request held p50 {statistics.median(held):7.1f} ms, '
+              f'{args.uploads / elapsed:5.1f} photos/s')
+
+        for workers in args.workers:
+            jobs.ANALYSIS_QUEUE.stop()
+            jobs.ANALYSIS_QUEUE = views.ANALYSIS_QUEUE = jobs.AnalysisQueue(
+                workers=workers, maxsize=args.uploads
+            )
+            start = time.perf_counter()
+            held = []
+            for data in photos:
+                response, ms = upload(client, '/api/claims/analyze/queue/', data)
+                assert response.status_code == 202, response.content
+                held.append(ms)
+            while DamageClaim.objects.filter(analysis_status__in=['queued', 'running']).exists():
+                time.sleep(0.02)
+            elapsed = time.perf_counter() - start
+            print(f'queued, {workers} worker(s): request held p50 {statistics.median(held):7.1f} ms, '
+                  f'{args.uploads / elapsed:5.1f} photos/s')
+        jobs.ANALYSIS_QUEUE.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""
+Benchmark suite: every public API endpoint, in-process and on a live server.
+
+Seeds a synthetic dataset (policies, clauses, claims, chat sessions), then
+runs each scenario in SCENARIOS twice: sequentially through Django's test
+client, counting queries per request, and under concurrent load against a
+real server (gunicorn or uvicorn, see benchmarks/requirements.txt) with
+the loadgen client. Prints throughput and p50/p95/p99 latency per
+scenario as JSON.
+
+Pass ``--output run.json`` to keep a run and ``--baseline run.json`` to
+compare against one: the script exits non-zero if a scenario's p95 grew by
+more than ``--tolerance`` or it runs more queries than before.
+
+Repeated photos hit the perceptual-hash analysis cache, so
+``analyze_damage`` times detection only for the first ``--photos`` uploads.
+
+Usage:
+    python benchmarks/bench_api_suite.py [--policies 200] [--claims 10000] [--sessions 200]
+        [--requests 200] [--clients 20] [--server wsgi|asgi|none] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from common import ROOT, setup_django  # noqa: E402
+from loadgen import Request, multipart, percentile, run_load, wait_for_port  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+DATABASE = os.path.join(_tmp.name, 'bench.sqlite3')
+setup_django(database=DATABASE)
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from bench_concurrency import HOST, SERVERS  # noqa: E402
+from chat.persistence import save_turns  # noqa: E402
+from claims.estimates import DAMAGE_METADATA  # noqa: E402
+from claims.models import DamageClaim, DamageType  # noqa: E402
+from core.models import InsurancePolicy, PolicyClause  # noqa: E402
+
+
+QUERY_COUNT_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+# Query counts are read from the Server-Timing header, which is only sent
+# to staff users unless this (or DEBUG) is on
+settings.METRICS_SERVER_TIMING = True
+
+
+def seed(args, rng):
+    types = [key for key, _ in InsurancePolicy.POLICY_TYPES]
+    parts = ['bumper', 'windshield', 'wheel', 'door', 'mirror', 'engine', 'roof']
+    policies = InsurancePolicy.objects.bulk_create([
+        InsurancePolicy(name=f'Policy {i}', policy_type=types[i % len(types)], provider=f'Provider {i % 10}',
+                        description='Standard cover', coverage_details={'limit': 500000}, exclusions=['wear'])
+        for i in range(args.policies)
+    ], batch_size=1000)
+    PolicyClause.objects.bulk_create([
+        PolicyClause(policy=policy, clause_number=str(j + 1), title=f'{rng.choice(parts)} damage clause {j + 1}',
+                     description=' '.join(rng.choice(parts + ['repair', 'cover', 'loss']) for _ in range(20)),
+                     is_covered=rng.random() < 0.7)
+        for policy in policies for j in range(args.clauses)
+    ], batch_size=5000)
+    DamageType.objects.bulk_create([
+        DamageType(name=meta['name'], description='', typically_covered=meta['covered'])
+        for meta in DAMAGE_METADATA.values()
+    ])
+    damage_names = [meta['name'] for meta in DAMAGE_METADATA.values()]
+    DamageClaim.objects.bulk_create([
+        DamageClaim(full_name=f'Customer {i}', email=f'user{i}@example.com', phone='98',
+                    vehicle_number=f'BA {rng.randint(1, 99)} PA {rng.randint(1000, 9999)}',
+                    damage_description='Bench claim', detected_damage_type=rng.choice(damage_names),
+                    policy=rng.choice(policies) if policies else None)
+        for i in range(args.claims)
+    ], batch_size=5000)
+    now = timezone.now()
+    turns = [
+        (f'seed-{s}', f'question {i}', f'answer {i}', now)
+        for s in range(args.sessions) for i in range(args.messages)
+    ]
+    save_turns(turns)
+
+
+def photo_bytes(rng, size=(1600, 1200)):
+    """A camera-sized JPEG of random noise (every photo hashes differently)"""
+    image = Image.effect_noise(size, rng.randint(20, 80)).convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def build_scenarios(args, rng):
+    """Scenario name -> make_request(client_id, index) returning a loadgen Request"""
+    uploads = []
+    for number in range(args.photos):
+        body, content_type = multipart(
+            {'vehicle_type': 'car'}, {'image': (f'photo{number}.jpg', photo_bytes(rng), 'image/jpeg')},
+        )
+        uploads.append((body, content_type))
+
+    def analyze(client_id, index):
+        body, content_type = uploads[(client_id + index) % len(uploads)]
+        return Request('POST', '/api/claims/analyze/', body, content_type=content_type)
+
+    return {
+        'chat_message': lambda client_id, index: Request(
+            'POST', '/api/chat/message/',
+            {'session_id': f'bench-{client_id}', 'message': rng.choice(['how to claim', 'documents needed'])},
+        ),
+        'get_chat_history': lambda client_id, index: Request(
+            'GET', f'/api/chat/history/seed-{(client_id + index) % max(args.sessions, 1)}/?limit=20',
+        ),
+        'analyze_damage': analyze,
+        'submit_claim': lambda client_id, index: Request('POST', '/api/claims/submit/', {
+            'full_name': f'Load {client_id}', 'vehicle_number': f'BA {client_id} PA {index}',
+            'email': f'load{client_id}@example.com', 'phone': '98', 'damage_description': 'Load test',
+        }),
+        'get_damage_types': lambda client_id, index: Request('GET', '/api/claims/damage-types/'),
+        'api_policies': lambda client_id, index: Request(
+            'GET', f'/api/policies/?limit=50&offset={50 * (index % 4)}' + ('&include=clauses' if index % 2 else ''),
+        ),
+    }
+
+
+def run_in_process(make_request, requests):
+    """Sequential requests through the test client: latency and queries per request"""
+    client = Client()
+
+    def send(request):
+        return client.generic(request.method, request.path, request.body, content_type=request.content_type)
+
+    for index in range(min(5, requests)):
+        send(make_request(0, index))
+
+    latencies, queries, errors = [], [], 0
+    start = time.perf_counter()
+    for index in range(requests):
+        request = make_request(index % 10, index)
+        with CaptureQueriesContext(connection) as captured:
+            began = time.perf_counter()
+            response = send(request)
+            latencies.append(time.perf_counter() - began)
+        # Async views query from sync_to_async threads, on connections
+        # CaptureQueriesContext does not see; the metrics header counts those
+        timing = QUERY_COUNT_RE.search(response.get('Server-Timing', ''))
+        queries.append(int(timing.group(1)) if timing else len(captured))
+        if response.status_code >= 400:
+            errors += 1
+    wall = time.perf_counter() - start
+    return {
+        'requests': requests,
+        'errors': errors,
+        'requests_per_sec': round(requests / wall, 1) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1e3, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1e3, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1e3, 2),
+        'queries_mean': round(sum(queries) / len(queries), 2) if queries else 0,
+        'queries_max': max(queries, default=0),
+    }
+
+
+def run_live(scenarios, args):
+    env = dict(
+        os.environ,
+        BENCH_DATABASE=DATABASE,
+        DJANGO_SETTINGS_MODULE='bench_settings',
+        PYTHONPATH=os.pathsep.join([ROOT, BENCH_DIR]),
+    )
+    server = subprocess.Popen(SERVERS[args.server](args.port, args.threads), cwd=ROOT, env=env)
+    try:
+        wait_for_port(HOST, args.port)
+        per_client = max(1, args.requests // args.clients)
+        return {
+            name: run_load(HOST, args.port, make_request, clients=args.clients, requests_per_client=per_client)
+            for name, make_request in scenarios.items()
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def compare(results, baseline, tolerance):
+    """Regressions against a previous run: (phase, scenario, reason) tuples"""
+    regressions = []
+    for phase in ('in_process', 'live'):
+        for name, current in results.get(phase, {}).items():
+            previous = baseline.get(phase, {}).get(name)
+            if not previous:
+                continue
+            if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+                regressions.append((phase, name, f"p95 {previous['p95_ms']} -> {current['p95_ms']} ms"))
+            if current.get('queries_max', 0) > previous.get('queries_max', current.get('queries_max', 0)):
+                regressions.append((phase, name, f"queries {previous['queries_max']} -> {current['queries_max']}"))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--policies', type=int, default=200)
+    parser.add_argument('--clauses', type=int, default=10, help='clauses per policy')
+    parser.add_argument('--claims', type=int, default=10000)
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=20, help='chat turns per seeded session')
+    parser.add_argument('--photos', type=int, default=8, help='distinct photos for analyze_damage')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--clients', type=int, default=20, help='concurrent clients on the live server')
+    parser.add_argument('--server', choices=sorted(SERVERS) + ['none'], default='wsgi')
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn worker threads')
+    parser.add_argument('--port', type=int, default=8775)
+    parser.add_argument('--only', action='append', help='run only these scenarios (repeatable)')
+    parser.add_argument('--output', help='write the JSON results to this file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p95 growth (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    start = time.perf_counter()
+    seed(args, rng)
+    seconds = time.perf_counter() - start
+    scenarios = build_scenarios(args, rng)
+    if args.only:
+        scenarios = {name: scenarios[name] for name in args.only}
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'cpus': os.cpu_count(),
+            'seed_seconds': round(seconds, 2),
+            'scale': {name: getattr(args, name) for name in (
+                'policies', 'clauses', 'claims', 'sessions', 'messages', 'photos', 'requests', 'clients',
+            )},
+            'server': args.server,
+        },
+        'in_process': {name: run_in_process(make_request, args.requests) for name, make_request in scenarios.items()},
+    }
+    if args.server != 'none':
+        results['live'] = run_live(scenarios, args)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for phase, name, reason in regressions:
+            print(f'REGRESSION {phase} {name}: {reason}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
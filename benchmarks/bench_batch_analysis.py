@@ -0,0 +1,116 @@
+"""
+Benchmark: one multi-photo request to /api/claims/analyze/batch/ vs. N
+sequential /api/claims/analyze/ calls for the same photos.
+
+Detection is simulated with a fixed per-call overhead plus a per-image
+cost (``--model-call-ms`` / ``--model-image-ms``), which is how a batched
+model behaves; set both to 0 to measure only decoding, clause lookups and
+JSON encoding.
+
+Usage:
+    python benchmarks/bench_batch_analysis.py [--photos 10] [--rounds 3] [--clauses 20000]
+"""
+import argparse
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from django.test import Client  # noqa: E402
+from PIL import Image, ImageDraw, ImageFilter  # noqa: E402
+
+from claims import views  # noqa: E402
+from core.models import InsurancePolicy, PolicyClause  # noqa: E402
+
+
+def photo_bytes(rng, size=(3000, 2250)):
+    """A camera-sized JPEG of a random blurred scene"""
+    image = Image.new('RGB', size, tuple(rng.randint(0, 255) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(15):
+        x0, y0 = rng.randint(0, size[0]), rng.randint(0, size[1])
+        draw.rectangle([x0, y0, x0 + rng.randint(100, 1200), y0 + rng.randint(100, 900)],
+                       fill=tuple(rng.randint(0, 255) for _ in range(3)))
+    buffer = io.BytesIO()
+    image.filter(ImageFilter.GaussianBlur(2)).save(buffer, format='JPEG', quality=88)
+    return buffer.getvalue()
+
+
+def seed_clauses(count, rng):
+    policy = InsurancePolicy.objects.create(name='Bench', policy_type='vehicle', provider='Bench', description='')
+    parts = ['bumper', 'windshield', 'wheel', 'door', 'mirror', 'engine', 'roof']
+    PolicyClause.objects.bulk_create([
+        PolicyClause(
+            policy=policy, clause_number=str(i),
+            title=f'{rng.choice(parts)} damage clause {i}',
+            description=' '.join(rng.choice(parts + ['repair', 'cover', 'loss']) for _ in range(30)),
+            is_covered=rng.random() < 0.7,
+        )
+        for i in range(count)
+    ], batch_size=2000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--photos', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--clauses', type=int, default=20000)
+    parser.add_argument('--model-call-ms', type=float, default=40)
+    parser.add_argument('--model-image-ms', type=float, default=10)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    seed_clauses(args.clauses, rng)
+    photos = [photo_bytes(rng) for _ in range(args.photos)]
+
+    real_detect = views.detect_damage
+
+    def model_detect(ingested):
+        time.sleep((args.model_call_ms + args.model_image_ms) / 1000)
+        return real_detect(ingested)
+
+    def model_detect_batch(images):
+        time.sleep((args.model_call_ms + args.model_image_ms * len(images)) / 1000)
+        return [real_detect(image) for image in images]
+
+    views.detect_damage = model_detect
+    views.detect_damage_batch = model_detect_batch
+    views.ANALYSIS_CACHE.maxsize = 0  # measure detection, not the duplicate cache
+    client = Client()
+
+    def files():
+        return [SimpleUploadedFile(f'p{i}.jpg', data, content_type='image/jpeg') for i, data in enumerate(photos)]
+
+    sequential, batched = [], []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        for uploaded in files():
+            assert client.post('/api/claims/analyze/', {'image': uploaded}).status_code == 200
+        sequential.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = client.post('/api/claims/analyze/batch/', {'images': files()})
+        assert response.status_code == 200, response.content
+        batched.append(time.perf_counter() - start)
+
+    size_mb = sum(map(len, photos)) / 1e6
+    print(f'{args.photos} photos ({size_mb:.1f} MB), {args.clauses} clauses, {os.cpu_count()} CPU(s)')
+    for label, times in (('sequential', sequential), ('batch', batched)):
+        best = min(times)
+        print(f'  {label:10s} {statistics.median(times) * 1000:8.1f} ms/claim (best {best * 1000:.1f}), '
+              f'{args.photos / best:5.1f} photos/s')
+    print(f'  speed-up   {statistics.median(sequential) / statistics.median(batched):.2f}x')
+
+
+if __name__ == '__main__':
+    main()
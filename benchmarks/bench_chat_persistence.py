@@ -0,0 +1,66 @@
+"""
+Load benchmark: chat turns/sec for the old per-row autocommit writes, the
+single-transaction save_turn(), and the write-behind TurnBuffer.
+
+Runs against a scratch file-backed SQLite database so commit/fsync costs
+are real.
+
+Usage:
+    python benchmarks/bench_chat_persistence.py [--turns 2000] [--sessions 50]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+from chat.models import ChatMessage, ChatSession  # noqa: E402
+from chat.persistence import TurnBuffer, save_turn  # noqa: E402
+
+
+def legacy_turn(session_id, user_message, bot_response):
+    """The original chat_message write path"""
+    session, created = ChatSession.objects.get_or_create(session_id=session_id)
+    ChatMessage.objects.create(session=session, message_type='user', content=user_message)
+    ChatMessage.objects.create(session=session, message_type='bot', content=bot_response)
+
+
+def run(label, write, turns, sessions, finish=None):
+    ChatSession.objects.all().delete()
+    start = time.perf_counter()
+    for i in range(turns):
+        write(f'{label}-{i % sessions}', f'question {i}', f'answer {i}')
+    if finish:
+        finish()
+    elapsed = time.perf_counter() - start
+    assert ChatMessage.objects.count() == turns * 2
+    rate = turns / elapsed
+    print(f'  {label:<14} {rate:10.0f} turns/sec')
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=2000)
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f'{args.turns} turns across {args.sessions} sessions')
+    legacy = run('autocommit', legacy_turn, args.turns, args.sessions)
+    atomic = run('save_turn', save_turn, args.turns, args.sessions)
+    buffer = TurnBuffer(batch_size=args.batch_size, interval=0)
+    buffered = run('write-behind', buffer.add, args.turns, args.sessions, finish=buffer.flush)
+    print(f'  save_turn speedup    {atomic / legacy:6.2f}x')
+    print(f'  write-behind speedup {buffered / legacy:6.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark: archiving idle chat sessions, database compaction and restore.
+
+Seeds idle and active sessions, then times ``archive_idle_sessions`` and
+reports rows/s, archive size vs. the freed database size, the effect of
+VACUUM on the file, the longest single delete transaction (how long a
+chat write could wait) and the cost of restoring one session on demand.
+
+Usage:
+    python benchmarks/bench_chat_retention.py [--sessions 20000] [--messages 20] [--idle 0.8]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+DATABASE = os.path.join(_tmp.name, 'bench.sqlite3')
+setup_django(database=DATABASE)
+
+from django.conf import settings  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from chat import retention  # noqa: E402
+from chat.models import ArchivedChatSession, ChatMessage, ChatSession  # noqa: E402
+
+
+def seed(sessions, messages, idle_share, rng):
+    now = timezone.now()
+    words = ['claim', 'policy', 'documents', 'bumper', 'premium', 'survey', 'repair', 'coverage']
+    with transaction.atomic():
+        ChatSession.objects.bulk_create([ChatSession(session_id=f's-{i}') for i in range(sessions)], batch_size=5000)
+        pks = dict(ChatSession.objects.values_list('session_id', 'pk'))
+        batch = []
+        for i in range(sessions):
+            when = now - timedelta(days=rng.randint(120, 400) if i < sessions * idle_share else rng.randint(0, 30))
+            for j in range(messages):
+                batch.append(ChatMessage(
+                    session_id=pks[f's-{i}'], message_type='user' if j % 2 == 0 else 'bot',
+                    content=' '.join(rng.choice(words) for _ in range(rng.randint(5, 60))),
+                    timestamp=when + timedelta(seconds=j),
+                ))
+            if len(batch) >= 20000:
+                ChatMessage.objects.bulk_create(batch)
+                batch = []
+            ChatSession.objects.filter(pk=pks[f's-{i}']).update(updated_at=when, created_at=when)
+        ChatMessage.objects.bulk_create(batch)
+
+
+def file_size():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    return os.path.getsize(DATABASE)
+
+
+class TimedAtomic:
+    """Wrap transaction.atomic to record the longest transaction"""
+    longest = 0.0
+
+    def __init__(self, real):
+        self.real = real
+
+    def __call__(self, *args, **kwargs):
+        real = self.real(*args, **kwargs)
+        outer = self
+
+        class Timed:
+            def __enter__(self):
+                self.start = time.perf_counter()
+                return real.__enter__()
+
+            def __exit__(self, *exc):
+                result = real.__exit__(*exc)
+                outer.longest = max(outer.longest, time.perf_counter() - self.start)
+                return result
+        return Timed()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=20000)
+    parser.add_argument('--messages', type=int, default=20, help='messages per session')
+    parser.add_argument('--idle', type=float, default=0.8, help='share of sessions idle past the cutoff')
+    parser.add_argument('--batch-size', type=int, default=200)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed(args.sessions, args.messages, args.idle, random.Random(0))
+    print(f'seeded {args.sessions} sessions x {args.messages} messages in {time.perf_counter() - start:.1f}s')
+    before = file_size()
+
+    client = Client()
+    history_url = f'/api/chat/history/s-{args.sessions - 1}/?limit=50'
+
+    def history_ms(rounds=50):
+        times = []
+        for _ in range(rounds):
+            began = time.perf_counter()
+            client.get(history_url)
+            times.append((time.perf_counter() - began) * 1000)
+        return sorted(times)[rounds // 2]
+
+    history_before = history_ms()
+    timed = TimedAtomic(transaction.atomic)
+    retention.transaction.atomic = timed
+    archive_dir = settings.CHAT_ARCHIVE_DIR = os.path.join(_tmp.name, 'archive')
+    start = time.perf_counter()
+    totals = retention.archive_idle_sessions(days=90, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    retention.transaction.atomic = timed.real
+    archive_bytes = sum(os.path.getsize(os.path.join(archive_dir, name)) for name in totals['files'])
+    after_delete = file_size()
+    pages = retention.compact_database('full')
+    after_vacuum = file_size()
+    history_after = history_ms()
+
+    print(f"archived {totals['sessions']} sessions / {totals['messages']} messages in {elapsed:.1f}s "
+          f"({totals['messages'] / elapsed:,.0f} messages/s, {len(totals['files'])} files)")
+    print(f'longest delete transaction: {timed.longest * 1000:.1f} ms (batch of {args.batch_size} sessions)')
+    print(f'archive files: {archive_bytes / 1e6:.1f} MB')
+    print(f'database file: {before / 1e6:.1f} MB -> {after_delete / 1e6:.1f} MB after delete '
+          f'-> {after_vacuum / 1e6:.1f} MB after VACUUM (pages {pages[0]} -> {pages[1]})')
+    print(f'history read p50: {history_before:.2f} ms -> {history_after:.2f} ms')
+
+    session_id = ArchivedChatSession.objects.values_list('session_id', flat=True).first()
+    start = time.perf_counter()
+    response = client.get(f'/api/chat/history/{session_id}/?limit=50')
+    print(f'on-demand restore of {session_id}: {(time.perf_counter() - start) * 1000:.1f} ms, '
+          f'{len(response.json()["messages"])} messages returned')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: time-to-first-chunk of the SSE chat endpoint vs. the buffered
+JSON endpoint, with a simulated slow response generator.
+
+Runs through the test client (the WSGI path) and through the ASGI
+application, timing each body message it sends. Exits non-zero if either
+path does not deliver its first token well before the buffered endpoint
+finishes.
+
+Usage:
+    python benchmarks/bench_chat_streaming.py [--chunk-delay-ms 5] [--requests 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+from django.test import Client  # noqa: E402
+
+from chat import views  # noqa: E402
+from insurance_ai_agent.asgi import application  # noqa: E402
+
+
+async def asgi_post(path, body):
+    """POST through the ASGI app; returns [(seconds since start, body bytes), ...]"""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'localhost'), (b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode())],
+        'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+    }
+    requested = False
+    disconnected = asyncio.Event()
+    messages = []
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.body':
+            messages.append((time.perf_counter() - start, message.get('body', b'')))
+
+    await application(scope, receive, send)
+    disconnected.set()
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chunk-delay-ms', type=float, default=5.0)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+
+    delay = args.chunk_delay_ms / 1000
+    original_response = views.get_bot_response
+    reference = original_response('how to claim')
+
+    def slow_stream(user_message):
+        for chunk in views.STREAM_CHUNK_RE.findall(reference):
+            time.sleep(delay)
+            yield chunk
+
+    def slow_response(user_message):
+        return ''.join(slow_stream(user_message))
+
+    views.stream_bot_response = slow_stream
+    views.get_bot_response = slow_response
+    client = Client()
+    body = json.dumps({'message': 'how to claim'})
+
+    buffered, first_chunk, streamed = [], [], []
+    asgi_first_chunk, asgi_streamed = [], []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        response = client.post('/api/chat/message/', body, content_type='application/json')
+        assert response.json()['response'] == reference
+        buffered.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = client.post('/api/chat/message/stream/', body, content_type='application/json')
+        text = ''
+        for frame in response.streaming_content:
+            frame = frame.decode()
+            if frame.startswith('event: token'):
+                if not text:
+                    first_chunk.append(time.perf_counter() - start)
+                text += json.loads(frame.split('data: ', 1)[1])['delta']
+        streamed.append(time.perf_counter() - start)
+        assert text == reference
+
+        messages = asyncio.run(asgi_post('/api/chat/message/stream/', body.encode()))
+        tokens = [(at, chunk) for at, chunk in messages if chunk.startswith(b'event: token')]
+        asgi_first_chunk.append(tokens[0][0])
+        asgi_streamed.append(messages[-1][0])
+        assert ''.join(json.loads(chunk.split(b'data: ', 1)[1])['delta'] for _, chunk in tokens) == reference
+
+    ms = lambda values: statistics.median(values) * 1e3  # noqa: E731
+    print(f'{len(views.STREAM_CHUNK_RE.findall(reference))} chunks, {args.chunk_delay_ms} ms each')
+    print(f'  buffered  time-to-first-byte  {ms(buffered):8.1f} ms')
+    print(f'  streaming time-to-first-chunk {ms(first_chunk):8.1f} ms')
+    print(f'  streaming total               {ms(streamed):8.1f} ms')
+    print(f'  ASGI      time-to-first-chunk {ms(asgi_first_chunk):8.1f} ms')
+    print(f'  ASGI      total               {ms(asgi_streamed):8.1f} ms')
+
+    if ms(first_chunk) * 2 > ms(buffered):
+        sys.exit('FAIL: first streamed chunk was not delivered early')
+    if ms(asgi_first_chunk) * 2 > ms(buffered):
+        sys.exit('FAIL: first streamed chunk was not delivered early under ASGI')
+
+
+if __name__ == '__main__':
+    main()
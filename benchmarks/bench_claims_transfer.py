@@ -0,0 +1,145 @@
+"""
+Benchmark: streaming claims export (CSV / NDJSON) and batched import
+(claims/transfer.py).
+
+Seeds claims with filled-in ai_analysis and matched_clauses, then for
+each format exports every claim to a file, empties the table and imports
+the file back (validation, then bulk_create in transactions of
+--batch-size rows), reporting rows/sec for both. Also streams the export
+endpoint through the test client, which reads the response chunk by chunk.
+
+With --memory, exports and imports a tenth of the rows and then all of
+them again under tracemalloc and prints each peak: flat memory means the
+two peaks match. Tracing slows Python down several times, so those runs
+are not timed.
+
+Usage:
+    python benchmarks/bench_claims_transfer.py [--rows 100000] [--batch-size 1000] [--memory]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from claims.estimates import DAMAGE_METADATA  # noqa: E402
+from claims.models import DamageClaim  # noqa: E402
+from claims.transfer import export_claims, import_claims  # noqa: E402
+from core.models import InsurancePolicy  # noqa: E402
+
+
+def seed(rows, rng):
+    policy = InsurancePolicy.objects.create(
+        name='Bench', policy_type='vehicle', provider='Bench', description='', coverage_details={}, exclusions=[],
+    )
+    names = [meta['name'] for meta in DAMAGE_METADATA.values()]
+    statuses = [key for key, _ in DamageClaim.STATUS_CHOICES]
+    with transaction.atomic():
+        for start in range(0, rows, 5000):
+            DamageClaim.objects.bulk_create([
+                DamageClaim(
+                    full_name=f'Customer {i}', email=f'customer{i}@example.com', phone='9800000000',
+                    vehicle_number=f'BA {i % 100} PA {i}', policy=policy if i % 2 else None,
+                    damage_description='Rear bumper dented in a parking lot, paint scratched along the edge',
+                    damage_image=f'claims/damage_images/{i}.jpg', detected_damage_type=rng.choice(names),
+                    damage_severity='moderate', analysis_status='done', status=rng.choice(statuses),
+                    ai_analysis={'confidence': round(rng.random(), 3), 'severity': 'moderate',
+                                 'estimate': {'low': 15000, 'high': 45000, 'currency': 'NPR'}},
+                    matched_clauses=[{'clause_number': str(j), 'title': f'Clause {j}', 'is_covered': j % 3 != 0}
+                                     for j in range(1, 4)],
+                    estimated_coverage='45250.50',
+                )
+                for i in range(start, min(start + 5000, rows))
+            ])
+
+
+def peak_mib(call):
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / 2**20, 2)
+
+
+def timed(call):
+    start = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - start
+
+
+def export_to(path, fmt, queryset=None):
+    with open(path, 'wb') as f:
+        for chunk in export_claims(fmt, queryset):
+            f.write(chunk)
+    return os.path.getsize(path)
+
+
+def import_from(path, fmt, batch_size):
+    DamageClaim.objects.all().delete()
+    with open(path, 'rb') as f:
+        return import_claims(f, fmt, batch_size=batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--memory', action='store_true', help='Also measure peak traced memory')
+    args = parser.parse_args()
+
+    seed(args.rows, random.Random(0))
+    results = {'rows': args.rows}
+    for fmt in ('csv', 'ndjson'):
+        path = os.path.join(_tmp.name, f'claims.{fmt}')
+        size, seconds = timed(lambda: export_to(path, fmt))
+        export = {'rows_per_sec': round(args.rows / seconds), 'seconds': round(seconds, 2),
+                  'file_mib': round(size / 2**20, 1)}
+        tenth_path = os.path.join(_tmp.name, f'tenth.{fmt}')
+        if args.memory:
+            # Imported claims get new ids, so take the tenth from the current first id
+            first_id = DamageClaim.objects.order_by('id').values_list('id', flat=True).first()
+            tenth = DamageClaim.objects.filter(id__lt=first_id + args.rows // 10)
+            export['peak_mib'] = {
+                args.rows // 10: peak_mib(lambda: export_to(tenth_path, fmt, tenth)),
+                args.rows: peak_mib(lambda: export_to(path, fmt)),
+            }
+
+        totals, seconds = timed(lambda: import_from(path, fmt, args.batch_size))
+        assert totals['imported'] == args.rows, totals
+        imported = {'rows_per_sec': round(args.rows / seconds), 'seconds': round(seconds, 2)}
+        if args.memory:
+            imported['peak_mib'] = {
+                args.rows // 10: peak_mib(lambda: import_from(tenth_path, fmt, args.batch_size)),
+                args.rows: peak_mib(lambda: import_from(path, fmt, args.batch_size)),
+            }
+        results[fmt] = {'export': export, 'import': imported}
+
+    client = Client()
+    client.force_login(User.objects.create_superuser('bench', 'bench@example.com', 'bench'))
+    start = time.perf_counter()
+    response = client.get('/api/claims/export/?format=ndjson')
+    streamed = sum(len(chunk) for chunk in response.streaming_content)
+    seconds = time.perf_counter() - start
+    results['endpoint_ndjson'] = {
+        'rows_per_sec': round(args.rows / seconds),
+        'mib_per_sec': round(streamed / 2**20 / seconds, 1),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
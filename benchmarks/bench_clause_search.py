@@ -0,0 +1,104 @@
+"""
+Benchmark: policy clause lookup at scale -- the old ``title__icontains``
+scan vs. the FTS5 and pure-Python clause indexes.
+
+Usage:
+    python benchmarks/bench_clause_search.py [--clauses 100000] [--policies 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+from core.models import InsurancePolicy, PolicyClause  # noqa: E402
+from core.search import FTS5ClauseIndex, InvertedClauseIndex  # noqa: E402
+
+PARTS = ['bumper', 'windshield', 'door', 'wheel', 'rim', 'mirror', 'bonnet', 'headlight', 'engine', 'roof']
+WORDS = ['damage', 'accident', 'flood', 'fire', 'theft', 'collision', 'scratch', 'dent', 'crack',
+         'covered', 'excluded', 'surveyor', 'repair', 'replacement', 'depreciation', 'workshop']
+QUERIES = ['bumper damage', 'windshield damage', 'wheel damage', 'door damage', 'flood engine']
+
+
+def filler_vocabulary(rng, size=5000):
+    """Generic clause wording that none of the queries hit"""
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [''.join(rng.choices(letters, k=rng.randint(4, 10))) for _ in range(size)]
+
+
+def seed(clauses, policies, rng):
+    InsurancePolicy.objects.bulk_create([
+        InsurancePolicy(name=f'Policy {i}', policy_type='vehicle', provider=f'Insurer {i % 20}', description='')
+        for i in range(policies)
+    ])
+    policy_ids = list(InsurancePolicy.objects.values_list('id', flat=True))
+    filler = filler_vocabulary(rng)
+    batch = []
+    for i in range(clauses):
+        part = rng.choice(PARTS)
+        batch.append(PolicyClause(
+            policy_id=rng.choice(policy_ids),
+            clause_number=f'{i}',
+            title=f'{part.title()} {rng.choice(WORDS).title()}',
+            description=' '.join(rng.choices(filler, k=28) + [part, rng.choice(WORDS)]),
+            conditions=' '.join(rng.choices(filler, k=8) + [rng.choice(WORDS)]),
+            is_covered=rng.random() > 0.3,
+        ))
+        if len(batch) == 5000:
+            PolicyClause.objects.bulk_create(batch)
+            batch = []
+    PolicyClause.objects.bulk_create(batch)
+    return policy_ids
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clauses', type=int, default=100000)
+    parser.add_argument('--policies', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    policy_ids = seed(args.clauses, args.policies, rng)
+    fts, inverted = FTS5ClauseIndex(), InvertedClauseIndex()
+    print(f'{PolicyClause.objects.count()} clauses over {len(policy_ids)} policies')
+    print(f'  build fts5       {timed(fts.rebuild, 1):9.1f} ms')
+    print(f'  build python     {timed(inverted.rebuild, 1):9.1f} ms')
+
+    policy_id = policy_ids[0]
+    for query in QUERIES:
+        # The old analyze_damage query: unindexed LIKE scan, no limit
+        icontains = timed(lambda: list(PolicyClause.objects.filter(title__icontains=query).values(
+            'clause_number', 'title', 'description', 'is_covered')), args.repeat)
+        print(f'  "{query}" ({PolicyClause.objects.filter(title__icontains=query).count()} title matches)')
+        print(f'    icontains      {icontains:9.2f} ms (title only, unranked, all rows)')
+        print(f'    fts5           {timed(lambda: fts.search(query), args.repeat):9.2f} ms')
+        print(f'    python         {timed(lambda: inverted.search(query), args.repeat):9.2f} ms')
+        print(f'    fts5 +policy   {timed(lambda: fts.search(query, policy_id=policy_id), args.repeat):9.2f} ms')
+        print(f'    python +policy {timed(lambda: inverted.search(query, policy_id=policy_id), args.repeat):9.2f} ms')
+
+    clause = PolicyClause.objects.first()
+    print(f'  update fts5      {timed(lambda: fts.index(clause), args.repeat):9.3f} ms')
+    print(f'  update python    {timed(lambda: inverted.index(clause), args.repeat):9.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Concurrency benchmark: the chat API under many simultaneous clients, served
+by a WSGI server (gunicorn, threaded) vs. an ASGI server (uvicorn).
+
+Requires the packages in benchmarks/requirements.txt.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--clients 200] [--requests 10] [--threads 8] [--workload chat]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from common import ROOT, setup_django  # noqa: E402
+from loadgen import Request, run_load, wait_for_port  # noqa: E402
+
+HOST = '127.0.0.1'
+
+SERVERS = {
+    'wsgi': lambda port, threads: [
+        sys.executable, '-m', 'gunicorn', 'insurance_ai_agent.wsgi:application',
+        '--bind', f'{HOST}:{port}', '--workers', '1', '--threads', str(threads),
+        '--backlog', '2048', '--log-level', 'warning',
+    ],
+    'asgi': lambda port, threads: [
+        sys.executable, '-m', 'uvicorn', 'insurance_ai_agent.asgi:application',
+        '--host', HOST, '--port', str(port), '--workers', '1',
+        '--backlog', '2048', '--log-level', 'warning',
+    ],
+}
+
+
+def chat_workload(client_id, index):
+    """Alternate chat messages and history reads, one session per client"""
+    session_id = f'bench-{client_id}'
+    if index % 2:
+        return Request('GET', f'/api/chat/history/{session_id}/?limit=20')
+    return Request('POST', '/api/chat/message/', {'session_id': session_id, 'message': 'how to claim'})
+
+
+def history_workload(client_id, index):
+    """Read-only: page through a seeded session's history"""
+    return Request('GET', f'/api/chat/history/bench-seed-{client_id % 10}/?limit=20')
+
+
+WORKLOADS = {'chat': chat_workload, 'history': history_workload}
+
+
+def seed_history():
+    from chat.persistence import save_turns
+    from django.utils import timezone
+
+    now = timezone.now()
+    save_turns([(f'bench-seed-{s}', f'question {i}', f'answer {i}', now) for s in range(10) for i in range(50)])
+
+
+def serve_and_load(mode, port, args, env):
+    server = subprocess.Popen(SERVERS[mode](port, args.threads), cwd=ROOT, env=env)
+    try:
+        wait_for_port(HOST, port)
+        return run_load(HOST, port, WORKLOADS[args.workload], clients=args.clients, requests_per_client=args.requests)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=10, help='requests per client')
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn worker threads')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workload', choices=sorted(WORKLOADS), default='chat')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, 'bench.sqlite3')
+        setup_django(database=database)
+        seed_history()
+        env = dict(
+            os.environ,
+            BENCH_DATABASE=database,
+            DJANGO_SETTINGS_MODULE='bench_settings',
+            PYTHONPATH=os.pathsep.join([ROOT, BENCH_DIR]),
+        )
+        results = {mode: serve_and_load(mode, args.port + i, args, env) for i, mode in enumerate(SERVERS)}
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: repair estimates with the NumPy rate table vs. per-row dict
+arithmetic, and a full ``requote_claims`` run over synthetic claims.
+
+Usage:
+    python benchmarks/bench_estimates.py [--claims 1000000]
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+import numpy as np  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from claims.estimates import DAMAGE_METADATA, SEVERITY_MULTIPLIERS, VEHICLE_MULTIPLIERS, get_rate_table  # noqa: E402
+from claims.models import DamageClaim  # noqa: E402
+
+
+def seed(count, rng):
+    """Insert synthetic analysed claims with raw executemany (bulk_create is the slow part here)"""
+    names = [meta['name'] for meta in DAMAGE_METADATA.values()] + ['Unknown Damage']
+    severities = list(SEVERITY_MULTIPLIERS)
+    vehicles = list(VEHICLE_MULTIPLIERS)
+    now = timezone.now().isoformat()
+    table = DamageClaim._meta.db_table
+    sql = (
+        f'INSERT INTO {table} (full_name, email, phone, vehicle_type, vehicle_number, '
+        'insurance_policy_number, damage_description, damage_image, image_hash, detected_damage_type, '
+        'damage_severity, analysis_status, ai_analysis, matched_clauses, status, eligibility_reason, '
+        'created_at, updated_at) VALUES '
+        "('x', 'x@example.com', '1', %s, 'BA 1 PA', '', '', '', '', %s, %s, 'done', '{}', '[]', "
+        "'pending', '', %s, %s)"
+    )
+    rows = (
+        (rng.choice(vehicles), rng.choice(names), rng.choice(severities), now, now)
+        for _ in range(count)
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--claims', type=int, default=1_000_000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    start = time.perf_counter()
+    seed(args.claims, rng)
+    print(f'seeded {args.claims} claims in {time.perf_counter() - start:.1f}s')
+
+    rows = list(DamageClaim.objects.values_list('detected_damage_type', 'damage_severity', 'vehicle_type'))
+    by_name = {meta['name']: meta for meta in DAMAGE_METADATA.values()}
+    table = get_rate_table()
+    regions = list(table.regions)
+
+    # Portfolio re-pricing under every region's rates
+    start = time.perf_counter()
+    loop_totals = []
+    for region in regions:
+        factor = table.region_factor(region)
+        region_total = 0.0
+        for damage_type, severity, vehicle_type in rows:
+            meta = by_name.get(damage_type)
+            if meta and meta['covered'] and severity in SEVERITY_MULTIPLIERS:
+                region_total += (meta['base_cost'] * SEVERITY_MULTIPLIERS[severity]
+                                 * VEHICLE_MULTIPLIERS.get(vehicle_type, 1.0) * factor)
+        loop_totals.append(region_total)
+    loop_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    codes = table.cell_codes(rows)
+    encode_elapsed = time.perf_counter() - start
+    vector_totals = [
+        float(np.nansum(table.bulk_quote_cells(codes, table.region_factor(region), covered_only=True)))
+        for region in regions
+    ]
+    vector_elapsed = time.perf_counter() - start
+    assert np.allclose(loop_totals, vector_totals), (loop_totals, vector_totals)
+
+    print(f'pricing {len(rows)} rows x {len(regions)} regions: dict loop {loop_elapsed:.2f}s, '
+          f'rate table {vector_elapsed:.2f}s incl. {encode_elapsed:.2f}s encoding '
+          f'({loop_elapsed / vector_elapsed:.1f}x)')
+
+    start = time.perf_counter()
+    for _ in range(100000):
+        table.quote('door_damage', 'moderate', 'truck')
+    print(f'single quote: {(time.perf_counter() - start) / 100000 * 1e6:.2f} us')
+
+    out = io.StringIO()
+    call_command('requote_claims', stdout=out)
+    print('requote_claims:', out.getvalue().strip())
+
+
+if __name__ == '__main__':
+    main()
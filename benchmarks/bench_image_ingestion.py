@@ -0,0 +1,123 @@
+"""
+Benchmark: peak RSS and per-image latency of damage photo ingestion, naive
+full decode vs. the claims.imaging pipeline, over a corpus of large JPEGs.
+
+Each mode runs in its own subprocess so peak RSS is measured cleanly.
+
+Usage:
+    python benchmarks/bench_image_ingestion.py [--megapixels 12 24 48] [--copies 3]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+
+def make_corpus(directory, megapixels, copies):
+    from PIL import Image
+
+    paths = []
+    for mp in megapixels:
+        width = int((mp * 1e6 * 4 / 3) ** 0.5)
+        height = int(width * 3 / 4)
+        # Upscaled noise gives photo-like JPEG sizes without a huge source
+        texture = Image.merge('RGB', [Image.effect_noise((width // 8, height // 8), 64) for _ in range(3)])
+        image = texture.resize((width, height), Image.Resampling.BILINEAR)
+        exif = image.getexif()
+        exif[0x010F] = 'Bench Phone'
+        exif[0x0112] = 6
+        for copy in range(copies):
+            path = os.path.join(directory, f'{mp}mp_{copy}.jpg')
+            image.save(path, 'JPEG', quality=92, exif=exif)
+            paths.append(path)
+    return paths
+
+
+def naive(path):
+    """Buffer the upload in memory and decode it at full resolution"""
+    from io import BytesIO
+    from PIL import Image
+
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    image = Image.open(BytesIO(data))
+    image.load()
+    image = image.convert('RGB')
+    image.thumbnail((1024, 1024))
+    return image.size
+
+
+def pipeline(path):
+    from django.core.files import File
+    from claims.imaging import ingest_image
+
+    with open(path, 'rb') as fh:
+        # Lift the pixel cap so the largest corpus images are measured too
+        return ingest_image(File(fh, name=os.path.basename(path)), max_pixels=10**9).size
+
+
+def rss_kb(field):
+    """Read VmRSS (current) or VmHWM (peak) for this process, in kB"""
+    with open('/proc/self/status') as fh:
+        for line in fh:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def worker(mode, paths):
+    setup_django()
+    import PIL.Image  # noqa: F401  (import cost is not part of the measurement)
+
+    func = {'naive': naive, 'pipeline': pipeline}[mode]
+    # Reset the peak-RSS high-water mark so import spikes don't hide the measurement
+    with open('/proc/self/clear_refs', 'w') as fh:
+        fh.write('5')
+    baseline = rss_kb('VmRSS')
+    results = []
+    for path in paths:
+        start = time.perf_counter()
+        func(path)
+        results.append({'image': os.path.basename(path), 'ms': round((time.perf_counter() - start) * 1e3, 1)})
+    peak = rss_kb('VmHWM')
+    print(json.dumps({'mode': mode, 'peak_rss_delta_mb': round((peak - baseline) / 1024, 1), 'images': results}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--megapixels', type=int, nargs='+', default=[12, 24, 48])
+    parser.add_argument('--copies', type=int, default=3)
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('paths', nargs='*', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return worker(args.worker, args.paths)
+
+    setup_django()
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_corpus(tmp, args.megapixels, args.copies)
+        sizes = {os.path.basename(p): os.path.getsize(p) for p in paths}
+        print(f'{len(paths)} images, {sum(sizes.values()) / 1e6:.1f} MB total')
+        for mode in ('naive', 'pipeline'):
+            output = subprocess.run(
+                [sys.executable, __file__, '--worker', mode, *paths],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f'  {mode:<9} peak RSS +{result["peak_rss_delta_mb"]:7.1f} MB')
+            for mp in args.megapixels:
+                timings = [r['ms'] for r in result['images'] if r['image'].startswith(f'{mp}mp_')]
+                print(f'    {mp:>3} MP  {sum(timings) / len(timings):8.1f} ms/image')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark: compiled IntentMatcher vs. the original nested keyword loop.
+
+Usage:
+    python benchmarks/bench_intent_matcher.py [--intents 500] [--keywords 8]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+setup_django()
+
+from chat.matcher import IntentMatcher  # noqa: E402
+from chat.views import KNOWLEDGE_BASE  # noqa: E402
+
+
+def loop_match(knowledge_base, message):
+    """The original get_bot_response lookup"""
+    message_lower = message.lower()
+    for category, data in knowledge_base.items():
+        for keyword in data['keywords']:
+            if keyword in message_lower:
+                return category
+    return None
+
+
+def synthetic_knowledge_base(intents, keywords_per_intent, rng):
+    kb = dict(KNOWLEDGE_BASE)
+    for i in range(intents):
+        kb[f'intent_{i}'] = {
+            'keywords': [
+                ' '.join(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+                         for _ in range(rng.randint(1, 2)))
+                for _ in range(keywords_per_intent)
+            ],
+            'response': f'Synthetic response {i}',
+        }
+    return kb
+
+
+def synthetic_messages(knowledge_base, count, rng):
+    keywords = [kw for data in knowledge_base.values() for kw in data['keywords']]
+    messages = []
+    for i in range(count):
+        words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 8))) for _ in range(12)]
+        if i % 2 == 0:
+            words.insert(rng.randint(0, len(words)), rng.choice(keywords).upper())
+        messages.append(' '.join(words))
+    return messages
+
+
+def bench(label, func, messages, repeat):
+    best = min(timeit.repeat(lambda: [func(m) for m in messages], number=1, repeat=repeat))
+    per_call = best / len(messages) * 1e6
+    print(f'  {label:<10} {per_call:9.2f} us/message')
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--intents', type=int, nargs='+', default=[0, 100, 1000])
+    parser.add_argument('--keywords', type=int, default=8, help='keywords per synthetic intent')
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    for intents in args.intents:
+        kb = synthetic_knowledge_base(intents, args.keywords, rng)
+        messages = synthetic_messages(kb, args.messages, rng)
+
+        build = min(timeit.repeat(lambda: IntentMatcher(kb), number=1, repeat=args.repeat))
+        matcher = IntentMatcher(kb)
+
+        for message in messages:
+            hit = matcher.match(message)
+            assert (hit.intent if hit else None) == loop_match(kb, message), message
+
+        print(f'{len(kb)} intents, {len(matcher)} keywords (build {build * 1e3:.1f} ms)')
+        loop = bench('loop', lambda m: loop_match(kb, m), messages, args.repeat)
+        compiled = bench('compiled', matcher.match, messages, args.repeat)
+        print(f'  speedup    {loop / compiled:9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: JSON serialization of large chat history and policy catalogue
+payloads, Django's JsonResponse encoder vs. core.responses backends.
+
+Builds the payloads the views return (history rows with datetimes,
+policies with their clauses, claims with Decimals) and times:
+
+* "django": ``json.dumps(..., cls=DjangoJSONEncoder)`` as JsonResponse
+  does, with history timestamps formatted by an ``isoformat()`` loop first,
+  as get_chat_history used to,
+* "stdlib" and "orjson": ``core.responses.dumps`` on the raw rows.
+
+Also times get_chat_history and api_policies end to end through the test
+client with each backend.
+
+Usage:
+    python benchmarks/bench_json_encoding.py [--messages 10000] [--policies 200] [--rounds 50]
+"""
+import argparse
+import datetime
+import decimal
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+from django.core.cache import cache  # noqa: E402
+from django.core.serializers.json import DjangoJSONEncoder  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from chat.persistence import save_turns  # noqa: E402
+from core.models import InsurancePolicy, PolicyClause  # noqa: E402
+from core.responses import dumps  # noqa: E402
+
+BACKENDS = ('stdlib', 'orjson')
+
+
+def history_rows(count):
+    start = timezone.now()
+    return [
+        {'id': i, 'content': f'message {i} about bumper damage and the claim documents needed',
+         'timestamp': start + datetime.timedelta(seconds=i), 'type': 'user' if i % 2 else 'bot'}
+        for i in range(count)
+    ]
+
+
+def policy_rows(count, clauses):
+    return [
+        {'id': i, 'name': f'Policy {i}', 'policy_type': 'Vehicle Insurance', 'provider': f'Provider {i % 10}',
+         'description': 'Standard comprehensive cover for private vehicles',
+         'clauses': [{'clause_number': str(j + 1), 'title': f'Clause {j + 1}', 'is_covered': j % 4 != 0}
+                     for j in range(clauses)]}
+        for i in range(count)
+    ]
+
+
+def claim_rows(count):
+    now = timezone.now()
+    return [
+        {'id': i, 'full_name': f'Customer {i}', 'estimated_amount': decimal.Decimal('45250.50'),
+         'created_at': now, 'status': 'pending'}
+        for i in range(count)
+    ]
+
+
+def django_history(rows):
+    history = [dict(row, timestamp=row['timestamp'].isoformat()) for row in rows]
+    return json.dumps({'success': True, 'messages': history}, cls=DjangoJSONEncoder).encode()
+
+
+def median_ms(call, rounds):
+    call()
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        call()
+        times.append((time.perf_counter() - start) * 1e3)
+    return round(statistics.median(times), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--policies', type=int, default=200)
+    parser.add_argument('--clauses', type=int, default=10)
+    parser.add_argument('--claims', type=int, default=10000)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    payloads = {
+        'history': (history_rows(args.messages), django_history,
+                    lambda rows, backend: dumps({'success': True, 'messages': rows}, backend)),
+        'policies': (policy_rows(args.policies, args.clauses),
+                     lambda rows: json.dumps({'policies': rows}, cls=DjangoJSONEncoder).encode(),
+                     lambda rows, backend: dumps({'policies': rows}, backend)),
+        'claims': (claim_rows(args.claims),
+                   lambda rows: json.dumps({'claims': rows}, cls=DjangoJSONEncoder).encode(),
+                   lambda rows, backend: dumps({'claims': rows}, backend)),
+    }
+    results = {'serialize_ms': {}, 'view_ms': {}}
+    for name, (rows, django_encode, encode) in payloads.items():
+        results['serialize_ms'][name] = {
+            'bytes': len(encode(rows, 'orjson')),
+            'django': median_ms(lambda: django_encode(rows), args.rounds),
+            **{backend: median_ms(lambda: encode(rows, backend), args.rounds) for backend in BACKENDS},
+        }
+
+    now = timezone.now()
+    save_turns([('bench', f'question {i}', f'answer {i}', now) for i in range(100)])
+    policies = InsurancePolicy.objects.bulk_create([
+        InsurancePolicy(name=f'Policy {i}', policy_type='vehicle', provider=f'Provider {i % 10}',
+                        description='Standard cover', coverage_details={}, exclusions=[])
+        for i in range(args.policies)
+    ])
+    PolicyClause.objects.bulk_create([
+        PolicyClause(policy=policy, clause_number=str(j + 1), title=f'Clause {j + 1}', description='')
+        for policy in policies for j in range(args.clauses)
+    ])
+    client = Client()
+    views = {
+        'get_chat_history (200 messages)': '/api/chat/history/bench/?limit=200',
+        'api_policies (200 with clauses)': '/api/policies/?limit=200&include=clauses',
+    }
+    for label, url in views.items():
+        results['view_ms'][label] = {}
+        for backend in BACKENDS:
+            with override_settings(JSON_BACKEND=backend):
+                def request():
+                    # Time the serialization, not the catalogue response cache
+                    cache.clear()
+                    return client.get(url)
+                results['view_ms'][label][backend] = median_ms(request, args.rounds)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
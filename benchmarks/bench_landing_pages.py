@@ -0,0 +1,83 @@
+"""
+Benchmark: home and about pages rendered on every request vs. served
+from the full-page cache (core.catalogue.cached_page).
+
+Runs sequential requests through the test client with PAGE_CACHE_ENABLED
+off, on, and on with a conditional request (If-None-Match, answered with
+304), and prints mean latency and requests/sec per page. The template
+engine's own cached loader is on in every run, so "uncached" is the cost
+of rendering alone. Also times the first request after a policy save,
+which drops the cached pages.
+
+Usage:
+    python benchmarks/bench_landing_pages.py [--requests 500]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+from django.test import Client, override_settings  # noqa: E402
+
+from core.models import InsurancePolicy  # noqa: E402
+
+PAGES = {'home': '/', 'about': '/about/'}
+
+
+def timed(client, path, requests, **headers):
+    for _ in range(min(requests, 20)):
+        client.get(path, **headers)
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(path, **headers)
+    wall = time.perf_counter() - start
+    return {
+        'status': response.status_code,
+        'mean_ms': round(wall / requests * 1e3, 3),
+        'requests_per_sec': round(requests / wall, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    client = Client()
+    results = {}
+    for name, path in PAGES.items():
+        with override_settings(PAGE_CACHE_ENABLED=False):
+            uncached = timed(client, path, args.requests)
+        cached = timed(client, path, args.requests)
+        etag = client.get(path)['ETag']
+        not_modified = timed(client, path, args.requests, HTTP_IF_NONE_MATCH=etag)
+
+        InsurancePolicy.objects.create(
+            name=f'Bench {name}', policy_type='motor', provider='Bench', description='',
+            coverage_details={}, exclusions=[],
+        )
+        start = time.perf_counter()
+        client.get(path)
+        after_invalidation_ms = round((time.perf_counter() - start) * 1e3, 3)
+
+        results[name] = {
+            'uncached': uncached,
+            'cached': cached,
+            'not_modified': not_modified,
+            'first_after_policy_save_ms': after_invalidation_ms,
+            'speedup': round(uncached['mean_ms'] / cached['mean_ms'], 1),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
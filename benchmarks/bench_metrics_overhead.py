@@ -0,0 +1,70 @@
+"""
+Benchmark: per-request cost of MetricsMiddleware, spans and the DB
+execute wrapper.
+
+Times a cheap endpoint (one query) and the chat endpoint (spans plus
+writes) with the test client, once with METRICS_ENABLED and once with it
+off, and prints the difference.
+
+Usage:
+    python benchmarks/bench_metrics_overhead.py [--requests 1000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+from django.test import Client, override_settings  # noqa: E402
+
+from core.metrics import reset_metrics  # noqa: E402
+
+
+def per_request_us(client, requests, call, repeats=5):
+    """Best of ``repeats`` runs, to keep scheduler noise out of a small difference"""
+    for _ in range(min(requests, 50)):
+        call(client)
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(requests):
+            call(client)
+        best = min(best, time.perf_counter() - start)
+    return best / requests * 1e6
+
+
+CALLS = {
+    'damage types (1 query)': lambda client: client.get('/api/claims/damage-types/'),
+    'chat message (spans)': lambda client: client.post(
+        '/api/chat/message/', json.dumps({'message': 'what documents are needed', 'session_id': 'bench'}),
+        content_type='application/json',
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f'{"endpoint":26s} {"disabled":>10s} {"enabled":>10s} {"overhead":>10s}')
+    for label, call in CALLS.items():
+        # The middleware list is read when a client's handler is built
+        with override_settings(METRICS_ENABLED=False):
+            disabled = per_request_us(Client(), args.requests, call)
+        with override_settings(METRICS_ENABLED=True):
+            enabled = per_request_us(Client(), args.requests, call)
+        reset_metrics()
+        print(f'{label:26s} {disabled:8.0f}us {enabled:8.0f}us {enabled - disabled:8.0f}us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark: perceptual-hash duplicate detection for damage photos.
+
+Measures how far re-compressed / resized copies of a photo drift in dHash
+and aHash (vs. distances between unrelated photos), the AnalysisCache
+lookup cost at its full size, and bulk near-duplicate grouping.
+
+Usage:
+    python benchmarks/bench_phash_cache.py [--photos 200] [--cache-size 10000] [--rows 100000]
+"""
+import argparse
+import io
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+setup_django()
+
+import numpy as np  # noqa: E402
+from PIL import Image, ImageDraw, ImageFilter  # noqa: E402
+
+from claims.phash import AnalysisCache, ahash, dhash, find_near_duplicates, hamming, popcount64  # noqa: E402
+
+
+def synthetic_photo(rng, size=(1024, 768)):
+    """A blurred random scene: background gradient plus shapes"""
+    image = Image.new('RGB', size, tuple(rng.randint(0, 255) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(rng.randint(8, 20)):
+        x0, y0 = rng.randint(0, size[0]), rng.randint(0, size[1])
+        x1, y1 = x0 + rng.randint(40, 400), y0 + rng.randint(40, 300)
+        draw.rectangle([x0, y0, x1, y1], fill=tuple(rng.randint(0, 255) for _ in range(3)))
+    return image.filter(ImageFilter.GaussianBlur(3))
+
+
+def variants(image):
+    """Copies a claimant might re-upload: re-encoded, resized, screenshotted"""
+    def jpeg(img, quality):
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=quality)
+        buffer.seek(0)
+        return Image.open(buffer).convert('RGB')
+
+    width, height = image.size
+    return {
+        'jpeg_q90': jpeg(image, 90),
+        'jpeg_q40': jpeg(image, 40),
+        'resize_50%': image.resize((width // 2, height // 2)),
+        'resize_50%_q60': jpeg(image.resize((width // 2, height // 2)), 60),
+        'brightness+10': Image.eval(image, lambda v: min(255, v + 10)),
+    }
+
+
+def distance_report(photos, hash_fn, threshold):
+    originals = [hash_fn(photo) for photo in photos]
+    per_variant = {}
+    for photo, original in zip(photos, originals):
+        for name, copy in variants(photo).items():
+            per_variant.setdefault(name, []).append(hamming(original, hash_fn(copy)))
+    unrelated = [hamming(a, b) for i, a in enumerate(originals) for b in originals[i + 1:]]
+    return {
+        'variants': {
+            name: {
+                'mean': round(statistics.mean(values), 2),
+                'max': max(values),
+                'within_threshold': round(sum(v <= threshold for v in values) / len(values), 3),
+            }
+            for name, values in per_variant.items()
+        },
+        'unrelated_mean': round(statistics.mean(unrelated), 2),
+        'unrelated_false_matches': round(sum(v <= threshold for v in unrelated) / len(unrelated), 5),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--photos', type=int, default=200)
+    parser.add_argument('--cache-size', type=int, default=10000)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--threshold', type=int, default=6)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    photos = [synthetic_photo(rng) for _ in range(args.photos)]
+    for name, hash_fn in (('dhash', dhash), ('ahash', ahash)):
+        report = distance_report(photos, hash_fn, args.threshold)
+        print(f'{name}: unrelated photos mean distance {report["unrelated_mean"]}, '
+              f'false matches at <= {args.threshold}: {report["unrelated_false_matches"]:.3%}')
+        for variant, stats in report['variants'].items():
+            print(f'  {variant:16s} mean {stats["mean"]:5.2f}  max {stats["max"]:2d}  '
+                  f'matched {stats["within_threshold"]:.1%}')
+
+    # Hash cost on an analysis-sized image
+    analysis = photos[0].copy()
+    analysis.thumbnail((1024, 1024))
+    start = time.perf_counter()
+    for _ in range(200):
+        dhash(analysis)
+    print(f'\ndhash of a {analysis.size[0]}x{analysis.size[1]} image: '
+          f'{(time.perf_counter() - start) / 200 * 1000:.3f} ms')
+
+    # Cache lookups against a full cache
+    cache = AnalysisCache(maxsize=args.cache_size, max_distance=args.threshold)
+    random_hashes = [format(rng.getrandbits(64), '016x') for _ in range(args.cache_size)]
+    for value in random_hashes:
+        cache.put(value, {'damage_key': 'dent'})
+    cache.get(random_hashes[0])  # build the lookup array
+    near = [format(int(h, 16) ^ (1 << rng.randrange(64)), '016x') for h in random_hashes[:500]]
+    misses = [format(rng.getrandbits(64), '016x') for _ in range(500)]
+    for label, queries in (('exact hit', random_hashes[:500]), ('near hit', near), ('miss', misses)):
+        start = time.perf_counter()
+        for query in queries:
+            cache.get(query)
+        print(f'cache {label:9s} ({args.cache_size} entries): '
+              f'{(time.perf_counter() - start) / len(queries) * 1e6:.1f} us')
+
+    # Bulk grouping: band bucketing vs. all pairs
+    rows = [(i, format(rng.getrandbits(64), '016x')) for i in range(args.rows)]
+    for i in range(0, args.rows, 100):
+        rows[i + 1] = (i + 1, format(int(rows[i][1], 16) ^ (1 << rng.randrange(64)), '016x'))
+    start = time.perf_counter()
+    groups = find_near_duplicates(rows, args.threshold)
+    print(f'\nfind_near_duplicates over {args.rows} hashes: {time.perf_counter() - start:.2f} s, '
+          f'{len(groups)} groups')
+
+    sample = 5000
+    values = np.array([int(h, 16) for _, h in rows[:sample]], dtype=np.uint64)
+    start = time.perf_counter()
+    for i in range(sample):
+        (popcount64(values[i + 1:] ^ values[i]) <= args.threshold).sum()
+    elapsed = time.perf_counter() - start
+    print(f'all-pairs comparison over {sample} hashes: {elapsed:.2f} s '
+          f'(~{elapsed * (args.rows / sample) ** 2:.0f} s extrapolated to {args.rows})')
+
+
+if __name__ == '__main__':
+    main()
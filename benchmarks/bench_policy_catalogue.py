@@ -0,0 +1,91 @@
+"""
+Benchmark: /api/policies/ cold, from the response cache, and as a
+conditional GET answered with 304.
+
+Seeds policies with realistic coverage JSON and clauses, then times each
+path with the test client. "cold" clears the cache before every request.
+
+Usage:
+    python benchmarks/bench_policy_catalogue.py [--policies 2000] [--clauses 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+from django.core.cache import cache  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from core.models import InsurancePolicy, PolicyClause  # noqa: E402
+
+URLS = {
+    'first page': '/api/policies/',
+    'page 200, clauses': '/api/policies/?limit=200&include=clauses',
+    'filtered': '/api/policies/?policy_type=vehicle&provider=Provider+4',
+}
+
+
+def seed(policies, clauses):
+    coverage = {'items': [{'item': i, 'limit': 100000, 'notes': 'x' * 40} for i in range(100)]}
+    types = [key for key, _ in InsurancePolicy.POLICY_TYPES]
+    created = InsurancePolicy.objects.bulk_create([
+        InsurancePolicy(name=f'Policy {i}', policy_type=types[i % len(types)], provider=f'Provider {i % 10}',
+                        description='Standard cover', coverage_details=coverage, exclusions=['wear'] * 20)
+        for i in range(policies)
+    ], batch_size=1000)
+    PolicyClause.objects.bulk_create([
+        PolicyClause(policy=policy, clause_number=f'{j + 1}', title=f'Clause {j + 1}', description='',
+                     is_covered=j % 4 != 0)
+        for policy in created for j in range(clauses)
+    ], batch_size=5000)
+
+
+def median_ms(request, rounds):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        request()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--policies', type=int, default=2000)
+    parser.add_argument('--clauses', type=int, default=5)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    seed(args.policies, args.clauses)
+    client = Client()
+
+    print(f'{"request":20s} {"cold":>9s} {"cached":>9s} {"304":>9s} {"bytes":>8s}')
+    for label, url in URLS.items():
+        def cold():
+            cache.clear()
+            assert client.get(url).status_code == 200
+
+        def cached():
+            assert client.get(url).status_code == 200
+
+        response = client.get(url)
+        etag = response['ETag']
+
+        def conditional():
+            assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        print(f'{label:20s} {median_ms(cold, args.rounds):7.2f}ms {median_ms(cached, args.rounds):7.2f}ms '
+              f'{median_ms(conditional, args.rounds):7.2f}ms {len(response.content):8d}')
+
+
+if __name__ == '__main__':
+    main()
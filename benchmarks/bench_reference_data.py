@@ -0,0 +1,150 @@
+"""
+Benchmark: queries and latency per endpoint with the in-process reference
+data snapshot (core/reference.py), and the cost of reloading it.
+
+Seeds damage types, policies and clauses, then requests each endpoint
+that reads them with the test client: once with the snapshot loaded
+("warm", the steady state) and once with the snapshot dropped before
+every request ("reload", the first request after a save). The clause
+search index is warmed first, so analyze_damage's query count is the
+clause lookup only. Also prints the snapshot's load time and size.
+
+Usage:
+    python benchmarks/bench_reference_data.py [--policies 200] [--clauses 10] [--requests 200]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from claims.estimates import DAMAGE_METADATA  # noqa: E402
+from claims.models import DamageType  # noqa: E402
+from core import reference  # noqa: E402
+from core.models import InsurancePolicy, PolicyClause  # noqa: E402
+from core.search import get_clause_index  # noqa: E402
+
+QUERY_COUNT_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+# Query counts are read from the Server-Timing header, which is only sent
+# to staff users unless this (or DEBUG) is on
+settings.METRICS_SERVER_TIMING = True
+
+
+def seed(args, rng):
+    types = [key for key, _ in InsurancePolicy.POLICY_TYPES]
+    parts = ['bumper', 'windshield', 'scratch', 'dent', 'glass', 'engine', 'door']
+    policies = InsurancePolicy.objects.bulk_create([
+        InsurancePolicy(name=f'Policy {i}', policy_type=types[i % len(types)], provider=f'Provider {i % 10}',
+                        description='Standard cover', coverage_details={}, exclusions=[])
+        for i in range(args.policies)
+    ])
+    PolicyClause.objects.bulk_create([
+        PolicyClause(policy=policy, clause_number=str(j + 1), title=f'{rng.choice(parts)} damage',
+                     description=' '.join(rng.choice(parts + ['repair', 'cover']) for _ in range(20)),
+                     is_covered=rng.random() < 0.7)
+        for policy in policies for j in range(args.clauses)
+    ], batch_size=5000)
+    DamageType.objects.bulk_create([
+        DamageType(name=meta['name'], description='', typically_covered=meta['covered'])
+        for meta in DAMAGE_METADATA.values()
+    ])
+
+
+def photo_upload():
+    buffer = io.BytesIO()
+    Image.new('RGB', (640, 480), (120, 40, 40)).save(buffer, format='JPEG')
+    buffer.seek(0)
+    buffer.name = 'photo.jpg'
+    return buffer
+
+
+REQUESTS = {
+    'get_damage_types': lambda client: client.get('/api/claims/damage-types/'),
+    'api_policies': lambda client: client.get('/api/policies/?limit=50&include=clauses'),
+    'analyze_damage': lambda client: client.post('/api/claims/analyze/', {'image': photo_upload()}),
+}
+
+
+def measure(client, call, requests, reload):
+    latencies, queries = [], []
+    for _ in range(requests):
+        # The catalogue's response cache would hide the snapshot
+        cache.clear()
+        if reload:
+            reference.bump_reference_version()
+        with contextlib.ExitStack() as stack:
+            contexts = [stack.enter_context(CaptureQueriesContext(conn)) for conn in connections.all()]
+            start = time.perf_counter()
+            response = call(client)
+            latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.status_code
+        # analyze_damage queries from worker threads: count those from Server-Timing
+        timing = QUERY_COUNT_RE.search(response.get('Server-Timing', ''))
+        queries.append(int(timing.group(1)) if timing else sum(len(context) for context in contexts))
+    return {
+        'queries': round(statistics.mean(queries), 2),
+        'p50_ms': round(statistics.median(latencies) * 1e3, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--policies', type=int, default=200)
+    parser.add_argument('--clauses', type=int, default=10, help='clauses per policy')
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    seed(args, random.Random(0))
+    get_clause_index().search('bumper damage')
+
+    start = time.perf_counter()
+    reference.load_reference_data(0)
+    load_ms = (time.perf_counter() - start) * 1e3
+    tracemalloc.start()
+    snapshot = reference.load_reference_data(0)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del snapshot
+
+    client = Client()
+    results = {
+        'snapshot': {
+            'rows': {'damage_types': DamageType.objects.count(), 'policies': args.policies,
+                     'clauses': args.policies * args.clauses},
+            'load_ms': round(load_ms, 2),
+            'memory_kib': round(size / 1024),
+        },
+        'endpoints': {
+            name: {
+                'warm': measure(client, call, args.requests, reload=False),
+                'reload': measure(client, call, max(args.requests // 10, 1), reload=True),
+            }
+            for name, call in REQUESTS.items()
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
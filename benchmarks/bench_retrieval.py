@@ -0,0 +1,81 @@
+"""
+Benchmark: BM25 RetrievalIndex build, save/load and query latency.
+
+Usage:
+    python benchmarks/bench_retrieval.py [--intents 10000]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+setup_django()
+
+import numpy as np  # noqa: E402
+
+from chat.retrieval import RetrievalIndex  # noqa: E402
+from chat.views import KNOWLEDGE_BASE  # noqa: E402
+
+
+def synthetic_knowledge_base(intents, rng, vocabulary_size=30000):
+    vocabulary = [
+        ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+        for _ in range(vocabulary_size)
+    ]
+    kb = dict(KNOWLEDGE_BASE)
+    for i in range(intents):
+        kb[f'intent_{i}'] = {
+            'keywords': [' '.join(rng.choices(vocabulary, k=2)) for _ in range(6)],
+            'response': ' '.join(rng.choices(vocabulary, k=rng.randint(40, 120))),
+        }
+    return kb, vocabulary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--intents', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    kb, vocabulary = synthetic_knowledge_base(args.intents, rng)
+
+    start = time.perf_counter()
+    index = RetrievalIndex.build(kb)
+    build = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'chat_index.npz')
+        index.save(path)
+        size = os.path.getsize(path)
+        start = time.perf_counter()
+        loaded = RetrievalIndex.load(path)
+        load = time.perf_counter() - start
+
+    queries = [' '.join(rng.choices(vocabulary, k=rng.randint(3, 10))) for _ in range(args.queries)]
+    for query in queries[:50]:
+        assert index.search(query) == loaded.search(query)
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        loaded.search(query, k=5)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1e6
+
+    print(f'{len(index)} intents, {len(index.vocabulary)} terms, {len(index.doc_ids)} postings')
+    print(f'  build       {build * 1e3:9.1f} ms')
+    print(f'  load        {load * 1e3:9.1f} ms ({size / 1e6:.1f} MB on disk)')
+    for pct in (50, 95, 99):
+        print(f'  query p{pct:<3}  {np.percentile(latencies, pct):9.1f} us')
+
+
+if __name__ == '__main__':
+    main()
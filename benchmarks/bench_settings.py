@@ -0,0 +1,9 @@
+"""Settings for benchmark servers: the project settings on a scratch database."""
+import os
+
+from insurance_ai_agent.settings import *  # noqa: F401,F403
+from insurance_ai_agent.settings import DATABASES
+
+DEBUG = False
+for alias in DATABASES.values():
+    alias['NAME'] = os.environ['BENCH_DATABASE']
@@ -0,0 +1,146 @@
+"""
+Benchmark: concurrent chat writes and history reads on SQLite, stock
+connection settings vs. the tuned profile (core/db.py).
+
+Forks writer processes posting chat messages and reader processes paging
+through chat history, all through the real views with the test client,
+against one database file. "stock" is the old setup: rollback journal,
+default pragmas, a new connection per request and reads on the default
+alias. "tuned" uses SQLITE_PRAGMAS (WAL, synchronous=normal,
+busy_timeout, mmap/cache), persistent connections and the read-only
+alias.
+
+Usage:
+    python benchmarks/bench_sqlite_contention.py [--writers 4] [--readers 4] [--seconds 10]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+TEMPLATE = os.path.join(_tmp.name, 'template.sqlite3')
+setup_django(database=TEMPLATE)
+
+from django.conf import settings  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from chat.persistence import save_turns  # noqa: E402
+from chat.views import get_bot_response  # noqa: E402
+from loadgen import percentile  # noqa: E402
+
+PROFILES = {
+    'stock': {'pragmas': {}, 'read_alias': 'default', 'conn_max_age': 0, 'journal_mode': 'delete'},
+    'tuned': {'pragmas': settings.SQLITE_PRAGMAS, 'read_alias': 'readonly', 'conn_max_age': 600,
+              'journal_mode': 'wal'},
+}
+SEED_SESSIONS = 20
+
+
+def prepare(profile, path):
+    """Copy the seeded template and put it in the profile's journal mode"""
+    shutil.copyfile(TEMPLATE, path)
+    db = sqlite3.connect(path)
+    db.execute(f"PRAGMA journal_mode = {PROFILES[profile]['journal_mode']}")
+    db.close()
+
+
+def worker(profile, path, role, number, seconds, results):
+    config = PROFILES[profile]
+    settings.SQLITE_PRAGMAS = config['pragmas']
+    settings.READ_DATABASE_ALIAS = config['read_alias']
+    for alias in connections.settings.values():
+        alias['NAME'] = path
+        alias['CONN_MAX_AGE'] = config['conn_max_age']
+
+    client = Client()
+    latencies, errors, index = [], 0, 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if role == 'write':
+            response = client.post(
+                '/api/chat/message/',
+                json.dumps({'session_id': f'writer-{number}-{index % 5}', 'message': 'what documents are needed'}),
+                content_type='application/json',
+            )
+        else:
+            response = client.get(f'/api/chat/history/seed-{(number + index) % SEED_SESSIONS}/?limit=50')
+        if not config['conn_max_age']:
+            # The test client skips close_old_connections; do what a real
+            # server does at the end of each request with CONN_MAX_AGE = 0
+            connections.close_all()
+        latencies.append(time.perf_counter() - start)
+        if response.status_code >= 500:
+            errors += 1
+        index += 1
+    results.put((role, latencies, errors))
+
+
+def run_profile(profile, args):
+    path = os.path.join(_tmp.name, f'{profile}.sqlite3')
+    prepare(profile, path)
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker, args=(profile, path, role, number, args.seconds, results))
+        for role, count in (('write', args.writers), ('read', args.readers))
+        for number in range(count)
+    ]
+    for process in processes:
+        process.start()
+    collected = {'write': ([], 0), 'read': ([], 0)}
+    for _ in processes:
+        role, latencies, errors = results.get()
+        previous, previous_errors = collected[role]
+        collected[role] = (previous + latencies, previous_errors + errors)
+    for process in processes:
+        process.join()
+
+    summary = {}
+    for role, (latencies, errors) in collected.items():
+        summary[role] = {
+            'requests': len(latencies),
+            'errors': errors,
+            'per_sec': round(len(latencies) / args.seconds, 1),
+            'p50_ms': round(percentile(latencies, 50) * 1e3, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1e3, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1e3, 2),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    now = timezone.now()
+    save_turns([
+        (f'seed-{session}', f'question {i}', f'answer {i}', now)
+        for session in range(SEED_SESSIONS) for i in range(100)
+    ])
+    get_bot_response('warm up the intent matcher and retrieval index')
+    with connections['default'].cursor() as cursor:
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    connections.close_all()
+
+    multiprocessing.set_start_method('fork')
+    results = {profile: run_profile(profile, args) for profile in PROFILES}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: bytes transferred and estimated first paint for the home page's
+static assets, before and after the build_static pipeline.
+
+"before" is the old setup: the plain files served as they are from
+STATICFILES_DIRS (Django's static view), so each page view downloads them
+uncompressed on a cold cache and revalidates them with a conditional
+request on a warm one. "after" runs ``build_static`` into a scratch
+STATIC_ROOT and fetches the hashed URLs the page links to through
+StaticFilesMiddleware: minified, precompressed, and cached as immutable,
+so a warm view requests nothing.
+
+First paint is estimated, not measured in a browser: the page is
+render-blocking on its stylesheet, so it is modelled as connection setup
+plus the HTML plus the CSS, each costing a round trip and its bytes over
+the link, for a few typical network profiles. The server time to serve
+each asset through the full middleware stack is measured with the test
+client.
+
+Usage:
+    python benchmarks/bench_static_assets.py [--requests 500]
+"""
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import setup_django  # noqa: E402
+
+_tmp = tempfile.TemporaryDirectory()
+setup_django(database=os.path.join(_tmp.name, 'bench.sqlite3'))
+
+from django.conf import settings  # noqa: E402
+
+settings.STATIC_ROOT = os.path.join(_tmp.name, 'staticfiles')
+settings.DEBUG = False
+settings.ALLOWED_HOSTS = ['*']
+
+from django.contrib.staticfiles import finders  # noqa: E402
+from django.contrib.staticfiles.storage import staticfiles_storage  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.test import Client, RequestFactory  # noqa: E402
+from django.views.static import serve  # noqa: E402
+
+ASSET_RE = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+ACCEPT_ENCODING = 'gzip, deflate, br'
+# name: (downlink bits/s, round trip seconds)
+NETWORKS = {
+    'slow-3g': (400e3, 0.4),
+    '4g': (9e6, 0.17),
+    'cable': (50e6, 0.028),
+}
+
+
+def body_bytes(response):
+    return sum(len(chunk) for chunk in response) if response.streaming else len(response.content)
+
+
+def before(plain_name, factory):
+    """The old serving path: the plain file from STATICFILES_DIRS, uncompressed"""
+    path = finders.find(plain_name)
+    request = factory.get('/static/' + plain_name, HTTP_ACCEPT_ENCODING=ACCEPT_ENCODING)
+    response = serve(request, os.path.basename(path), document_root=os.path.dirname(path))
+    return response, body_bytes(response)
+
+
+def after(url, client):
+    response = client.get(url, HTTP_ACCEPT_ENCODING=ACCEPT_ENCODING)
+    return response, body_bytes(response)
+
+
+def per_request_us(call, requests):
+    call()
+    start = time.perf_counter()
+    for _ in range(requests):
+        call()
+    return round((time.perf_counter() - start) / requests * 1e6, 1)
+
+
+def first_paint(html_bytes, css_bytes, css_requests, network):
+    """TCP + TLS setup, the HTML, then the stylesheets in parallel"""
+    bandwidth, rtt = network
+    seconds = 3 * rtt + html_bytes * 8 / bandwidth
+    if css_requests:
+        seconds += rtt + css_bytes * 8 / bandwidth
+    return round(seconds * 1e3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=500, help='requests per asset for the serving time')
+    args = parser.parse_args()
+
+    call_command('build_static', stdout=io.StringIO())
+    client = Client()
+    factory = RequestFactory()
+    page = client.get('/')
+    html_bytes = len(page.content)
+    urls = ASSET_RE.findall(page.content.decode())
+    manifest = {f'/static/{hashed}': name for name, hashed in staticfiles_storage.hashed_files.items()}
+
+    assets, totals = {}, {'before': 0, 'after': 0, 'before_css': 0, 'after_css': 0}
+    for url in urls:
+        plain_name = manifest[url]
+        old, old_bytes = before(plain_name, factory)
+        new, new_bytes = after(url, client)
+        assets[plain_name] = {
+            'before_bytes': old_bytes,
+            'after_bytes': new_bytes,
+            'after_encoding': new.get('Content-Encoding', 'identity'),
+            'after_cache_control': new['Cache-Control'],
+            'after_server_us': per_request_us(lambda: after(url, client), args.requests),
+        }
+        totals['before'] += old_bytes
+        totals['after'] += new_bytes
+        if plain_name.endswith('.css'):
+            totals['before_css'] += old_bytes
+            totals['after_css'] += new_bytes
+    css_requests = sum(name.endswith('.css') for name in assets)
+
+    results = {
+        'html_bytes': html_bytes,
+        'assets': assets,
+        'cold_view_bytes': {'before': totals['before'], 'after': totals['after']},
+        'warm_view_requests': {'before': len(assets), 'after': 0},
+        'first_paint_ms': {
+            name: {
+                'cold_before': first_paint(html_bytes, totals['before_css'], css_requests, network),
+                'cold_after': first_paint(html_bytes, totals['after_css'], css_requests, network),
+                # Warm: the stylesheet is cached; "before" still revalidates it
+                'warm_before': first_paint(html_bytes, 0, css_requests, network),
+                'warm_after': first_paint(html_bytes, 0, 0, network),
+            }
+            for name, network in NETWORKS.items()
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""Shared setup for the benchmark scripts."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django(database=None):
+    """
+    Configure Django for a benchmark run.
+
+    ``database`` points the default alias at a scratch SQLite file and
+    creates the schema there, so benchmarks never touch db.sqlite3.
+    """
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'insurance_ai_agent.settings')
+    # Measure the production database profile (see SQLITE_TUNING in settings)
+    os.environ.setdefault('DJANGO_SQLITE_TUNING', '1')
+
+    import django
+    from django.conf import settings
+
+    if database:
+        # Every alias: the read-only one points at the same file
+        for alias in settings.DATABASES.values():
+            alias['NAME'] = database
+    django.setup()
+
+    if database:
+        from django.core.management import call_command
+        call_command('migrate', run_syncdb=True, verbosity=0)
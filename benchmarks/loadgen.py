@@ -0,0 +1,135 @@
+"""
+Minimal asyncio HTTP/1.1 load generator for benchmarks against a live server.
+
+Each simulated client opens a fresh connection per request (``Connection:
+close``) so results are not skewed by keep-alive support differences
+between servers.
+"""
+import asyncio
+import json
+import socket
+import time
+
+
+class Request:
+    """
+    A request template: method, path, optional body. A ``bytes`` body is
+    sent as is with ``content_type``; anything else is sent as JSON.
+    """
+
+    def __init__(self, method, path, body=None, headers=None, content_type=None):
+        self.method = method
+        self.path = path
+        if isinstance(body, bytes):
+            self.body = body
+        else:
+            self.body = json.dumps(body).encode() if body is not None else b''
+        self.content_type = content_type or 'application/json'
+        self.headers = headers or {}
+
+    def encode(self, host):
+        lines = [
+            f'{self.method} {self.path} HTTP/1.1',
+            f'Host: {host}',
+            'Connection: close',
+            f'Content-Length: {len(self.body)}',
+        ]
+        if self.body:
+            lines.append(f'Content-Type: {self.content_type}')
+        lines.extend(f'{name}: {value}' for name, value in self.headers.items())
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode() + self.body
+
+
+def multipart(fields, files, boundary='loadgen-boundary'):
+    """
+    Encode form ``fields`` ({name: value}) and ``files`` ({name: (filename,
+    bytes, content type)}) as multipart/form-data; returns (body, content type)
+    """
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, content, content_type) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'.encode() + content + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+async def fetch(host, port, payload):
+    """Send one raw request and return (status, seconds)"""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(payload)
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+    finally:
+        writer.close()
+    parts = status_line.split()
+    status = int(parts[1]) if len(parts) > 1 else 0
+    return status, time.perf_counter() - start
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _run(host, port, make_request, clients, requests_per_client):
+    latencies = []
+    errors = 0
+
+    async def client(client_id):
+        nonlocal errors
+        for i in range(requests_per_client):
+            request = make_request(client_id, i)
+            try:
+                status, elapsed = await fetch(host, port, request.encode(f'{host}:{port}'))
+            except OSError:
+                errors += 1
+                continue
+            if status >= 400 and status != 404:
+                errors += 1
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    wall = time.perf_counter() - start
+    return {
+        'clients': clients,
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_sec': round(len(latencies) / wall, 1) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1e3, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1e3, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1e3, 2),
+    }
+
+
+def run_load(host, port, make_request, clients=100, requests_per_client=10):
+    """
+    Drive ``clients`` concurrent clients, each sending ``requests_per_client``
+    requests built by ``make_request(client_id, index)``. Returns a summary
+    dict with throughput and latency percentiles.
+    """
+    return asyncio.run(_run(host, port, make_request, clients, requests_per_client))
+
+
+def wait_for_port(host, port, timeout=30):
+    """Block until something is listening on host:port"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server on {host}:{port} did not start')
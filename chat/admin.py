@@ -1,7 +1,6 @@
 from django.contrib import admin
+from django.db.models import Count
 from .models import ChatSession, ChatMessage
-from .models import DamageClaim, DamageType
-
 
 
 class ChatMessageInline(admin.TabularInline):
@@ -14,10 +13,15 @@ class ChatMessageInline(admin.TabularInline):
 class ChatSessionAdmin(admin.ModelAdmin):
     list_display = ['session_id', 'created_at', 'message_count']
     inlines = [ChatMessageInline]
-    
+
+    def get_queryset(self, request):
+        # One COUNT per page via GROUP BY instead of one query per row
+        return super().get_queryset(request).annotate(message_total=Count('messages'))
+
     def message_count(self, obj):
-        return obj.messages.count()
+        return obj.message_total
     message_count.short_description = 'Messages'
+    message_count.admin_order_field = 'message_total'
 
 
 @admin.register(ChatMessage)
@@ -28,17 +32,3 @@ class ChatMessageAdmin(admin.ModelAdmin):
     def content_preview(self, obj):
         return obj.content[:100] + '...' if len(obj.content) > 100 else obj.content
     content_preview.short_description = 'Content'
-
-@admin.register(DamageClaim)
-class DamageClaimAdmin(admin.ModelAdmin):
-    list_display = ['id', 'full_name', 'vehicle_number', 'detected_damage_type', 'status', 'created_at']
-    list_filter = ['status', 'vehicle_type', 'detected_damage_type']
-    search_fields = ['full_name', 'email', 'vehicle_number', 'insurance_policy_number']
-    readonly_fields = ['created_at', 'updated_at', 'ai_analysis', 'matched_clauses']
-
-
-@admin.register(DamageType)
-class DamageTypeAdmin(admin.ModelAdmin):
-    list_display = ['name', 'typically_covered']
-    list_filter = ['typically_covered']
-    search_fields = ['name', 'description']
@@ -0,0 +1,132 @@
+"""
+Response cache for the chat assistant.
+
+Messages are reduced to a normalized key (case, whitespace, punctuation,
+Devanagari digits and common Nepali/romanized spellings) and the resolved
+knowledge base intent is cached under that key. A bounded in-process LRU
+sits in front of an optional shared tier in Django's cache framework, and
+every key carries the knowledge base version so edits invalidate it.
+"""
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from django.core.cache import caches
+
+
+# Devanagari digits -> ASCII digits
+DEVANAGARI_DIGITS = str.maketrans('०१२३४५६७८९', '0123456789')
+
+# Whole-word spelling variants folded onto the form used in KNOWLEDGE_BASE
+WORD_VARIANTS = {
+    'नमस्ते': 'namaste',
+    'नमस्कार': 'namaste',
+    'namaskar': 'namaste',
+    'namasté': 'namaste',
+    'दाबी': 'claim',
+    'dabi': 'claim',
+    'daabi': 'claim',
+    'बीमा': 'insurance',
+    'bima': 'insurance',
+    'beema': 'insurance',
+    'कागजात': 'documents',
+    'kagajat': 'documents',
+    'kagaj': 'documents',
+    'प्रिमियम': 'premium',
+    'premiam': 'premium',
+    'मद्दत': 'help',
+    'maddat': 'help',
+}
+
+_MISSING = object()
+
+
+def normalize_message(message):
+    """Fold a chat message onto the canonical form used as its cache key"""
+    text = unicodedata.normalize('NFKC', message).casefold().translate(DEVANAGARI_DIGITS)
+    # Punctuation and symbols become word breaks; letters and combining
+    # marks (Devanagari vowel signs) are kept.
+    text = ''.join(
+        ' ' if unicodedata.category(char)[0] in 'PSZ' else char
+        for char in text
+    )
+    return ' '.join(WORD_VARIANTS.get(word, word) for word in text.split())
+
+
+class ResponseCache:
+    """Thread-safe LRU of normalized message -> intent with an optional shared tier"""
+
+    def __init__(self, maxsize=1024, version='', shared_alias=None, shared_timeout=3600):
+        self.maxsize = maxsize
+        self.version = version
+        self.shared_alias = shared_alias
+        self.shared_timeout = shared_timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_hits = 0
+
+    def _shared_key(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return f'chat:intent:{self.version}:{digest}'
+
+    def set_version(self, version):
+        """Switch to a new knowledge base version, dropping local entries"""
+        with self._lock:
+            self.version = version
+            self._entries.clear()
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, calling ``compute(key)`` on a miss"""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = _MISSING
+        if self.shared_alias:
+            # Intents are stored as '' when nothing matched so a cached miss
+            # can be told apart from an absent key.
+            stored = caches[self.shared_alias].get(self._shared_key(key), _MISSING)
+            if stored is not _MISSING:
+                value = stored or None
+                with self._lock:
+                    self.shared_hits += 1
+
+        if value is _MISSING:
+            value = compute(key)
+            if self.shared_alias:
+                caches[self.shared_alias].set(self._shared_key(key), value or '', self.shared_timeout)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.shared_hits = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'shared_hits': self.shared_hits,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'version': self.version,
+            }
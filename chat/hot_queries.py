@@ -0,0 +1,44 @@
+"""Hot chat queries checked by ``manage.py check_query_plans``"""
+from datetime import datetime, timezone
+
+from django.db.models import Q, Subquery
+
+from core.query_audit import hot_query
+
+from .models import ChatMessage, ChatSession
+
+
+@hot_query('chat.session.by_id')
+def session_by_id():
+    return ChatSession.objects.filter(session_id='session_abc')
+
+
+@hot_query('chat.history.first_page')
+def history_first_page():
+    return ChatMessage.objects.filter(session_id=1).values('id', 'message_type', 'content', 'timestamp')[:51]
+
+
+@hot_query('chat.history.after_cursor')
+def history_after_cursor():
+    cursor_time = ChatMessage.objects.filter(pk=10).values('timestamp')[:1]
+    return ChatMessage.objects.filter(session_id=1).filter(
+        Q(timestamp__gt=Subquery(cursor_time)) | Q(timestamp=Subquery(cursor_time), id__gt=10)
+    ).values('id', 'message_type', 'content', 'timestamp')[:51]
+
+
+@hot_query('chat.admin.messages', allow_scan='Time-ordered index scan that stops at the page size')
+def admin_messages():
+    return ChatMessage.objects.all()[:100]
+
+
+@hot_query('chat.admin.messages_filter_type')
+def admin_messages_filter_type():
+    return ChatMessage.objects.filter(message_type='user')[:100]
+
+
+@hot_query('chat.retention.idle_sessions')
+def retention_idle_sessions():
+    cutoff = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return ChatSession.objects.filter(updated_at__lt=cutoff).order_by('updated_at', 'id').values(
+        'id', 'session_id', 'created_at', 'updated_at'
+    )[:500]
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from chat.retention import EXTENSIONS, archive_idle_sessions, auto_vacuum_mode, compact_database
+
+
+class Command(BaseCommand):
+    help = 'Move chat sessions idle for more than N days into compressed archive files and compact the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'CHAT_RETENTION_DAYS', 90),
+            help='Archive sessions with no activity for this many days (defaults to CHAT_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=getattr(settings, 'CHAT_RETENTION_BATCH_SIZE', 200),
+            help='Sessions per archive file and delete transaction',
+        )
+        parser.add_argument('--compression', choices=sorted(EXTENSIONS), default=None)
+        parser.add_argument('--output-dir', default=None, help='Defaults to CHAT_ARCHIVE_DIR')
+        parser.add_argument('--pause', type=float, default=0.05,
+                            help='Seconds to sleep between batches so chat writes get the lock')
+        parser.add_argument(
+            '--vacuum', choices=['none', 'incremental', 'full'], default='incremental',
+            help="Compact afterwards; 'full' rewrites the file once and enables incremental vacuum",
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+        totals = archive_idle_sessions(
+            days=options['days'],
+            batch_size=options['batch_size'],
+            compression=options['compression'],
+            directory=options['output_dir'],
+            pause=options['pause'],
+            dry_run=options['dry_run'],
+            stdout=self.stdout,
+        )
+        verb = 'Would archive' if options['dry_run'] else 'Archived'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {totals['sessions']} sessions ({totals['messages']} messages) "
+            f"into {len(totals['files'])} files"
+        ))
+        if options['dry_run'] or not totals['sessions']:
+            return
+
+        mode = options['vacuum']
+        if mode == 'incremental' and auto_vacuum_mode() != 'incremental':
+            self.stdout.write(
+                'Skipping incremental vacuum: the database is not in incremental auto_vacuum mode '
+                '(run once with --vacuum full to enable it)'
+            )
+            return
+        pages = compact_database(mode)
+        if pages:
+            self.stdout.write(f'Database pages: {pages[0]} -> {pages[1]}')
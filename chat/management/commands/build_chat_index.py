@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chat.retrieval import RetrievalIndex
+from chat.views import KNOWLEDGE_BASE
+
+
+class Command(BaseCommand):
+    help = 'Build the chat retrieval index and save it for workers to load at startup'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=getattr(settings, 'CHAT_RETRIEVAL_INDEX_PATH', None),
+            help='Path of the .npz file to write (defaults to CHAT_RETRIEVAL_INDEX_PATH)',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        if not output:
+            self.stderr.write('No output path given and CHAT_RETRIEVAL_INDEX_PATH is not set')
+            return
+
+        index = RetrievalIndex.build(KNOWLEDGE_BASE)
+        index.save(output)
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {len(index)} intents ({len(index.vocabulary)} terms) to {output}'
+        ))
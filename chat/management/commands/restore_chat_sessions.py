@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from chat.models import ArchivedChatSession
+from chat.retention import restore_sessions
+
+
+class Command(BaseCommand):
+    help = 'Restore archived chat sessions into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('session_ids', nargs='*', help='Session ids to restore')
+        parser.add_argument('--archive', help='Restore every session archived in this file')
+        parser.add_argument('--input-dir', default=None, help='Defaults to CHAT_ARCHIVE_DIR')
+
+    def handle(self, *args, **options):
+        session_ids = list(options['session_ids'])
+        if options['archive']:
+            session_ids += ArchivedChatSession.objects.filter(
+                archive=options['archive']
+            ).values_list('session_id', flat=True)
+        restored = restore_sessions(session_ids, directory=options['input_dir'])
+        self.stdout.write(self.style.SUCCESS(f'Restored {restored} of {len(session_ids)} sessions'))
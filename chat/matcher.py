@@ -0,0 +1,98 @@
+"""
+Compiled keyword matcher for the chat knowledge base.
+
+An Aho-Corasick automaton is built once over every keyword of every intent,
+so a message is scanned in a single pass no matter how many keywords the
+knowledge base holds.
+"""
+from collections import deque, namedtuple
+
+
+# A single keyword hit. ``start``/``end`` index into the lowercased message
+# and ``priority`` is the keyword's position in knowledge base order.
+KeywordMatch = namedtuple('KeywordMatch', ['intent', 'keyword', 'start', 'end', 'priority'])
+
+
+class IntentMatcher:
+    """Aho-Corasick automaton over the keywords of a knowledge base"""
+
+    def __init__(self, knowledge_base):
+        # Keywords in the order the old nested loop visited them, so the
+        # lowest priority hit is the one the loop would have returned.
+        self.keywords = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for intent, data in knowledge_base.items():
+            for keyword in data['keywords']:
+                if keyword:
+                    self._insert(keyword, len(self.keywords))
+                    self.keywords.append((intent, keyword))
+        self._build_failure_links()
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def _insert(self, keyword, priority):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] += (priority,)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Inherit the hits of the longest proper suffix state
+                self._output[child] += self._output[self._fail[child]]
+
+    def _scan(self, text):
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                yield index + 1, output[state]
+
+    def find_all(self, message):
+        """Return every keyword hit in the message, in order of position"""
+        text = message.lower()
+        matches = []
+        for end, priorities in self._scan(text):
+            for priority in priorities:
+                intent, keyword = self.keywords[priority]
+                matches.append(KeywordMatch(intent, keyword, end - len(keyword), end, priority))
+        return matches
+
+    def match(self, message):
+        """Return the highest priority hit, or None if nothing matches"""
+        best_priority = None
+        best_end = None
+        for end, priorities in self._scan(message.lower()):
+            priority = min(priorities)
+            if best_priority is None or priority < best_priority:
+                best_priority, best_end = priority, end
+                if priority == 0:
+                    break
+
+        if best_priority is None:
+            return None
+        intent, keyword = self.keywords[best_priority]
+        return KeywordMatch(intent, keyword, best_end - len(keyword), best_end, best_priority)
@@ -1,67 +1,55 @@
 from django.db import models
-from core.models import InsurancePolicy
+from django.utils import timezone
 
 
-class DamageClaim(models.Model):
-    """Model for insurance claims"""
-    STATUS_CHOICES = [
-        ('pending', 'Pending Review'),
-        ('eligible', 'Eligible for Claim'),
-        ('not_eligible', 'Not Eligible'),
-        ('needs_info', 'Needs More Information'),
-    ]
+class ChatSession(models.Model):
+    """Model for a chat conversation with the AI assistant"""
+    session_id = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Retention: finds sessions idle since a cutoff (chat.retention)
+            models.Index(fields=['updated_at', 'id'], name='chat_session_idle_idx'),
+        ]
     
-    VEHICLE_TYPES = [
-        ('car', 'Car'),
-        ('motorcycle', 'Motorcycle'),
-        ('truck', 'Truck'),
-        ('bus', 'Bus'),
-        ('other', 'Other'),
+    def __str__(self):
+        return f"Session {self.session_id}"
+
+
+class ChatMessage(models.Model):
+    """Model for a single message within a chat session"""
+    MESSAGE_TYPES = [
+        ('user', 'User'),
+        ('bot', 'Bot'),
     ]
     
-    # User information
-    full_name = models.CharField(max_length=200)
-    email = models.EmailField()
-    phone = models.CharField(max_length=20)
-    
-    # Vehicle information
-    vehicle_type = models.CharField(max_length=20, choices=VEHICLE_TYPES, default='car')
-    vehicle_number = models.CharField(max_length=50)
-    insurance_policy_number = models.CharField(max_length=100, blank=True)
+    session = models.ForeignKey(ChatSession, on_delete=models.CASCADE, related_name='messages')
+    message_type = models.CharField(max_length=10, choices=MESSAGE_TYPES)
+    content = models.TextField()
+    timestamp = models.DateTimeField(default=timezone.now)
     
-    # Policy reference
-    policy = models.ForeignKey(InsurancePolicy, on_delete=models.SET_NULL, null=True, blank=True)
-    
-    # Damage information
-    damage_description = models.TextField()
-    damage_image = models.ImageField(upload_to='claims/damage_images/')
-    detected_damage_type = models.CharField(max_length=100, blank=True)
-    damage_severity = models.CharField(max_length=20, blank=True)
-    
-    # AI Analysis
-    ai_analysis = models.JSONField(default=dict, blank=True)
-    matched_clauses = models.JSONField(default=list, blank=True)
-    
-    # Claim status
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
-    eligibility_reason = models.TextField(blank=True)
-    estimated_coverage = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
-    
-    # Timestamps
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    class Meta:
+        ordering = ['timestamp', 'id']
+        indexes = [
+            models.Index(fields=['session', 'timestamp'], name='chat_msg_session_time_idx'),
+            # Admin list (default ordering), optionally filtered by type
+            models.Index(fields=['timestamp', 'id'], name='chat_msg_time_idx'),
+            models.Index(fields=['message_type', 'timestamp', 'id'], name='chat_msg_type_time_idx'),
+        ]
     
     def __str__(self):
-        return f"Claim #{self.id} - {self.full_name} - {self.vehicle_number}"
+        return f"{self.get_message_type_display()}: {self.content[:50]}"
 
 
-class DamageType(models.Model):
-    """Model for predefined damage types"""
-    name = models.CharField(max_length=100)
-    description = models.TextField()
-    common_causes = models.JSONField(default=list)
-    typically_covered = models.BooleanField(default=True)
-    required_documents = models.JSONField(default=list)
-    
+class ArchivedChatSession(models.Model):
+    """Where an idle session's messages went when retention archived it"""
+    session_id = models.CharField(max_length=100, unique=True)
+    archive = models.CharField(max_length=255, help_text='Archive file, relative to CHAT_ARCHIVE_DIR')
+    message_count = models.PositiveIntegerField(default=0)
+    last_activity = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
     def __str__(self):
-        return self.name
+        return f"Archived session {self.session_id}"
@@ -0,0 +1,179 @@
+"""
+Persistence for chat turns.
+
+A turn (session upsert, user message, bot message) is written in a single
+transaction with one bulk INSERT for both messages, so SQLite commits and
+fsyncs once per turn instead of three or four times.
+
+Write-behind mode (``CHAT_WRITE_BEHIND_ENABLED``) goes further: turns are
+queued in memory and flushed in batches when ``CHAT_WRITE_BEHIND_BATCH_SIZE``
+turns are pending or every ``CHAT_WRITE_BEHIND_INTERVAL`` seconds.
+
+Durability trade-off: a queued turn exists only in this process until its
+batch commits. If the worker crashes or is killed (SIGKILL, OOM) up to one
+batch / interval worth of turns is lost, and other workers will not see
+those messages in chat history until the flush. Graceful shutdown flushes
+the queue via ``atexit``. Leave write-behind off if every turn must be
+durable before the response is returned.
+
+A turn for a session that retention archived restores the archived
+messages first (``chat.retention.restore_sessions``), so the session
+continues instead of starting over without its history.
+"""
+import atexit
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ArchivedChatSession, ChatSession, ChatMessage
+from .retention import restore_sessions
+
+
+def save_turn(session_id, user_message, bot_response):
+    """Atomically upsert the session and store both messages of a turn"""
+    now = timezone.now()
+    with transaction.atomic():
+        # Write before reading: SQLite then takes the write lock up front and
+        # waits for busy writers, instead of failing a read->write upgrade
+        # with "database is locked".
+        if ChatSession.objects.filter(session_id=session_id).update(updated_at=now):
+            session_pk = ChatSession.objects.values_list('pk', flat=True).get(session_id=session_id)
+        elif ArchivedChatSession.objects.filter(session_id=session_id).exists():
+            restore_sessions([session_id])
+            session_pk = ChatSession.objects.values_list('pk', flat=True).get(session_id=session_id)
+        else:
+            session_pk = ChatSession.objects.create(session_id=session_id).pk
+        ChatMessage.objects.bulk_create([
+            ChatMessage(session_id=session_pk, message_type='user', content=user_message, timestamp=now),
+            ChatMessage(session_id=session_pk, message_type='bot', content=bot_response, timestamp=now),
+        ])
+    return session_pk
+
+
+def save_turns(turns):
+    """Store many (session_id, user_message, bot_response, timestamp) turns in one transaction"""
+    if not turns:
+        return
+    session_ids = {turn[0] for turn in turns}
+    with transaction.atomic():
+        # Write first for the same locking reason as save_turn()
+        ChatSession.objects.filter(session_id__in=session_ids).update(updated_at=timezone.now())
+        sessions = dict(
+            ChatSession.objects.filter(session_id__in=session_ids).values_list('session_id', 'pk')
+        )
+        missing = session_ids - sessions.keys()
+        if missing:
+            # Sessions retention archived come back with their old messages
+            archived = set(
+                ArchivedChatSession.objects.filter(session_id__in=missing).values_list('session_id', flat=True)
+            )
+            if archived:
+                restore_sessions(archived)
+            ChatSession.objects.bulk_create(
+                [ChatSession(session_id=session_id) for session_id in missing - archived],
+                ignore_conflicts=True,
+            )
+            sessions.update(
+                ChatSession.objects.filter(session_id__in=missing).values_list('session_id', 'pk')
+            )
+
+        messages = []
+        for session_id, user_message, bot_response, timestamp in turns:
+            session_pk = sessions[session_id]
+            messages.append(ChatMessage(
+                session_id=session_pk, message_type='user', content=user_message, timestamp=timestamp
+            ))
+            messages.append(ChatMessage(
+                session_id=session_pk, message_type='bot', content=bot_response, timestamp=timestamp
+            ))
+        ChatMessage.objects.bulk_create(messages)
+
+
+class TurnBuffer:
+    """In-memory write-behind queue of chat turns, flushed in batches"""
+
+    def __init__(self, batch_size=100, interval=1.0):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, session_id, user_message, bot_response):
+        """Queue a turn; flushes inline once the batch size is reached"""
+        with self._lock:
+            self._pending.append((session_id, user_message, bot_response, timezone.now()))
+            full = len(self._pending) >= self.batch_size
+            if not full and self._timer is None and self.interval:
+                self._timer = threading.Timer(self.interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write every queued turn; returns the number of turns written"""
+        with self._flush_lock:
+            with self._lock:
+                turns, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            try:
+                save_turns(turns)
+            except Exception:
+                # Put the batch back so the next flush retries it
+                with self._lock:
+                    self._pending[:0] = turns
+                raise
+            return len(turns)
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        finally:
+            # Timer threads get their own connection; don't leak it
+            connection.close()
+
+
+TURN_BUFFER = None
+if getattr(settings, 'CHAT_WRITE_BEHIND_ENABLED', False):
+    TURN_BUFFER = TurnBuffer(
+        batch_size=getattr(settings, 'CHAT_WRITE_BEHIND_BATCH_SIZE', 100),
+        interval=getattr(settings, 'CHAT_WRITE_BEHIND_INTERVAL', 1.0),
+    )
+    atexit.register(TURN_BUFFER.flush)
+
+
+def record_turn(session_id, user_message, bot_response):
+    """Persist a turn now, or queue it when write-behind is enabled"""
+    if TURN_BUFFER is not None:
+        TURN_BUFFER.add(session_id, user_message, bot_response)
+    else:
+        save_turn(session_id, user_message, bot_response)
+
+
+def flush_pending_turns():
+    """Flush queued turns so reads in this process see them"""
+    if TURN_BUFFER is not None and len(TURN_BUFFER):
+        TURN_BUFFER.flush()
+
+
+async def arecord_turn(session_id, user_message, bot_response):
+    """Async record_turn(); the transaction runs in Django's sync thread"""
+    await sync_to_async(record_turn)(session_id, user_message, bot_response)
+
+
+async def aflush_pending_turns():
+    """Async flush_pending_turns() that skips the thread hop when nothing is queued"""
+    if TURN_BUFFER is not None and len(TURN_BUFFER):
+        await sync_to_async(TURN_BUFFER.flush)()
@@ -0,0 +1,232 @@
+"""
+Chat retention: archive idle sessions to compressed NDJSON and compact.
+
+``archive_idle_sessions`` moves sessions whose ``updated_at`` is older than
+``CHAT_RETENTION_DAYS`` out of the database in batches of
+``CHAT_RETENTION_BATCH_SIZE``. Each batch is written to its own archive
+file in ``CHAT_ARCHIVE_DIR`` (one JSON line per session, messages
+included), fsynced and renamed into place, and only then deleted in a
+short transaction, so a crash can leave a session archived twice but never
+lose one. Sessions that receive a new message between the read and the
+delete are kept (the delete re-checks ``updated_at``).
+
+Archives are gzip by default; ``CHAT_ARCHIVE_COMPRESSION = 'zstd'`` needs
+the ``zstandard`` package. ``ArchivedChatSession`` records which file holds
+each session so ``restore_sessions`` reads a single file per batch;
+``get_chat_history`` restores an archived session on demand.
+
+Deleting rows leaves free pages in the SQLite file; ``compact_database``
+returns them with ``incremental_vacuum`` (or a full ``VACUUM``, which also
+switches the file to incremental auto-vacuum for later runs).
+"""
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ArchivedChatSession, ChatMessage, ChatSession
+
+logger = logging.getLogger(__name__)
+
+
+EXTENSIONS = {'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst'}
+
+
+def archive_dir():
+    return str(getattr(settings, 'CHAT_ARCHIVE_DIR', 'chat_archive'))
+
+
+def open_archive(path, mode):
+    """Open an archive file for text reading ('rt') or writing ('wt') by its extension"""
+    if path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImproperlyConfigured('zstd chat archives need the zstandard package')
+        return zstandard.open(path, mode, encoding='utf-8')
+    return gzip.open(path, mode, encoding='utf-8')
+
+
+def _idle_batch(cutoff, batch_size):
+    return list(
+        ChatSession.objects.filter(updated_at__lt=cutoff).order_by('updated_at', 'id')
+        .values('id', 'session_id', 'created_at', 'updated_at')[:batch_size]
+    )
+
+
+def _write_archive(sessions, compression, directory):
+    """Write one batch of sessions with their messages; returns (file name, {session pk: message count})"""
+    by_pk = {session['id']: dict(session, messages=[]) for session in sessions}
+    messages = (
+        ChatMessage.objects.filter(session_id__in=by_pk).order_by('session_id', 'timestamp', 'id')
+        .values_list('session_id', 'message_type', 'content', 'timestamp')
+        .iterator(chunk_size=2000)
+    )
+    for session_pk, message_type, content, timestamp in messages:
+        by_pk[session_pk]['messages'].append(
+            {'type': message_type, 'content': content, 'timestamp': timestamp.isoformat()}
+        )
+
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%S')
+    name = f'chat-{stamp}-{sessions[0]["id"]}{EXTENSIONS[compression]}'
+    path = os.path.join(directory, name)
+    partial = path + '.part'
+    with open_archive(partial, 'wt') as f:
+        for session in by_pk.values():
+            f.write(json.dumps({
+                'session_id': session['session_id'],
+                'created_at': session['created_at'].isoformat(),
+                'updated_at': session['updated_at'].isoformat(),
+                'messages': session['messages'],
+            }) + '\n')
+    # The archive must be on disk before the rows it replaces are deleted
+    with open(partial, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+    return name, {pk: len(session['messages']) for pk, session in by_pk.items()}
+
+
+def archive_idle_sessions(days=None, batch_size=None, compression=None, directory=None,
+                          pause=0.0, dry_run=False, stdout=None):
+    """
+    Archive and delete sessions idle for more than ``days``.
+    Returns {'sessions': n, 'messages': n, 'files': [...]}.
+    """
+    if days is None:
+        days = getattr(settings, 'CHAT_RETENTION_DAYS', 90)
+    if batch_size is None:
+        batch_size = getattr(settings, 'CHAT_RETENTION_BATCH_SIZE', 200)
+    compression = compression or getattr(settings, 'CHAT_ARCHIVE_COMPRESSION', 'gzip')
+    if compression not in EXTENSIONS:
+        raise ImproperlyConfigured(f'Unknown chat archive compression: {compression}')
+    directory = directory or archive_dir()
+    cutoff = timezone.now() - timedelta(days=days)
+
+    if dry_run:
+        sessions = ChatSession.objects.filter(updated_at__lt=cutoff)
+        return {
+            'sessions': sessions.count(),
+            'messages': ChatMessage.objects.filter(session__in=sessions).count(),
+            'files': [],
+        }
+
+    os.makedirs(directory, exist_ok=True)
+    totals = {'sessions': 0, 'messages': 0, 'files': []}
+    while True:
+        sessions = _idle_batch(cutoff, batch_size)
+        if not sessions:
+            break
+        name, message_counts = _write_archive(sessions, compression, directory)
+
+        # One short write transaction per batch, so chat writers only ever
+        # wait for a single batch. Sessions that became active again since
+        # the read stay (their copy in the file is never restored) and no
+        # longer match the batch query.
+        ids = [session['id'] for session in sessions]
+        with transaction.atomic():
+            # Write first so SQLite takes the write lock up front (see
+            # chat.persistence.save_turn)
+            ChatMessage.objects.filter(session_id__in=ids, session__updated_at__lt=cutoff).delete()
+            archived = set(
+                ChatSession.objects.filter(pk__in=ids, updated_at__lt=cutoff).values_list('pk', flat=True)
+            )
+            ChatSession.objects.filter(pk__in=archived).delete()
+            ArchivedChatSession.objects.bulk_create([
+                ArchivedChatSession(
+                    session_id=session['session_id'], archive=name,
+                    message_count=message_counts[session['id']], last_activity=session['updated_at'],
+                )
+                for session in sessions if session['id'] in archived
+            ], update_conflicts=True, unique_fields=['session_id'],
+                update_fields=['archive', 'message_count', 'last_activity'])
+
+        message_count = sum(message_counts[pk] for pk in archived)
+        totals['sessions'] += len(archived)
+        totals['messages'] += message_count
+        totals['files'].append(name)
+        if stdout:
+            stdout.write(f'{name}: {len(archived)} sessions, {message_count} messages')
+        if pause:
+            time.sleep(pause)
+    return totals
+
+
+def restore_sessions(session_ids, directory=None):
+    """
+    Bring archived sessions back into the database, merging into any live
+    session with the same id. Returns the number of sessions restored.
+
+    Sessions whose archive file is gone come back empty (with a warning)
+    instead of failing every request for them.
+    """
+    directory = directory or archive_dir()
+    records = {}
+    for record in ArchivedChatSession.objects.filter(session_id__in=list(session_ids)):
+        records.setdefault(record.archive, set()).add(record.session_id)
+
+    restored = 0
+    for name, wanted in records.items():
+        path = os.path.join(directory, name)
+        try:
+            with open_archive(path, 'rt') as f:
+                entries = [entry for entry in map(json.loads, f) if entry['session_id'] in wanted]
+        except FileNotFoundError:
+            logger.warning('Chat archive %s is missing; restoring %s without messages',
+                           path, ', '.join(sorted(wanted)))
+            entries = [{'session_id': session_id, 'created_at': None, 'messages': []} for session_id in wanted]
+        with transaction.atomic():
+            # Claim the records first (a write, so the lock is taken up
+            # front); a concurrent restore of the same batch then finds none
+            claimed, _ = ArchivedChatSession.objects.filter(archive=name, session_id__in=wanted).delete()
+            if not claimed:
+                continue
+            for entry in entries:
+                session, created = ChatSession.objects.get_or_create(session_id=entry['session_id'])
+                if created and entry['created_at']:
+                    ChatSession.objects.filter(pk=session.pk).update(
+                        created_at=parse_datetime(entry['created_at']),
+                    )
+                ChatMessage.objects.bulk_create([
+                    ChatMessage(session=session, message_type=message['type'], content=message['content'],
+                                timestamp=parse_datetime(message['timestamp']))
+                    for message in entry['messages']
+                ], batch_size=1000)
+        restored += len(entries)
+    return restored
+
+
+def compact_database(mode='incremental'):
+    """
+    Return free pages to the filesystem after archiving (SQLite only).
+    'incremental' needs auto_vacuum=INCREMENTAL on the file; 'full' runs
+    VACUUM once and turns it on. Returns (pages before, pages after).
+    """
+    if connection.vendor != 'sqlite' or mode == 'none':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA page_count')
+        before = cursor.fetchone()[0]
+        if mode == 'full':
+            # Takes effect with this VACUUM; rewrites the whole file
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            cursor.execute('VACUUM')
+        else:
+            cursor.execute('PRAGMA incremental_vacuum')
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        cursor.execute('PRAGMA page_count')
+        after = cursor.fetchone()[0]
+    return before, after
+
+
+def auto_vacuum_mode():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA auto_vacuum')
+        return {0: 'none', 1: 'full', 2: 'incremental'}[cursor.fetchone()[0]]
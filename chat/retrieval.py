@@ -0,0 +1,218 @@
+"""
+BM25 retrieval over the chat knowledge base.
+
+Each intent (its keywords plus response text) is indexed once into a
+term-major sparse matrix held in flat NumPy arrays. A query is scored
+against every intent with a single sparse matrix-vector product, which
+keeps lookups well under a millisecond even at ~10k intents. The index can
+be saved to an ``.npz`` file so workers load it instead of rebuilding.
+"""
+import hashlib
+import json
+import re
+from collections import Counter, defaultdict, namedtuple
+
+import numpy as np
+
+
+TOKEN_RE = re.compile(r'\w+')
+
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'for',
+    'from', 'how', 'i', 'if', 'in', 'is', 'it', 'me', 'my', 'of', 'on', 'or',
+    'our', 'so', 'that', 'the', 'this', 'to', 'was', 'we', 'what', 'when',
+    'which', 'who', 'why', 'will', 'with', 'you', 'your',
+])
+
+RetrievalHit = namedtuple('RetrievalHit', ['intent', 'score', 'confidence'])
+
+
+def tokenize(text):
+    """Lowercase word tokens with stop words removed and plurals folded"""
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def knowledge_base_fingerprint(knowledge_base):
+    """Stable hash of the knowledge base contents"""
+    payload = json.dumps(knowledge_base, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class RetrievalIndex:
+    """Precomputed BM25 weights for every (term, intent) pair"""
+
+    def __init__(self, intents, vocabulary, indptr, doc_ids, weights, term_bounds, keyword_postings,
+                 fingerprint=''):
+        self.intents = list(intents)
+        self.vocabulary = {term: term_id for term_id, term in enumerate(vocabulary)}
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        # True where the posting's term is one of the intent's keywords
+        self.keyword_postings = keyword_postings
+        self.term_bounds = term_bounds
+        self.fingerprint = fingerprint
+
+    def __len__(self):
+        return len(self.intents)
+
+    @classmethod
+    def build(cls, knowledge_base, k1=1.2, b=0.75, keyword_boost=3):
+        """Tokenize and weight every intent of a knowledge base"""
+        intents = list(knowledge_base)
+        documents = []
+        keyword_terms = []
+        for intent in intents:
+            data = knowledge_base[intent]
+            counts = Counter(tokenize(data.get('response', '')))
+            terms = set()
+            for keyword in data['keywords']:
+                for token in tokenize(keyword):
+                    counts[token] += keyword_boost
+                    terms.add(token)
+            documents.append(counts)
+            keyword_terms.append(terms)
+
+        lengths = np.array([sum(counts.values()) for counts in documents], dtype=np.float64)
+        average_length = lengths.mean() if len(lengths) and lengths.mean() else 1.0
+
+        postings = defaultdict(list)
+        for doc_id, counts in enumerate(documents):
+            for term, count in counts.items():
+                postings[term].append((doc_id, count))
+
+        vocabulary = sorted(postings)
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        doc_ids = []
+        frequencies = []
+        keyword_postings = []
+        for term_id, term in enumerate(vocabulary):
+            for doc_id, count in postings[term]:
+                doc_ids.append(doc_id)
+                frequencies.append(count)
+                keyword_postings.append(term in keyword_terms[doc_id])
+            indptr[term_id + 1] = len(doc_ids)
+
+        doc_ids = np.array(doc_ids, dtype=np.int32)
+        frequencies = np.array(frequencies, dtype=np.float64)
+        document_frequency = np.diff(indptr).astype(np.float64)
+        total = len(intents)
+        idf = np.log1p((total - document_frequency + 0.5) / (document_frequency + 0.5))
+
+        norm = k1 * (1 - b + b * lengths[doc_ids] / average_length)
+        weights = np.repeat(idf, np.diff(indptr)) * frequencies * (k1 + 1) / (frequencies + norm)
+
+        return cls(
+            intents=intents,
+            vocabulary=vocabulary,
+            indptr=indptr,
+            doc_ids=doc_ids,
+            weights=weights.astype(np.float32),
+            term_bounds=(idf * (k1 + 1)).astype(np.float32),
+            keyword_postings=np.array(keyword_postings, dtype=bool),
+            fingerprint=knowledge_base_fingerprint(knowledge_base),
+        )
+
+    def search(self, query, k=3, min_confidence=0.0, min_score=0.0, min_terms=1):
+        """
+        Return up to ``k`` RetrievalHits, best first.
+
+        ``confidence`` is the BM25 score divided by the highest score the
+        query's terms could reach, so it is comparable across queries.
+        ``min_score`` additionally drops hits that only share very common
+        terms with the query, whose confidence can be high by accident.
+        An intent that shares none of its keywords with the query must
+        match at least ``min_terms`` distinct query terms in its response
+        text: one incidental word ("car" in a premium answer) is not
+        enough.
+        """
+        term_counts = Counter(
+            self.vocabulary[token] for token in tokenize(query) if token in self.vocabulary
+        )
+        if not term_counts or not self.intents:
+            return []
+
+        term_ids = np.fromiter(term_counts.keys(), dtype=np.int64, count=len(term_counts))
+        query_weights = np.fromiter(term_counts.values(), dtype=np.float32, count=len(term_counts))
+        starts = self.indptr[term_ids]
+        ends = self.indptr[term_ids + 1]
+        sizes = ends - starts
+
+        # Sparse matrix-vector product: gather the postings of every query
+        # term and scatter-add their weights into per-intent scores.
+        positions = np.repeat(starts - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+        doc_ids = self.doc_ids[positions]
+        scores = np.bincount(
+            doc_ids,
+            weights=self.weights[positions] * np.repeat(query_weights, sizes),
+            minlength=len(self.intents),
+        )
+        if min_terms > 1:
+            # Postings are unique per (term, intent), so counting them counts distinct terms
+            matched_terms = np.bincount(doc_ids, minlength=len(self.intents))
+            keyword_hits = np.bincount(doc_ids, weights=self.keyword_postings[positions], minlength=len(self.intents))
+            scores[(keyword_hits == 0) & (matched_terms < min_terms)] = 0.0
+        bound = float(np.dot(self.term_bounds[term_ids], query_weights))
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        hits = []
+        for doc_id in top:
+            score = float(scores[doc_id])
+            confidence = score / bound if bound else 0.0
+            if score <= 0 or score < min_score or confidence < min_confidence:
+                break
+            hits.append(RetrievalHit(self.intents[doc_id], score, confidence))
+        return hits
+
+    def save(self, path):
+        """Persist the index as an uncompressed .npz file"""
+        vocabulary = sorted(self.vocabulary, key=self.vocabulary.get)
+        with open(path, 'wb') as fh:
+            np.savez(
+                fh,
+                intents=np.array(self.intents, dtype=str),
+                vocabulary=np.array(vocabulary, dtype=str),
+                indptr=self.indptr,
+                doc_ids=self.doc_ids,
+                weights=self.weights,
+                term_bounds=self.term_bounds,
+                keyword_postings=self.keyword_postings,
+                fingerprint=np.array(self.fingerprint),
+            )
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                intents=data['intents'].tolist(),
+                vocabulary=data['vocabulary'].tolist(),
+                indptr=data['indptr'],
+                doc_ids=data['doc_ids'],
+                weights=data['weights'],
+                term_bounds=data['term_bounds'],
+                keyword_postings=data['keyword_postings'],
+                fingerprint=str(data['fingerprint']),
+            )
+
+
+def load_or_build_index(knowledge_base, path=None):
+    """Load a persisted index if it matches the knowledge base, else build one"""
+    if path:
+        try:
+            index = RetrievalIndex.load(path)
+        except (OSError, KeyError, ValueError):
+            index = None
+        if index is not None and index.fingerprint == knowledge_base_fingerprint(knowledge_base):
+            return index
+    return RetrievalIndex.build(knowledge_base)
@@ -0,0 +1,165 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from core.tests import QueryCountTestCase
+
+from . import views
+from .models import ArchivedChatSession, ChatMessage, ChatSession
+from .persistence import save_turn, save_turns
+from .retention import archive_idle_sessions
+
+
+class IntentRetrievalTests(SimpleTestCase):
+    """BM25 fallback for messages that match no intent keyword"""
+
+    PARAPHRASES = {
+        'is flood damage covered by insurance': 'coverage',
+        'is theft included in my policy': 'coverage',
+        'what is the excess amount I pay': 'deductible',
+        'how to reduce my yearly premium': 'premium',
+        'what is ncb': 'no_claim_bonus',
+    }
+    UNRELATED = [
+        'I crashed my car',
+        'my bike was stolen',
+        'I want to buy a new car',
+        'what is the weather today',
+        'tell me a joke',
+        'my phone is broken',
+    ]
+
+    def test_paraphrases_resolve_to_their_intent(self):
+        for message, intent in self.PARAPHRASES.items():
+            with self.subTest(message=message):
+                hits = views.retrieve_intents(message, k=1)
+                self.assertEqual([hit.intent for hit in hits], [intent])
+
+    def test_unrelated_messages_match_nothing(self):
+        for message in self.UNRELATED:
+            with self.subTest(message=message):
+                self.assertEqual(views.retrieve_intents(message, k=1), [])
+                self.assertIsNone(views.resolve_intent(message))
+
+
+@override_settings(READ_DATABASE_ALIAS='default')
+class ChatStreamTests(TestCase):
+    """chat_message_stream sends each chunk as soon as it is generated"""
+
+    CHUNKS = ['Report ', 'the ', 'incident ', 'within ', '24 hours.']
+
+    def setUp(self):
+        self.generated = []
+
+        def stream_bot_response(user_message):
+            for chunk in self.CHUNKS:
+                self.generated.append(chunk)
+                yield chunk
+
+        patcher = mock.patch.object(views, 'stream_bot_response', stream_bot_response)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def frames(self, response):
+        for frame in response.streaming_content:
+            event, data = frame.decode().rstrip('\n').split('\n')
+            yield event.removeprefix('event: '), json.loads(data.removeprefix('data: '))
+
+    def test_first_frame_arrives_before_the_reply_is_generated(self):
+        response = self.client.post(
+            '/api/chat/message/stream/', {'message': 'how to claim'}, content_type='application/json',
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        frames = self.frames(response)
+
+        event, data = next(frames)
+        self.assertEqual(event, 'session')
+        self.assertEqual(self.generated, [])
+
+        event, data = next(frames)
+        self.assertEqual((event, data), ('token', {'delta': 'Report '}))
+        self.assertEqual(self.generated, ['Report '])
+
+        rest = list(frames)
+        self.assertEqual(''.join(data['delta'] for event, data in rest if event == 'token'), ''.join(self.CHUNKS[1:]))
+        self.assertEqual(rest[-1][0], 'done')
+
+
+class ChatQueryCountTests(QueryCountTestCase):
+    """Chat admin pages and chat history run a fixed number of queries"""
+
+    def seed(self, rows):
+        ChatMessage.objects.all().delete()
+        ChatSession.objects.all().delete()
+        sessions = ChatSession.objects.bulk_create([ChatSession(session_id=f'session_{i}') for i in range(rows)])
+        ChatMessage.objects.bulk_create([
+            ChatMessage(session=session, message_type='user' if j % 2 == 0 else 'bot', content=f'message {j}')
+            for session in sessions for j in range(3)
+        ])
+        return {'session_pk': sessions[0].pk, 'session_id': sessions[0].session_id}
+
+    def test_admin_sessions(self):
+        self.assertPageQueries(5, '/admin/chat/chatsession/')
+
+    def test_admin_session_detail(self):
+        self.assertPageQueries(7, '/admin/chat/chatsession/{session_pk}/change/')
+
+    def test_admin_messages(self):
+        self.assertPageQueries(5, '/admin/chat/chatmessage/')
+
+    def test_chat_history(self):
+        self.assertPageQueries(4, '/api/chat/history/{session_id}/')
+
+
+@override_settings(READ_DATABASE_ALIAS='default')
+class ArchivedSessionTurnTests(TestCase):
+    """A new turn for an archived session brings its old messages back"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = override_settings(CHAT_ARCHIVE_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        save_turn('old-session', 'What is an excess?', 'The part of a claim you pay.')
+        ChatSession.objects.update(updated_at=timezone.now() - timedelta(days=365))
+        archive_idle_sessions(days=90)
+        self.assertFalse(ChatSession.objects.exists())
+
+    def assertHistoryRestored(self):
+        self.assertFalse(ArchivedChatSession.objects.exists())
+        response = self.client.get('/api/chat/history/old-session/')
+        self.assertEqual(
+            [message['content'] for message in response.json()['messages']],
+            ['What is an excess?', 'The part of a claim you pay.', 'And a deductible?', 'The same thing.'],
+        )
+
+    def test_save_turn(self):
+        save_turn('old-session', 'And a deductible?', 'The same thing.')
+        self.assertHistoryRestored()
+
+    def test_save_turns(self):
+        save_turns([('old-session', 'And a deductible?', 'The same thing.', timezone.now())])
+        self.assertHistoryRestored()
+
+    def test_cleared_session_stays_cleared(self):
+        response = self.client.post('/api/chat/clear/', json.dumps({'session_id': 'old-session'}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ArchivedChatSession.objects.exists())
+        self.assertEqual(self.client.get('/api/chat/history/old-session/').status_code, 404)
+
+    def test_missing_archive_file_restores_empty_history(self):
+        record = ArchivedChatSession.objects.get()
+        os.remove(os.path.join(self.directory, record.archive))
+        with self.assertLogs('chat.retention', 'WARNING'):
+            response = self.client.get('/api/chat/history/old-session/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['messages'], [])
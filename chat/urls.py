@@ -3,6 +3,8 @@ from . import views
 
 urlpatterns = [
     path('message/', views.chat_message, name='chat_message'),
+    path('message/stream/', views.chat_message_stream, name='chat_message_stream'),
     path('history/<str:session_id>/', views.get_chat_history, name='get_chat_history'),
     path('clear/', views.clear_chat, name='clear_chat'),
+    path('cache-stats/', views.response_cache_stats, name='chat_cache_stats'),
 ]
@@ -1,9 +1,24 @@
 import json
+import re
 import uuid
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
-from .models import ChatSession, ChatMessage
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import transaction
+from django.db.models import F, Q, Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from core.db import read_alias
+from core.decorators import csrf_exempt, require_http_methods
+from core.metrics import span
+from core.responses import JsonResponse, dumps, streaming_content
+from .models import ArchivedChatSession, ChatSession, ChatMessage
+from .matcher import IntentMatcher
+from .retrieval import knowledge_base_fingerprint, load_or_build_index
+from .cache import ResponseCache, normalize_message
+from .persistence import aflush_pending_turns, arecord_turn, flush_pending_turns, record_turn
+from .retention import restore_sessions
 
 
 # Knowledge base for the AI chatbot
@@ -177,15 +192,69 @@ Discount on premium for not making claims.
 }
 
 
+# Streaming splits responses into words, keeping their trailing whitespace
+STREAM_CHUNK_RE = re.compile(r'\S+\s*|\s+')
+
+# Page sizes for the chat history API
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 200
+
+# Built once at import; call rebuild_knowledge_base_indexes() after editing KNOWLEDGE_BASE
+INTENT_MATCHER = IntentMatcher(KNOWLEDGE_BASE)
+RETRIEVAL_INDEX = load_or_build_index(
+    KNOWLEDGE_BASE, getattr(settings, 'CHAT_RETRIEVAL_INDEX_PATH', None)
+)
+RESPONSE_CACHE = ResponseCache(
+    maxsize=getattr(settings, 'CHAT_RESPONSE_CACHE_SIZE', 1024),
+    version=RETRIEVAL_INDEX.fingerprint,
+    shared_alias=getattr(settings, 'CHAT_RESPONSE_CACHE_ALIAS', None),
+    shared_timeout=getattr(settings, 'CHAT_RESPONSE_CACHE_TIMEOUT', 3600),
+)
+
+
+def rebuild_knowledge_base_indexes():
+    """Recompile the keyword matcher and retrieval index from the knowledge base"""
+    global INTENT_MATCHER, RETRIEVAL_INDEX
+    INTENT_MATCHER = IntentMatcher(KNOWLEDGE_BASE)
+    RETRIEVAL_INDEX = load_or_build_index(KNOWLEDGE_BASE)
+    RESPONSE_CACHE.set_version(knowledge_base_fingerprint(KNOWLEDGE_BASE))
+
+
+def match_intent(user_message):
+    """Return the KeywordMatch (intent, keyword, span) for a message, or None"""
+    return INTENT_MATCHER.match(user_message)
+
+
+def retrieve_intents(user_message, k=3):
+    """Return the top-k RetrievalHits (intent, score, confidence) for a message"""
+    return RETRIEVAL_INDEX.search(
+        user_message,
+        k=k,
+        min_confidence=getattr(settings, 'CHAT_RETRIEVAL_MIN_CONFIDENCE', 0.0),
+        min_score=getattr(settings, 'CHAT_RETRIEVAL_MIN_SCORE', 0.0),
+        min_terms=getattr(settings, 'CHAT_RETRIEVAL_MIN_TERMS', 1),
+    )
+
+
+def resolve_intent(user_message):
+    """Return the knowledge base intent for a message, or None if nothing fits"""
+    # Check for keyword matches
+    match = match_intent(user_message)
+    if match:
+        return match.intent
+    
+    # Fall back to ranked retrieval for paraphrases
+    hits = retrieve_intents(user_message, k=1)
+    if hits:
+        return hits[0].intent
+    return None
+
+
 def get_bot_response(user_message):
     """Generate bot response based on user message"""
-    message_lower = user_message.lower()
-    
-    # Check for keyword matches
-    for category, data in KNOWLEDGE_BASE.items():
-        for keyword in data['keywords']:
-            if keyword in message_lower:
-                return data['response']
+    intent = RESPONSE_CACHE.get_or_compute(normalize_message(user_message), resolve_intent)
+    if intent:
+        return KNOWLEDGE_BASE[intent]['response']
     
     # Default response if no match
     default_responses = [
@@ -202,39 +271,27 @@ def get_bot_response(user_message):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def chat_message(request):
+async def chat_message(request):
     """API endpoint to handle chat messages"""
     try:
-        data = json.loads(request.body)
+        with span('parse'):
+            data = json.loads(request.body)
         session_id = data.get('session_id')
         message = data.get('message', '').strip()
         
         if not message:
             return JsonResponse({'error': 'Message is required'}, status=400)
         
-        # Create or get session
         if not session_id:
             session_id = str(uuid.uuid4())
-            session = ChatSession.objects.create(session_id=session_id)
-        else:
-            session, created = ChatSession.objects.get_or_create(session_id=session_id)
-        
-        # Save user message
-        ChatMessage.objects.create(
-            session=session,
-            message_type='user',
-            content=message
-        )
         
         # Generate bot response
-        bot_response = get_bot_response(message)
+        with span('respond'):
+            bot_response = get_bot_response(message)
         
-        # Save bot response
-        ChatMessage.objects.create(
-            session=session,
-            message_type='bot',
-            content=bot_response
-        )
+        # Save the whole turn (session, user message, bot response) at once
+        with span('persist'):
+            await arecord_turn(session_id, message, bot_response)
         
         return JsonResponse({
             'success': True,
@@ -246,29 +303,113 @@ def chat_message(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def stream_bot_response(user_message):
+    """Yield the bot response in chunks as they are produced"""
+    # Responses are currently resolved in one step; chunking them keeps the
+    # streaming contract in place for slower generators.
+    for chunk in STREAM_CHUNK_RE.findall(get_bot_response(user_message)):
+        yield chunk
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Events frame with a JSON payload"""
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def chat_message_stream(request):
+    """Streaming variant of chat_message that sends the response as Server-Sent Events"""
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+    session_id = data.get('session_id') or str(uuid.uuid4())
+    message = data.get('message', '').strip()
+    
+    if not message:
+        return JsonResponse({'error': 'Message is required'}, status=400)
+    
+    def event_stream():
+        yield sse_event('session', {'session_id': session_id})
+        try:
+            chunks = []
+            for chunk in stream_bot_response(message):
+                chunks.append(chunk)
+                yield sse_event('token', {'delta': chunk})
+            
+            # Persist only once the full response has been produced
+            record_turn(session_id, message, ''.join(chunks))
+            yield sse_event('done', {'success': True, 'session_id': session_id})
+        except Exception as e:
+            yield sse_event('error', {'error': str(e)})
+    
+    response = StreamingHttpResponse(streaming_content(request, event_stream()), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @require_http_methods(["GET"])
-def get_chat_history(request, session_id):
-    """API endpoint to get chat history"""
+async def get_chat_history(request, session_id):
+    """
+    API endpoint to get chat history, oldest first.
+    
+    Supports keyset pagination with ``?after=<message id>&limit=<n>`` and
+    answers ``If-None-Match`` with 304 when the session has not changed.
+    """
     try:
-        session = ChatSession.objects.get(session_id=session_id)
-        messages = session.messages.all()
-        
-        history = []
-        for msg in messages:
-            history.append({
-                'type': msg.message_type,
-                'content': msg.content,
-                'timestamp': msg.timestamp.isoformat(),
-            })
-        
-        return JsonResponse({
-            'success': True,
-            'session_id': session_id,
-            'messages': history,
-        })
-        
+        after = int(request.GET.get('after', 0))
+        limit = min(int(request.GET.get('limit', HISTORY_DEFAULT_LIMIT)), HISTORY_MAX_LIMIT)
+    except ValueError:
+        return JsonResponse({'error': 'after and limit must be integers'}, status=400)
+    if after < 0 or limit < 1:
+        return JsonResponse({'error': 'after must be >= 0 and limit >= 1'}, status=400)
+    
+    try:
+        await aflush_pending_turns()
+        session = await ChatSession.objects.using(read_alias()).values('id', 'updated_at').aget(
+            session_id=session_id
+        )
     except ChatSession.DoesNotExist:
-        return JsonResponse({'error': 'Session not found'}, status=404)
+        # Idle sessions moved out by retention come back on first access
+        if not await ArchivedChatSession.objects.filter(session_id=session_id).aexists():
+            return JsonResponse({'error': 'Session not found'}, status=404)
+        await sync_to_async(restore_sessions)([session_id])
+        session = await ChatSession.objects.values('id', 'updated_at').aget(session_id=session_id)
+    
+    # updated_at is bumped on every saved turn, so it versions the history
+    etag = quote_etag(f"{session['id']}-{session['updated_at'].timestamp()}-{after}-{limit}")
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+    
+    messages = ChatMessage.objects.using(read_alias()).filter(session_id=session['id'])
+    if after:
+        # Resume strictly after the cursor message in (timestamp, id) order
+        cursor_timestamp = Subquery(
+            ChatMessage.objects.filter(pk=after).values('timestamp')[:1]
+        )
+        messages = messages.filter(
+            Q(timestamp__gt=cursor_timestamp) | Q(timestamp=cursor_timestamp, id__gt=after)
+        )
+    # Rows go to the encoder as they are; it writes the timestamps
+    rows = [
+        row async for row in messages.order_by('timestamp', 'id')
+        .values('id', 'content', 'timestamp', type=F('message_type'))[:limit + 1]
+    ]
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    response = JsonResponse({
+        'success': True,
+        'session_id': session_id,
+        'messages': rows,
+        'has_more': has_more,
+        'next_after': rows[-1]['id'] if rows else after,
+    })
+    response['ETag'] = etag
+    return response
 
 
 @csrf_exempt
@@ -279,7 +420,12 @@ def clear_chat(request):
         session_id = data.get('session_id')
         
         if session_id:
-            ChatSession.objects.filter(session_id=session_id).delete()
+            flush_pending_turns()
+            with transaction.atomic():
+                ChatSession.objects.filter(session_id=session_id).delete()
+                # Forget any archived copy too, or the next request for this
+                # id would restore the history that was just cleared
+                ArchivedChatSession.objects.filter(session_id=session_id).delete()
         
         new_session_id = str(uuid.uuid4())
         
@@ -291,3 +437,10 @@ def clear_chat(request):
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
+
+
+@staff_member_required
+@require_http_methods(["GET"])
+def response_cache_stats(request):
+    """Admin-only API endpoint exposing response cache counters"""
+    return JsonResponse({'success': True, 'cache': RESPONSE_CACHE.stats()})
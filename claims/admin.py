@@ -1,14 +1,65 @@
+import operator
+from functools import reduce
+
 from django.contrib import admin
+from django.db.models import Q
+from django.utils.text import smart_split, unescape_string_literal
+
+from .estimates import DAMAGE_METADATA
 from .models import DamageClaim, DamageType
 
 
+class DetectedDamageTypeFilter(admin.SimpleListFilter):
+    """
+    Damage type filter with its options taken from the detector's damage
+    types, instead of a SELECT DISTINCT over every claim.
+    """
+    title = 'detected damage type'
+    parameter_name = 'detected_damage_type'
+
+    def lookups(self, request, model_admin):
+        return [(meta['name'], meta['name']) for meta in DAMAGE_METADATA.values()]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(detected_damage_type=self.value())
+        return queryset
+
+
 @admin.register(DamageClaim)
 class DamageClaimAdmin(admin.ModelAdmin):
     list_display = ['id', 'full_name', 'vehicle_number', 'detected_damage_type', 'status', 'created_at']
-    list_filter = ['status', 'vehicle_type', 'detected_damage_type']
-    search_fields = ['full_name', 'email', 'vehicle_number', 'insurance_policy_number']
+    list_filter = ['status', 'vehicle_type', DetectedDamageTypeFilter]
+    # Prefix matches so every field can use its NOCASE index (see Meta.indexes);
+    # a plain "contains" search scans the whole claims table
+    search_fields = ['^vehicle_number', '^email', '^full_name', '^insurance_policy_number']
+    # Skip the unfiltered COUNT(*) over all claims on every list page
+    show_full_result_count = False
     readonly_fields = ['created_at', 'updated_at', 'ai_analysis', 'matched_clauses']
 
+    def get_search_results(self, request, queryset, search_term):
+        # Search the whole input as one prefix: vehicle numbers contain spaces,
+        # and split terms like "BA" match (and union) almost every row
+        term = search_term.strip()
+        prefix_term = term
+        if term and '"' not in term and "'" not in term:
+            prefix_term = f'"{term}"'
+        results, may_have_duplicates = super().get_search_results(request, queryset, prefix_term)
+        if term and not results.exists():
+            # Nothing starts with the term: fall back to the old substring
+            # search (a full scan, but only when the indexed lookup missed)
+            results = queryset.filter(self.contains_search(term))
+        return results, may_have_duplicates
+
+    def contains_search(self, search_term):
+        query = Q()
+        for bit in smart_split(search_term):
+            bit = unescape_string_literal(bit) if bit[0] in '"\'' else bit
+            query &= reduce(operator.or_, (
+                Q(**{f'{field.lstrip("^")}__icontains': bit}) for field in self.search_fields
+            ))
+        return query
+
 
 @admin.register(DamageType)
 class DamageTypeAdmin(admin.ModelAdmin):
@@ -0,0 +1,172 @@
+"""
+Repair estimate engine.
+
+Rates live in a dense NumPy array indexed by (damage_type, severity,
+vehicle_type), with a separate per-region factor. Single quotes are one
+array read; bulk quotes (portfolio re-pricing, multi-part damage) resolve
+each distinct label combination once and price every row with a single
+fancy-index lookup.
+
+The default table is built from ``DAMAGE_METADATA`` base costs and the
+multipliers below. ``DAMAGE_RATE_TABLE_PATH`` may point at a JSON file with
+the same sections to replace any of them, plus an ``overrides`` list of
+exact ``{damage_type, severity, vehicle_type, rate}`` cells.
+
+Region names are matched case-insensitively; an unknown one raises
+``UnknownRegion`` instead of silently pricing at the default factor.
+Single and per-part quotes are rounded to 2 decimals (paisa), as
+``requote_claims`` stores them.
+"""
+import json
+import threading
+
+import numpy as np
+from django.conf import settings
+
+
+# Configuration for simulated AI Analysis
+DAMAGE_METADATA = {
+    'bumper_damage': {'name': 'Bumper Damage', 'covered': True, 'base_cost': 12000},
+    'windshield_damage': {'name': 'Windshield Damage', 'covered': True, 'base_cost': 15000},
+    'wheel_damage': {'name': 'Wheel/Rim Damage', 'covered': False, 'base_cost': 8000},
+    'door_damage': {'name': 'Door Damage', 'covered': True, 'base_cost': 18000},
+}
+
+SEVERITY_MULTIPLIERS = {'minor': 0.5, 'moderate': 1.0, 'severe': 2.5}
+
+# Relative to a car, from standard Nepal workshop rates
+VEHICLE_MULTIPLIERS = {'car': 1.0, 'motorcycle': 0.45, 'truck': 1.8, 'bus': 2.2, 'other': 1.0}
+
+REGION_FACTORS = {'default': 1.0, 'kathmandu': 1.1, 'pokhara': 1.0, 'terai': 0.9, 'hill': 1.05}
+
+
+class UnknownRegion(ValueError):
+    pass
+
+
+class RateTable:
+    """Dense (damage_type x severity x vehicle_type) rate array with label lookups"""
+
+    def __init__(self, damage_types, severities, vehicle_types, regions, overrides=()):
+        self.damage_keys = list(damage_types)
+        self.severities = list(severities)
+        self.vehicle_types = list(vehicle_types)
+        self.regions = {name.lower(): factor for name, factor in regions.items()}
+
+        # Claims store the display name ('Door Damage'); requests use the key
+        self._damage_codes = {}
+        for code, key in enumerate(self.damage_keys):
+            self._damage_codes[key] = code
+            self._damage_codes[damage_types[key]['name']] = code
+        self._severity_codes = {name: code for code, name in enumerate(self.severities)}
+        self._vehicle_codes = {name: code for code, name in enumerate(self.vehicle_types)}
+        self._other_vehicle = self._vehicle_codes.get('other', 0)
+
+        base = np.array([damage_types[key]['base_cost'] for key in self.damage_keys], dtype=np.float64)
+        severity = np.array([severities[name] for name in self.severities], dtype=np.float64)
+        vehicle = np.array([vehicle_types[name] for name in self.vehicle_types], dtype=np.float64)
+        self.rates = base[:, None, None] * severity[None, :, None] * vehicle[None, None, :]
+        for cell in overrides:
+            self.rates[
+                self._damage_codes[cell['damage_type']],
+                self._severity_codes[cell['severity']],
+                self._vehicle_codes[cell['vehicle_type']],
+            ] = cell['rate']
+        self.covered = np.array([damage_types[key]['covered'] for key in self.damage_keys])
+        # Flattened rates with a trailing NaN cell for unknown labels
+        self._cells = np.append(self.rates.ravel(), np.nan)
+        self._covered_cells = np.append((self.rates * self.covered[:, None, None]).ravel(), np.nan)
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Build from the defaults above, with sections replaced by ``config``"""
+        config = config or {}
+        return cls(
+            damage_types=config.get('damage_types', DAMAGE_METADATA),
+            severities=config.get('severities', SEVERITY_MULTIPLIERS),
+            vehicle_types=config.get('vehicle_types', VEHICLE_MULTIPLIERS),
+            regions=config.get('regions', REGION_FACTORS),
+            overrides=config.get('overrides', ()),
+        )
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_config(json.load(f))
+
+    def normalize_region(self, region):
+        """Region key for a user-supplied name ('Kathmandu ' -> 'kathmandu'); None/'' is 'default'"""
+        key = (region or '').strip().lower() or 'default'
+        if key not in self.regions and key != 'default':
+            raise UnknownRegion(f"Unknown region '{region}', expected one of: {', '.join(sorted(self.regions))}")
+        return key
+
+    def region_factor(self, region):
+        return self.regions.get(self.normalize_region(region), 1.0)
+
+    def quote(self, damage_type, severity, vehicle_type='car', region=None):
+        """Repair estimate for one damaged part"""
+        rate = self.rates[
+            self._damage_codes[damage_type],
+            self._severity_codes[severity],
+            self._vehicle_codes.get(vehicle_type, self._other_vehicle),
+        ]
+        return round(float(rate) * self.region_factor(region), 2)
+
+    def quote_parts(self, parts, vehicle_type='car', region=None):
+        """Per-part estimates and total for multi-part damage: parts is [(damage_type, severity), ...]"""
+        if not parts:
+            return [], 0.0
+        damage_types, severities = zip(*parts)
+        amounts = np.round(
+            self.bulk_quote(damage_types, severities, [vehicle_type] * len(parts), region=region), 2,
+        )
+        return amounts.tolist(), round(float(amounts.sum()), 2)
+
+    def cell_codes(self, triples):
+        """
+        (damage_type, severity, vehicle_type) label triples -> flat indexes
+        into ``rates``; unknown damage types or severities point at a NaN cell
+        """
+        triples = list(triples)
+        cells = {}
+        unknown = self.rates.size
+        for damage_type, severity, vehicle_type in set(triples):
+            damage = self._damage_codes.get(damage_type)
+            level = self._severity_codes.get(severity)
+            vehicle = self._vehicle_codes.get(vehicle_type, self._other_vehicle)
+            if damage is None or level is None:
+                cells[damage_type, severity, vehicle_type] = unknown
+            else:
+                cells[damage_type, severity, vehicle_type] = np.ravel_multi_index(
+                    (damage, level, vehicle), self.rates.shape
+                )
+        # Only the few distinct triples are resolved in Python; every row is
+        # then a dict probe and one fancy-index read
+        return np.fromiter(map(cells.__getitem__, triples), dtype=np.intp, count=len(triples))
+
+    def bulk_quote_cells(self, codes, region_factors=1.0, covered_only=False):
+        """Vectorised quote from cell_codes(); rows with an unknown label are NaN"""
+        rates = self._covered_cells if covered_only else self._cells
+        return rates[codes] * region_factors
+
+    def bulk_quote(self, damage_types, severities, vehicle_types, region=None, covered_only=False):
+        """Vectorised quote over label sequences; rows with an unknown label are NaN"""
+        codes = self.cell_codes(zip(damage_types, severities, vehicle_types))
+        return self.bulk_quote_cells(codes, region_factors=self.region_factor(region),
+                                     covered_only=covered_only)
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_rate_table():
+    """The process-wide rate table, loaded on first use"""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                path = getattr(settings, 'DAMAGE_RATE_TABLE_PATH', None)
+                _table = RateTable.from_file(path) if path else RateTable.from_config()
+    return _table
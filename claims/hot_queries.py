@@ -0,0 +1,60 @@
+"""Hot claims queries checked by ``manage.py check_query_plans``"""
+from core.query_audit import hot_query
+
+from .models import DamageClaim
+
+ADMIN_PAGE = 100
+
+
+@hot_query('claims.admin.changelist', allow_scan='Newest-first rowid scan that stops at the page size')
+def admin_changelist():
+    return DamageClaim.objects.order_by('-pk')[:ADMIN_PAGE]
+
+
+@hot_query('claims.admin.filter_status')
+def admin_filter_status():
+    return DamageClaim.objects.filter(status='pending').order_by('-pk')[:ADMIN_PAGE]
+
+
+@hot_query('claims.admin.filter_vehicle_type')
+def admin_filter_vehicle_type():
+    return DamageClaim.objects.filter(vehicle_type='car').order_by('-pk')[:ADMIN_PAGE]
+
+
+@hot_query('claims.admin.filter_damage_type')
+def admin_filter_damage_type():
+    return DamageClaim.objects.filter(detected_damage_type='Door Damage').order_by('-pk')[:ADMIN_PAGE]
+
+
+@hot_query('claims.admin.search')
+def admin_search():
+    # What DamageClaimAdmin's ^field search_fields generate
+    from django.db.models import Q
+    term = 'BA 2'
+    return DamageClaim.objects.filter(
+        Q(vehicle_number__istartswith=term) | Q(email__istartswith=term)
+        | Q(full_name__istartswith=term) | Q(insurance_policy_number__istartswith=term)
+    ).order_by('-pk')[:ADMIN_PAGE]
+
+
+@hot_query('claims.status')
+def claim_status():
+    return DamageClaim.objects.filter(id=1)
+
+
+@hot_query('claims.jobs.next_queued')
+def next_queued_job():
+    return DamageClaim.objects.filter(analysis_status='queued').order_by('id').values_list('id', flat=True)[:1]
+
+
+@hot_query('claims.duplicates.by_hash')
+def claims_by_image_hash():
+    return DamageClaim.objects.filter(image_hash='0600760e9437b30e').values_list('id', flat=True)
+
+
+@hot_query('claims.requote.chunk')
+def requote_chunk():
+    return (
+        DamageClaim.objects.filter(id__gt=0).order_by('id')
+        .values_list('id', 'detected_damage_type', 'damage_severity', 'vehicle_type')[:100000]
+    )
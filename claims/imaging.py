@@ -0,0 +1,122 @@
+"""
+Bounded-memory ingestion of damage photos.
+
+Uploads are streamed straight to a temporary file (never buffered in
+memory) and rejected once they pass ``DAMAGE_IMAGE_MAX_UPLOAD_BYTES``. The
+image header is checked against ``DAMAGE_IMAGE_MAX_PIXELS`` before any
+pixel data is decoded; JPEGs are then decoded at a reduced DCT scale via
+``Image.draft`` and everything is downscaled to fit
+``DAMAGE_IMAGE_ANALYSIS_SIZE``. The result is re-encoded without EXIF
+metadata (GPS position, device details), with orientation already applied.
+"""
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+
+
+class ImageRejected(ValueError):
+    """An upload that is not an acceptable damage photo"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def max_upload_bytes():
+    return getattr(settings, 'DAMAGE_IMAGE_MAX_UPLOAD_BYTES', 20 * 1024 * 1024)
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploads to disk and stop once a file grows past the size limit"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limit = max_upload_bytes()
+        self.exceeded = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.limit:
+            self.exceeded = True
+            self.file.close()
+            raise StopUpload(connection_reset=True)
+        return super().receive_data_chunk(raw_data, start)
+
+
+def use_limited_upload_handler(request):
+    """
+    Route this request's uploads through LimitedTemporaryFileUploadHandler.
+    Must run before request.POST / request.FILES are first accessed.
+    """
+    handler = LimitedTemporaryFileUploadHandler(request)
+    request.upload_handlers = [handler]
+    return handler
+
+
+class IngestedImage:
+    """A decoded, downscaled, metadata-free damage photo ready for analysis"""
+
+    def __init__(self, image, original_format, original_size):
+        self.image = image
+        self.original_format = original_format
+        self.original_size = original_size
+
+    @property
+    def size(self):
+        return self.image.size
+
+    def to_content_file(self, name='damage.jpg', quality=85):
+        """JPEG-encode the processed image for storage (no EXIF is written)"""
+        buffer = BytesIO()
+        self.image.save(buffer, format='JPEG', quality=quality, optimize=True)
+        return ContentFile(buffer.getvalue(), name=name)
+
+
+def ingest_image(uploaded_file, analysis_size=None, max_pixels=None):
+    """Validate and decode an uploaded photo into an IngestedImage"""
+    if analysis_size is None:
+        analysis_size = getattr(settings, 'DAMAGE_IMAGE_ANALYSIS_SIZE', 1024)
+    if max_pixels is None:
+        max_pixels = getattr(settings, 'DAMAGE_IMAGE_MAX_PIXELS', 40_000_000)
+    if uploaded_file.size is not None and uploaded_file.size > max_upload_bytes():
+        raise ImageRejected('Image file is too large', status=413)
+
+    uploaded_file.seek(0)
+    try:
+        # Image.open only parses the header; no pixels are decoded yet
+        image = Image.open(uploaded_file)
+    except (UnidentifiedImageError, OSError):
+        raise ImageRejected('Uploaded file is not a supported image')
+    except Image.DecompressionBombError:
+        raise ImageRejected('Image has too many pixels', status=413)
+
+    if image.format not in ALLOWED_FORMATS:
+        raise ImageRejected(f'Unsupported image format: {image.format}')
+    width, height = image.size
+    if width * height > max_pixels:
+        raise ImageRejected(f'Image has too many pixels ({width}x{height})', status=413)
+
+    original_format, original_size = image.format, image.size
+    try:
+        if image.format == 'JPEG':
+            # Let libjpeg decode at 1/2, 1/4 or 1/8 scale when that still
+            # covers the analysis size
+            image.draft('RGB', (analysis_size, analysis_size))
+        # Apply the EXIF orientation now, since the metadata is dropped below
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((analysis_size, analysis_size), Image.Resampling.LANCZOS)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        # Re-wrapping the pixels leaves EXIF, ICC and other chunks behind
+        clean = Image.frombytes('RGB', image.size, image.tobytes())
+    except (OSError, ValueError, Image.DecompressionBombError):
+        raise ImageRejected('Image could not be decoded')
+    finally:
+        uploaded_file.seek(0)
+
+    return IngestedImage(clean, original_format, original_size)
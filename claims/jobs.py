@@ -0,0 +1,217 @@
+"""
+Background queue for damage analysis.
+
+``analyze_damage_async`` saves the upload on a pending DamageClaim, hands
+the claim id to this queue and returns straight away; worker threads run
+detection, clause lookup and the estimate, then write the results back
+onto the claim. Progress is tracked in ``DamageClaim.analysis_status``
+(queued -> running -> done / failed) so any process can report it.
+
+Two backends (``CLAIMS_ANALYSIS_QUEUE_BACKEND``):
+
+``memory``
+    A bounded in-process ``queue.Queue``. Fast, but jobs still queued
+    when the process dies stay ``queued`` until ``requeue_stale()`` or a
+    ``database`` worker picks them up.
+``database``
+    The claims table itself is the queue: workers claim the oldest
+    ``queued`` row with a compare-and-set UPDATE, and rows stuck in
+    ``running`` longer than ``CLAIMS_ANALYSIS_LEASE_SECONDS`` are retried.
+    Durable across restarts, and workers can run in a separate process
+    (``python manage.py run_analysis_workers``).
+
+Both backends refuse new jobs once ``CLAIMS_ANALYSIS_QUEUE_SIZE`` are
+waiting; the view turns that into ``429 Too Many Requests``.
+"""
+import logging
+import queue
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from PIL import Image
+
+from .imaging import IngestedImage
+from .models import DamageClaim
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """The analysis queue has no room for another job"""
+
+
+def run_claim_analysis(claim_id):
+    """Analyse a claim's stored photo and save the results onto the claim"""
+    # Imported here: the views module imports this one
+    from .views import run_analysis
+
+    claim = DamageClaim.objects.only('id', 'damage_image', 'policy_id', 'vehicle_type').get(pk=claim_id)
+    with claim.damage_image.open('rb') as stored:
+        image = Image.open(stored)
+        image.load()
+    ingested = IngestedImage(image.convert('RGB'), image.format, image.size)
+    result = run_analysis(ingested, policy_id=claim.policy_id, vehicle_type=claim.vehicle_type)
+    DamageClaim.objects.filter(pk=claim_id).update(
+        analysis_status='done',
+        ai_analysis={'analysis': result['analysis'], 'estimate': result['estimate']},
+        matched_clauses=result['clauses'],
+        detected_damage_type=result['analysis']['damage_type'],
+        damage_severity=result['analysis']['severity'],
+        estimated_coverage=result['estimate']['amount'] if result['analysis']['is_covered'] else 0,
+        image_hash=result['image_hash'],
+        updated_at=timezone.now(),
+    )
+
+
+def _process(claim_id):
+    try:
+        run_claim_analysis(claim_id)
+    except Exception as e:
+        logger.exception('Analysis of claim %s failed', claim_id)
+        DamageClaim.objects.filter(pk=claim_id).update(
+            analysis_status='failed', ai_analysis={'error': str(e)}, updated_at=timezone.now()
+        )
+
+
+class AnalysisQueue:
+    """Worker threads draining a bounded queue of claim ids"""
+
+    def __init__(self, workers=2, maxsize=100, backend='memory', poll_interval=1.0, lease_seconds=300):
+        if backend not in ('memory', 'database'):
+            raise ValueError(f'Unknown analysis queue backend: {backend}')
+        self.workers = workers
+        self.maxsize = maxsize
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping = False
+            for number in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run, name=f'claims-analysis-{number}', daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Let workers finish their current job and exit"""
+        with self._lock:
+            self._stopping = True
+            threads, self._threads = self._threads, []
+        self._wakeup.set()
+        for _ in threads:
+            if self.backend == 'memory':
+                self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+        self._wakeup.clear()
+
+    def pending(self):
+        """Number of jobs waiting for a worker"""
+        if self.backend == 'memory':
+            return self._queue.qsize()
+        return DamageClaim.objects.filter(analysis_status='queued').count()
+
+    def has_room(self):
+        return self.pending() < self.maxsize
+
+    def submit(self, claim_id):
+        """Queue a claim (already saved with analysis_status='queued')"""
+        self.start()
+        if self.backend == 'memory':
+            try:
+                self._queue.put_nowait(claim_id)
+            except queue.Full:
+                raise QueueFull()
+        else:
+            # The row is the job; just wake an idle worker
+            self._wakeup.set()
+
+    def _run(self):
+        try:
+            while not self._stopping:
+                claim_id = self._next_job()
+                if claim_id is None:
+                    continue
+                close_old_connections()
+                _process(claim_id)
+        finally:
+            connection.close()
+
+    def _next_job(self):
+        if self.backend == 'memory':
+            claim_id = self._queue.get()
+            if claim_id is None:
+                return None
+            claimed = DamageClaim.objects.filter(pk=claim_id, analysis_status='queued').update(
+                analysis_status='running', updated_at=timezone.now()
+            )
+            # Zero rows: another worker (e.g. a database-backend process) has it
+            return claim_id if claimed else None
+
+        claim_id = claim_next_job(self.lease_seconds)
+        if claim_id is None:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+        return claim_id
+
+
+def claim_next_job(lease_seconds=300):
+    """Atomically take the oldest queued (or abandoned running) claim; None if idle"""
+    stale = timezone.now() - timedelta(seconds=lease_seconds)
+    while True:
+        candidate = (
+            DamageClaim.objects.filter(analysis_status='queued').order_by('id')
+            .values_list('id', flat=True).first()
+        )
+        expected = {'analysis_status': 'queued'}
+        if candidate is None:
+            expected = {'analysis_status': 'running', 'updated_at__lt': stale}
+            candidate = (
+                DamageClaim.objects.filter(**expected).order_by('id')
+                .values_list('id', flat=True).first()
+            )
+        if candidate is None:
+            return None
+        # Compare-and-set: only one worker wins the row
+        claimed = DamageClaim.objects.filter(pk=candidate, **expected).update(
+            analysis_status='running', updated_at=timezone.now()
+        )
+        if claimed:
+            return candidate
+
+
+def requeue_stale(lease_seconds=300):
+    """Put claims left 'running' by a dead worker back in the queue"""
+    stale = timezone.now() - timedelta(seconds=lease_seconds)
+    return DamageClaim.objects.filter(analysis_status='running', updated_at__lt=stale).update(
+        analysis_status='queued', updated_at=timezone.now()
+    )
+
+
+def build_queue():
+    return AnalysisQueue(
+        workers=getattr(settings, 'CLAIMS_ANALYSIS_WORKERS', 2),
+        maxsize=getattr(settings, 'CLAIMS_ANALYSIS_QUEUE_SIZE', 100),
+        backend=getattr(settings, 'CLAIMS_ANALYSIS_QUEUE_BACKEND', 'memory'),
+        poll_interval=getattr(settings, 'CLAIMS_ANALYSIS_POLL_INTERVAL', 1.0),
+        lease_seconds=getattr(settings, 'CLAIMS_ANALYSIS_LEASE_SECONDS', 300),
+    )
+
+
+# Workers start on the first submitted job, not at import time
+ANALYSIS_QUEUE = build_queue()
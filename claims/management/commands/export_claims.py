@@ -0,0 +1,56 @@
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from claims.models import DamageClaim
+from claims.transfer import ENCODERS, FORMATS, export_rows
+from core.db import read_alias
+
+
+class Command(BaseCommand):
+    help = 'Write every claim to a CSV or NDJSON file (or stdout), streaming in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='ndjson')
+        parser.add_argument('--output', '-o', default='-', help="File to write, or '-' for stdout")
+        parser.add_argument('--status', default=None, help='Only export claims with this status')
+        parser.add_argument(
+            '--chunk-size', type=int, default=getattr(settings, 'CLAIMS_EXPORT_CHUNK_SIZE', 2000),
+            help='Rows fetched and written at a time (defaults to CLAIMS_EXPORT_CHUNK_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        queryset = DamageClaim.objects.using(read_alias())
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+
+        started = time.perf_counter()
+        rows = 0
+
+        def counted(claims):
+            nonlocal rows
+            for rows, claim in enumerate(claims, 1):
+                yield claim
+
+        chunk_size = options['chunk_size']
+        chunks = ENCODERS[options['format']](counted(export_rows(queryset, chunk_size)), chunk_size)
+        to_stdout = options['output'] == '-'
+        out = sys.stdout.buffer if to_stdout else open(options['output'], 'wb')
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        finally:
+            if to_stdout:
+                out.flush()
+            else:
+                out.close()
+
+        elapsed = time.perf_counter() - started
+        rate = rows / elapsed if elapsed else 0
+        # Summary on stderr, so it never ends up inside an export written to stdout
+        self.stderr.write(
+            f'Exported {rows} claims as {options["format"]} in {elapsed:.2f}s, {rate:,.0f} rows/s',
+            style_func=self.style.SUCCESS,
+        )
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from claims.models import DamageClaim
+from claims.phash import find_near_duplicates
+
+
+class Command(BaseCommand):
+    help = 'Report claims whose damage photos are identical or near-identical (perceptual hash)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-distance', type=int,
+            default=getattr(settings, 'DAMAGE_PHASH_MAX_DISTANCE', 6),
+            help='Hamming distance (bits of 64) at which two photos count as duplicates',
+        )
+
+    def handle(self, *args, **options):
+        max_distance = options['max_distance']
+        claims = DamageClaim.objects.exclude(image_hash='')
+
+        if max_distance == 0:
+            # Exact matches only: a GROUP BY on the indexed column
+            hashes = (
+                claims.values('image_hash').annotate(total=Count('id'))
+                .filter(total__gt=1).values_list('image_hash', flat=True)
+            )
+            groups = {}
+            for claim_id, image_hash in claims.filter(image_hash__in=list(hashes)).values_list('id', 'image_hash'):
+                groups.setdefault(image_hash, set()).add(claim_id)
+            clusters = list(groups.values())
+        else:
+            rows = list(claims.values_list('id', 'image_hash').iterator(chunk_size=5000))
+            clusters = find_near_duplicates(rows, max_distance)
+
+        for members in sorted(clusters, key=min):
+            self.stdout.write(', '.join(f'#{claim_id}' for claim_id in sorted(members)))
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(clusters)} duplicate group(s) covering {sum(map(len, clusters))} claims'
+        ))
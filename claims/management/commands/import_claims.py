@@ -0,0 +1,56 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from claims.transfer import FORMATS, InvalidRow, import_claims
+
+
+class Command(BaseCommand):
+    help = 'Validate and bulk-insert claims from a CSV or NDJSON export, in batched transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or NDJSON file, or '-' for stdin")
+        parser.add_argument('--format', choices=sorted(FORMATS), default=None,
+                            help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk_create and transaction')
+        parser.add_argument('--keep-ids', action='store_true',
+                            help="Insert with the file's claim ids instead of new ones")
+        parser.add_argument('--skip-invalid', action='store_true',
+                            help='Report invalid rows and import the rest instead of stopping at the first')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the whole file without writing')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt not in FORMATS:
+            raise CommandError(f"Cannot tell the format of {path}; pass --format {' or '.join(FORMATS)}")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        try:
+            totals = import_claims(
+                stream, fmt,
+                batch_size=options['batch_size'],
+                keep_ids=options['keep_ids'],
+                skip_invalid=options['skip_invalid'],
+                dry_run=options['dry_run'],
+                stdout=self.stdout,
+            )
+        except InvalidRow as e:
+            if options['dry_run']:
+                raise CommandError(str(e))
+            raise CommandError(
+                f'{e}\nBatches before this row are already imported; '
+                'check the file with --dry-run or pass --skip-invalid.'
+            )
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {totals['imported']} claims in {totals['seconds']:.2f}s, "
+            f"{totals['rows_per_sec']:,} rows/s; {totals['invalid']} invalid rows skipped"
+        ))
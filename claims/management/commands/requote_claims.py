@@ -0,0 +1,94 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from claims.estimates import UnknownRegion, get_rate_table
+from claims.models import DamageClaim
+
+
+def update_from_supported():
+    """SQLite accepts UPDATE ... FROM from 3.33 on"""
+    return connection.vendor != 'sqlite' or connection.Database.sqlite_version_info >= (3, 33, 0)
+
+
+class Command(BaseCommand):
+    help = 'Re-price estimated_coverage on existing claims from the current rate table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--region', default=None, help='Region whose rate factor to apply')
+        parser.add_argument('--chunk-size', type=int, default=100000)
+        parser.add_argument('--dry-run', action='store_true', help='Compute quotes without saving them')
+
+    def handle(self, *args, **options):
+        table = get_rate_table()
+        try:
+            region_factor = table.region_factor(options['region'])
+        except UnknownRegion as e:
+            raise CommandError(str(e))
+        chunk_size = options['chunk_size']
+        claims_table = DamageClaim._meta.db_table
+
+        started = time.perf_counter()
+        last_id = 0
+        priced = skipped = 0
+        total = 0.0
+        # Quotes are staged in a temp table and applied with one joined
+        # UPDATE: about twice as fast as a million single-row UPDATEs, and
+        # the claims table is only write-locked for that last statement.
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS requote_amounts')
+            cursor.execute('CREATE TEMP TABLE requote_amounts (id INTEGER PRIMARY KEY, amount NUMERIC)')
+        while True:
+            # Keyset pagination over the primary key keeps each chunk an index range scan
+            rows = list(
+                DamageClaim.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', 'detected_damage_type', 'damage_severity', 'vehicle_type')[:chunk_size]
+            )
+            if not rows:
+                break
+            ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            last_id = int(ids[-1])
+
+            amounts = table.bulk_quote_cells(
+                table.cell_codes(row[1:] for row in rows),
+                region_factors=region_factor, covered_only=True,
+            )
+            known = ~np.isnan(amounts)
+            amounts = np.round(amounts[known], 2)
+            ids = ids[known]
+            priced += len(ids)
+            skipped += len(rows) - len(ids)
+            total += float(amounts.sum())
+
+            if not options['dry_run'] and len(ids):
+                # One transaction per chunk, or SQLite commits every row
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(
+                        'INSERT INTO requote_amounts (id, amount) VALUES (%s, %s)',
+                        zip(ids.tolist(), amounts.tolist()),
+                    )
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            if not options['dry_run'] and update_from_supported():
+                cursor.execute(
+                    f'UPDATE {claims_table} SET estimated_coverage = requote_amounts.amount '
+                    f'FROM requote_amounts WHERE requote_amounts.id = {claims_table}.id'
+                )
+            elif not options['dry_run']:
+                # Same result without UPDATE ... FROM, one primary key lookup per claim
+                cursor.execute(
+                    f'UPDATE {claims_table} SET estimated_coverage = ('
+                    f'SELECT amount FROM requote_amounts WHERE requote_amounts.id = {claims_table}.id'
+                    f') WHERE id IN (SELECT id FROM requote_amounts)'
+                )
+            cursor.execute('DROP TABLE requote_amounts')
+
+        elapsed = time.perf_counter() - started
+        rate = priced / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{"Would re-price" if options["dry_run"] else "Re-priced"} {priced} claims '
+            f'(NPR {total:,.2f} covered) in {elapsed:.2f}s, {rate:,.0f} rows/s; '
+            f'{skipped} skipped (unknown damage type or severity)'
+        ))
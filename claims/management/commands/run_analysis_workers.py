@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from claims.jobs import AnalysisQueue, requeue_stale
+
+
+class Command(BaseCommand):
+    help = 'Run background damage-analysis workers against the durable (database) queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=getattr(settings, 'CLAIMS_ANALYSIS_WORKERS', 2),
+            help='Number of worker threads',
+        )
+        parser.add_argument(
+            '--requeue', action='store_true',
+            help='First put every running claim back in the queue (only when no other workers are alive)',
+        )
+
+    def handle(self, *args, **options):
+        lease_seconds = getattr(settings, 'CLAIMS_ANALYSIS_LEASE_SECONDS', 300)
+        if options['requeue']:
+            self.stdout.write(f'Requeued {requeue_stale(lease_seconds=0)} claim(s)')
+
+        workers = AnalysisQueue(
+            workers=options['workers'],
+            backend='database',
+            poll_interval=getattr(settings, 'CLAIMS_ANALYSIS_POLL_INTERVAL', 1.0),
+            lease_seconds=lease_seconds,
+        )
+        workers.start()
+        self.stdout.write(self.style.SUCCESS(f'Started {options["workers"]} analysis worker(s); Ctrl-C to stop'))
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping after current jobs...')
+            workers.stop()
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DamageType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField()),
+                ('common_causes', models.JSONField(default=list)),
+                ('typically_covered', models.BooleanField(default=True)),
+                ('required_documents', models.JSONField(default=list)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DamageClaim',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('full_name', models.CharField(max_length=200)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(max_length=20)),
+                ('vehicle_type', models.CharField(choices=[('car', 'Car'), ('motorcycle', 'Motorcycle'), ('truck', 'Truck'), ('bus', 'Bus'), ('other', 'Other')], default='car', max_length=20)),
+                ('vehicle_number', models.CharField(max_length=50)),
+                ('insurance_policy_number', models.CharField(blank=True, max_length=100)),
+                ('damage_description', models.TextField()),
+                ('damage_image', models.ImageField(upload_to='claims/damage_images/')),
+                ('image_hash', models.CharField(blank=True, db_index=True, max_length=16)),
+                ('detected_damage_type', models.CharField(blank=True, max_length=100)),
+                ('damage_severity', models.CharField(blank=True, max_length=20)),
+                ('ai_analysis', models.JSONField(blank=True, default=dict)),
+                ('matched_clauses', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('pending', 'Pending Review'), ('eligible', 'Eligible for Claim'), ('not_eligible', 'Not Eligible'), ('needs_info', 'Needs More Information')], default='pending', max_length=20)),
+                ('eligibility_reason', models.TextField(blank=True)),
+                ('estimated_coverage', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('policy', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.insurancepolicy')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('claims', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='damageclaim',
+            name='analysis_status',
+            field=models.CharField(blank=True, choices=[('', 'Not Queued'), ('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, max_length=10),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:02
+
+import core.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('claims', '0002_claim_analysis_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='damageclaim',
+            index=models.Index(fields=['status', 'id'], name='claim_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='damageclaim',
+            index=models.Index(fields=['vehicle_type', 'id'], name='claim_vehicle_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='damageclaim',
+            index=models.Index(fields=['detected_damage_type', 'id'], name='claim_damage_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='damageclaim',
+            index=core.indexes.CaseInsensitiveIndex(fields=['vehicle_number'], name='claim_vehicle_number_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='damageclaim',
+            index=core.indexes.CaseInsensitiveIndex(fields=['email'], name='claim_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='damageclaim',
+            index=core.indexes.CaseInsensitiveIndex(fields=['full_name'], name='claim_full_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='damageclaim',
+            index=core.indexes.CaseInsensitiveIndex(fields=['insurance_policy_number'], name='claim_policy_number_idx'),
+        ),
+    ]
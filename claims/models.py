@@ -1,4 +1,5 @@
 from django.db import models
+from core.indexes import CaseInsensitiveIndex
 from core.models import InsurancePolicy
 
 
@@ -11,6 +12,14 @@ class DamageClaim(models.Model):
         ('needs_info', 'Needs More Information'),
     ]
     
+    ANALYSIS_STATUS_CHOICES = [
+        ('', 'Not Queued'),
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
     VEHICLE_TYPES = [
         ('car', 'Car'),
         ('motorcycle', 'Motorcycle'),
@@ -35,10 +44,12 @@ class DamageClaim(models.Model):
     # Damage information
     damage_description = models.TextField()
     damage_image = models.ImageField(upload_to='claims/damage_images/')
+    image_hash = models.CharField(max_length=16, blank=True, db_index=True)  # 64-bit dHash, hex
     detected_damage_type = models.CharField(max_length=100, blank=True)
     damage_severity = models.CharField(max_length=20, blank=True)
     
     # AI Analysis
+    analysis_status = models.CharField(max_length=10, choices=ANALYSIS_STATUS_CHOICES, blank=True, db_index=True)
     ai_analysis = models.JSONField(default=dict, blank=True)
     matched_clauses = models.JSONField(default=list, blank=True)
     
@@ -51,6 +62,19 @@ class DamageClaim(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # Admin list filters, newest first
+            models.Index(fields=['status', 'id'], name='claim_status_idx'),
+            models.Index(fields=['vehicle_type', 'id'], name='claim_vehicle_type_idx'),
+            models.Index(fields=['detected_damage_type', 'id'], name='claim_damage_type_idx'),
+            # Admin prefix search
+            CaseInsensitiveIndex(fields=['vehicle_number'], name='claim_vehicle_number_idx'),
+            CaseInsensitiveIndex(fields=['email'], name='claim_email_idx'),
+            CaseInsensitiveIndex(fields=['full_name'], name='claim_full_name_idx'),
+            CaseInsensitiveIndex(fields=['insurance_policy_number'], name='claim_policy_number_idx'),
+        ]
+
     def __str__(self):
         return f"Claim #{self.id} - {self.full_name} - {self.vehicle_number}"
 
@@ -0,0 +1,194 @@
+"""
+Perceptual hashing of damage photos and a near-duplicate analysis cache.
+
+Hashes are 64-bit and computed from the already-downscaled analysis image,
+so re-compressed or resized copies of a photo land within a small Hamming
+distance of each other. ``AnalysisCache`` returns the stored analysis of
+any cached photo within ``DAMAGE_PHASH_MAX_DISTANCE`` bits of a new one.
+
+The analyze endpoints return each hash with a signed ``image_token``;
+``submit_claim`` stores only the hash inside a valid token, so a client
+cannot pick the hash its claim is checked for duplicates under.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+from django.core import signing
+from PIL import Image
+
+
+def _bits_to_hex(bits):
+    return format(int(np.packbits(bits.astype(np.uint8)).view('>u8')[0]), '016x')
+
+
+def dhash(image, hash_size=8):
+    """Difference hash: sign of horizontal gradients on a (9x8) grayscale thumbnail"""
+    small = image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = np.asarray(small, dtype=np.int16)
+    return _bits_to_hex((pixels[:, 1:] > pixels[:, :-1]).ravel())
+
+
+IMAGE_TOKEN_SALT = 'claims.image_hash'
+
+
+def sign_image_hash(image_hash):
+    """Token vouching that the server computed ``image_hash``"""
+    return signing.dumps(image_hash, salt=IMAGE_TOKEN_SALT)
+
+
+def verified_image_hash(token):
+    """The hash in a token from sign_image_hash, or '' if it is missing, altered or expired"""
+    if not isinstance(token, str) or not token:
+        return ''
+    try:
+        return signing.loads(
+            token, salt=IMAGE_TOKEN_SALT, max_age=getattr(settings, 'DAMAGE_IMAGE_TOKEN_MAX_AGE', 86400),
+        )
+    except signing.BadSignature:
+        return ''
+
+
+def ahash(image, hash_size=8):
+    """Average hash: pixels above the mean of an (8x8) grayscale thumbnail"""
+    small = image.convert('L').resize((hash_size, hash_size), Image.Resampling.LANCZOS)
+    pixels = np.asarray(small, dtype=np.float32)
+    return _bits_to_hex((pixels > pixels.mean()).ravel())
+
+
+def hamming(a, b):
+    """Number of differing bits between two hex hashes"""
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+
+def hashes_to_array(hashes):
+    """Hex hashes -> uint64 NumPy array"""
+    return np.array([int(h, 16) for h in hashes], dtype=np.uint64)
+
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def popcount64(values):
+    """Vectorised (SWAR) popcount of a uint64 array"""
+    values = values - ((values >> np.uint64(1)) & _M1)
+    values = (values & _M2) + ((values >> np.uint64(2)) & _M2)
+    values = (values + (values >> np.uint64(4))) & _M4
+    return (values * _H01) >> np.uint64(56)
+
+
+class AnalysisCache:
+    """Bounded LRU of image hash -> analysis with Hamming-distance lookup"""
+
+    def __init__(self, maxsize=10000, max_distance=6):
+        self.maxsize = maxsize
+        self.max_distance = max_distance
+        self._entries = OrderedDict()
+        self._array = None
+        self._keys = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def get(self, image_hash):
+        """Return (analysis, cached_hash) for the nearest cached photo, or None"""
+        with self._lock:
+            analysis = self._entries.get(image_hash)
+            if analysis is not None:
+                self._entries.move_to_end(image_hash)
+                self.hits += 1
+                return analysis, image_hash
+
+            if self.max_distance and self._entries:
+                if self._array is None:
+                    self._keys = list(self._entries)
+                    self._array = hashes_to_array(self._keys)
+                target = np.uint64(int(image_hash, 16))
+                distances = popcount64(self._array ^ target)
+                best = int(distances.argmin())
+                if distances[best] <= self.max_distance:
+                    key = self._keys[best]
+                    self.near_hits += 1
+                    return self._entries[key], key
+
+            self.misses += 1
+            return None
+
+    def put(self, image_hash, analysis):
+        with self._lock:
+            if image_hash not in self._entries:
+                self._array = None
+            self._entries[image_hash] = analysis
+            self._entries.move_to_end(image_hash)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._array = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'near_hits': self.near_hits,
+                'misses': self.misses,
+            }
+
+
+ANALYSIS_CACHE = AnalysisCache(
+    maxsize=getattr(settings, 'DAMAGE_PHASH_CACHE_SIZE', 10000),
+    max_distance=getattr(settings, 'DAMAGE_PHASH_MAX_DISTANCE', 6),
+)
+
+
+def find_near_duplicates(rows, max_distance):
+    """
+    Group (id, hex hash) rows whose hashes are within ``max_distance`` bits.
+
+    Uses band bucketing: split the 64 bits into ``max_distance + 1`` bands; by
+    the pigeonhole principle two hashes that close must agree on at least one
+    whole band, so only rows sharing a band value are compared.
+    Returns a list of sets of ids, each with at least two members.
+    """
+    if not rows:
+        return []
+    ids = np.array([row[0] for row in rows])
+    values = hashes_to_array([row[1] for row in rows])
+
+    # Union-find over row positions
+    parent = list(range(len(rows)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    bands = max_distance + 1
+    edges = np.linspace(0, 64, bands + 1).astype(int)
+    for low, high in zip(edges[:-1], edges[1:]):
+        mask = np.uint64((1 << (high - low)) - 1)
+        keys = (values >> np.uint64(low)) & mask
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+        for group in np.split(order, boundaries):
+            if len(group) < 2:
+                continue
+            group_values = values[group]
+            # Compare the bucket pairwise in blocks of rows to bound memory
+            for start in range(0, len(group), 256):
+                block = group_values[start:start + 256, None] ^ group_values[None, :]
+                rows_idx, cols_idx = np.nonzero(popcount64(block) <= max_distance)
+                for row, col in zip(rows_idx + start, cols_idx):
+                    if row < col:
+                        parent[find(int(group[col]))] = find(int(group[row]))
+
+    clusters = {}
+    for position in range(len(rows)):
+        clusters.setdefault(find(position), set()).add(ids[position].item())
+    return [members for members in clusters.values() if len(members) > 1]
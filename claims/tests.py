@@ -0,0 +1,204 @@
+import io
+import json
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib import admin
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from core.reference import reset_reference_data
+from core.tests import QueryCountTestCase, seed_policies
+
+from .estimates import RateTable, UnknownRegion
+from .models import DamageClaim, DamageType
+from .transfer import InvalidRow, export_claims, export_rows, import_claims
+
+
+def photo_upload(color=(120, 40, 40)):
+    buffer = io.BytesIO()
+    Image.new('RGB', (320, 240), color).save(buffer, format='JPEG')
+    buffer.seek(0)
+    buffer.name = 'photo.jpg'
+    return buffer
+
+
+@override_settings(READ_DATABASE_ALIAS='default')
+class ImageHashTokenTests(TestCase):
+    """submit_claim stores only image hashes the analyze endpoint signed"""
+
+    CLAIM = {
+        'full_name': 'Sita Sharma', 'email': 'sita@example.com', 'phone': '9800000000',
+        'vehicle_number': 'BA 1 PA 1234', 'damage_description': 'Dented bumper',
+    }
+
+    def setUp(self):
+        reset_reference_data()
+
+    def submit(self, **extra):
+        response = self.client.post(
+            '/api/claims/submit/', json.dumps({**self.CLAIM, **extra}), content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        return DamageClaim.objects.get(pk=response.json()['claim_id'])
+
+    def test_signed_hash_is_stored(self):
+        analysis = self.client.post('/api/claims/analyze/', {'image': photo_upload()}).json()
+        claim = self.submit(image_token=analysis['image_token'])
+        self.assertEqual(claim.image_hash, analysis['image_hash'])
+
+    def test_client_supplied_hash_is_ignored(self):
+        claim = self.submit(image_hash='0123456789abcdef')
+        self.assertEqual(claim.image_hash, '')
+
+    def test_altered_token_is_ignored(self):
+        token = self.client.post('/api/claims/analyze/', {'image': photo_upload()}).json()['image_token']
+        claim = self.submit(image_token='0123456789abcdef' + token[16:])
+        self.assertEqual(claim.image_hash, '')
+
+
+class RateTableTests(SimpleTestCase):
+    def setUp(self):
+        self.table = RateTable.from_config()
+
+    def test_quotes_are_rounded_to_paisa(self):
+        # 15000 * 1.8 * 1.1 is 29700.000000000004 in floating point
+        self.assertEqual(self.table.quote('windshield_damage', 'moderate', 'truck', 'kathmandu'), 29700.0)
+        amounts, total = self.table.quote_parts(
+            [('windshield_damage', 'moderate'), ('bumper_damage', 'minor')], 'truck', 'kathmandu',
+        )
+        self.assertEqual(amounts, [29700.0, 11880.0])
+        self.assertEqual(total, 41580.0)
+
+    def test_region_names_ignore_case_and_whitespace(self):
+        self.assertEqual(self.table.region_factor(' Kathmandu'), 1.1)
+        self.assertEqual(self.table.region_factor(''), 1.0)
+
+    def test_unknown_region_is_rejected(self):
+        with self.assertRaises(UnknownRegion):
+            self.table.quote('bumper_damage', 'moderate', 'car', 'lalitpur')
+
+    def test_analyze_rejects_unknown_region(self):
+        response = self.client.post('/api/claims/analyze/', {'image': photo_upload(), 'region': 'lalitpur'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown region', response.json()['error'])
+
+
+class AdminSearchTests(TestCase):
+    """The claims admin searches by prefix, then by substring when nothing starts with the term"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.claim = DamageClaim.objects.create(
+            full_name='Sita Sharma', email='sita@example.com', phone='9800000000',
+            vehicle_number='BA 1 PA 1234', damage_description='Dented bumper', damage_image='claims/a.jpg',
+        )
+
+    def search(self, term):
+        model_admin = admin.site._registry[DamageClaim]
+        results, _ = model_admin.get_search_results(None, DamageClaim.objects.all(), term)
+        return list(results)
+
+    def test_prefix_match(self):
+        self.assertEqual(self.search('ba 1 pa'), [self.claim])
+
+    def test_substring_fallback(self):
+        self.assertEqual(self.search('Sharma'), [self.claim])
+        self.assertEqual(self.search('PA 1234'), [self.claim])
+        self.assertEqual(self.search('example sita'), [self.claim])
+
+    def test_no_match(self):
+        self.assertEqual(self.search('Gurung'), [])
+
+
+class ClaimQueryCountTests(QueryCountTestCase):
+    """Claims admin pages and the damage type list run a fixed number of queries"""
+
+    def seed(self, rows):
+        DamageClaim.objects.all().delete()
+        DamageType.objects.all().delete()
+        policies = seed_policies(rows)
+        DamageType.objects.bulk_create([DamageType(name=f'Damage {i}', description='') for i in range(rows)])
+        DamageClaim.objects.bulk_create([
+            DamageClaim(full_name=f'Customer {i}', email=f'c{i}@example.com', phone='98',
+                        vehicle_number=f'BA {i} PA', damage_description='', policy=policies[i])
+            for i in range(rows)
+        ])
+        return {}
+
+    def test_admin_claims(self):
+        self.assertPageQueries(4, '/admin/claims/damageclaim/')
+
+    def test_admin_damage_types(self):
+        self.assertPageQueries(5, '/admin/claims/damagetype/')
+
+    def test_api_damage_types(self):
+        self.assertPageQueries(5, '/api/claims/damage-types/')
+
+
+@override_settings(READ_DATABASE_ALIAS='default')
+class ClaimsTransferTests(TestCase):
+    """Every claim the app stores exports and imports back unchanged"""
+
+    def setUp(self):
+        # Submitted through the API: no damage photo
+        response = self.client.post('/api/claims/submit/', json.dumps(ImageHashTokenTests.CLAIM),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        # Queued for analysis without contact details, as analyze_damage_async saves it
+        DamageClaim.objects.create(
+            full_name='', email='', phone='', vehicle_number='', damage_description='',
+            damage_image='claims/damage_images/queued.jpg', analysis_status='queued',
+            ai_analysis={'confidence': 0.91}, matched_clauses=[{'clause_number': '4.1'}],
+        )
+
+    def test_round_trip(self):
+        claims = list(export_rows())
+        self.assertEqual(claims[0]['damage_image'], '')
+        for fmt in ('csv', 'ndjson'):
+            with self.subTest(fmt):
+                data = b''.join(export_claims(fmt))
+                DamageClaim.objects.all().delete()
+                totals = import_claims(io.BytesIO(data), fmt, keep_ids=True)
+                self.assertEqual((totals['imported'], totals['invalid']), (2, 0))
+                self.assertEqual(list(export_rows()), claims)
+
+    def test_keep_ids_reports_taken_ids(self):
+        data = b''.join(export_claims('ndjson'))
+        with self.assertRaisesMessage(InvalidRow, 'already exists'):
+            import_claims(io.BytesIO(data), 'ndjson', keep_ids=True)
+        totals = import_claims(io.BytesIO(data), 'ndjson', keep_ids=True, skip_invalid=True)
+        self.assertEqual((totals['imported'], totals['invalid']), (0, 2))
+
+        with tempfile.NamedTemporaryFile(suffix='.ndjson') as f:
+            f.write(data)
+            f.flush()
+            with self.assertRaisesMessage(CommandError, 'line 1: id: claim'):
+                call_command('import_claims', f.name, '--keep-ids', stdout=io.StringIO())
+
+
+class RequoteClaimsTests(TestCase):
+    """requote_claims re-prices claims with or without UPDATE ... FROM"""
+
+    def setUp(self):
+        self.claim = DamageClaim.objects.create(
+            full_name='Sita Sharma', email='sita@example.com', phone='9800000000',
+            vehicle_number='BA 1 PA 1234', damage_description='Dented bumper', damage_image='claims/a.jpg',
+            detected_damage_type='Bumper Damage', damage_severity='moderate', estimated_coverage='1.00',
+        )
+
+    def requote(self):
+        call_command('requote_claims', stdout=io.StringIO())
+        self.claim.refresh_from_db()
+        return self.claim.estimated_coverage
+
+    def test_requote(self):
+        expected = self.requote()
+        self.assertNotEqual(expected, Decimal('1.00'))
+        DamageClaim.objects.update(estimated_coverage='1.00')
+        # SQLite before 3.33 has no UPDATE ... FROM
+        with mock.patch.object(connection.Database, 'sqlite_version_info', (3, 31, 1)):
+            self.assertEqual(self.requote(), expected)
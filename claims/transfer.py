@@ -0,0 +1,300 @@
+"""
+Bulk export and import of claims as CSV or NDJSON.
+
+Export reads ``DamageClaim`` rows with ``values().iterator(chunk_size)``
+and encodes each chunk as it arrives. Memory stays flat however many
+claims there are, so the same generator backs the streaming
+``export_claims`` endpoint and the ``export_claims`` management command.
+Every concrete column is written under its attribute name (``policy_id``,
+``damage_image`` as the stored file name). ``ai_analysis`` and
+``matched_clauses`` are JSON values in NDJSON and JSON text in CSV.
+Timestamps are ISO 8601. NULL is an empty CSV cell.
+
+Import reads the same formats. Each row is validated with the model
+fields' own ``clean()`` (choices, lengths, e-mail, decimals, required
+values). Empty text and file columns are accepted as '' even where the
+form would require a value, since the app stores them that way, so any
+export imports back. ``policy_id`` is checked against the policy table,
+and valid rows are inserted with ``bulk_create`` in batches of
+``batch_size``, one transaction per batch. ``created_at`` and
+``updated_at`` are kept from the file: an UPDATE in the same
+transaction writes them back over the insert time.
+"""
+import csv
+import datetime
+import io
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, models, reset_queries, transaction
+from django.utils import timezone
+
+from core.db import read_alias
+from core.models import InsurancePolicy
+from core.responses import dumps, loads
+
+from .models import DamageClaim
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+FIELDS = tuple(field.attname for field in DamageClaim._meta.concrete_fields)
+JSON_FIELDS = ('ai_analysis', 'matched_clauses')
+TIMESTAMP_FIELDS = ('created_at', 'updated_at')
+STRING_FIELDS = (models.CharField, models.TextField, models.FileField)
+
+
+def export_rows(queryset=None, chunk_size=2000):
+    """Claim rows as dicts of FIELDS, fetched ``chunk_size`` at a time"""
+    if queryset is None:
+        queryset = DamageClaim.objects.using(read_alias())
+    return queryset.order_by('id').values(*FIELDS).iterator(chunk_size=chunk_size)
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode()
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def encode_csv(rows, chunk_size=2000):
+    """Yield the CSV export of ``rows`` as bytes, a header and then one chunk per ``chunk_size`` rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    yield buffer.getvalue().encode()
+    for batch in _batches(rows, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_cell(row[name]) for name in FIELDS] for row in batch)
+        yield buffer.getvalue().encode()
+
+
+def encode_ndjson(rows, chunk_size=2000):
+    """Yield the NDJSON export of ``rows`` as bytes, one chunk per ``chunk_size`` rows"""
+    for batch in _batches(rows, chunk_size):
+        yield b''.join(dumps(row) + b'\n' for row in batch)
+
+
+ENCODERS = {'csv': encode_csv, 'ndjson': encode_ndjson}
+
+
+def export_claims(fmt, queryset=None, chunk_size=2000):
+    """Byte chunks of the claims export in ``fmt`` ('csv' or 'ndjson')"""
+    return ENCODERS[fmt](export_rows(queryset, chunk_size), chunk_size)
+
+
+class InvalidRow(ValueError):
+    def __init__(self, line, message):
+        self.line = line
+        self.message = message
+        super().__init__(f'line {line}: {message}')
+
+
+# Readers yield (line number, row dict), or (line number, InvalidRow) for a
+# line that cannot be parsed, so one bad line does not end the file
+
+def read_csv(stream):
+    """Rows of a binary CSV stream, JSON columns decoded and empty cells as None"""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+    for row in reader:
+        line = reader.line_num
+        try:
+            for name, value in row.items():
+                if value == '':
+                    row[name] = None
+                elif name in JSON_FIELDS and value is not None:
+                    row[name] = loads(value)
+        except ValueError:
+            row = InvalidRow(line, f'{name}: not valid JSON')
+        yield line, row
+
+
+def read_ndjson(stream):
+    """Rows of a binary NDJSON stream, skipping blank lines"""
+    for line, text in enumerate(stream, 1):
+        if not text.strip():
+            continue
+        try:
+            row = loads(text)
+        except ValueError:
+            row = InvalidRow(line, 'not valid JSON')
+        if not isinstance(row, (dict, InvalidRow)):
+            row = InvalidRow(line, 'expected a JSON object')
+        yield line, row
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson}
+
+
+class ClaimRowValidator:
+    """Turns import rows into unsaved DamageClaim instances, raising InvalidRow"""
+
+    def __init__(self, keep_ids=False):
+        names = FIELDS if keep_ids else tuple(name for name in FIELDS if name != 'id')
+        self.fields = [DamageClaim._meta.get_field(name) for name in names]
+        self.policy_ids = set(InsurancePolicy.objects.values_list('id', flat=True))
+        self.now = timezone.now()
+
+    def __call__(self, line, row):
+        values = {}
+        for field in self.fields:
+            name = field.attname
+            value = row.get(name)
+            try:
+                values[name] = self.clean(field, value)
+            except ValidationError as e:
+                raise InvalidRow(line, f'{name}: {" ".join(e.messages)}')
+        return DamageClaim(**values)
+
+    def clean(self, field, value):
+        name = field.attname
+        if name == 'policy_id':
+            if value is None:
+                return None
+            value = field.target_field.to_python(value)
+            if value not in self.policy_ids:
+                raise ValidationError(f'policy {value} does not exist')
+            return value
+        if name in TIMESTAMP_FIELDS:
+            if value is None:
+                return self.now
+            value = field.to_python(value)
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            return value
+        if name in JSON_FIELDS:
+            default = field.get_default()
+            if value is None:
+                return default
+            if not isinstance(value, type(default)):
+                raise ValidationError(f'expected a JSON {"object" if isinstance(default, dict) else "array"}')
+            return value
+        if value is None and field.has_default():
+            return field.get_default()
+        if value in (None, '') and not field.null and not field.choices and isinstance(field, STRING_FIELDS):
+            # The app itself stores '' in required text and file columns
+            # (claims submitted without a photo, queued analyses without
+            # contact details), so accept it back without the blank check
+            return ''
+        if value is None and field.blank:
+            return field.get_default()
+        return field.clean(value, None)
+
+
+def insert_claims(claims):
+    """
+    bulk_create ``claims`` keeping their created_at / updated_at. The
+    insert applies auto_now_add / auto_now like any save, so the file's
+    values are written back with one prepared UPDATE per row (executemany;
+    bulk_update's CASE expressions are several times slower at this size).
+    """
+    fields = [DamageClaim._meta.get_field(name) for name in TIMESTAMP_FIELDS]
+    stamps = [[getattr(claim, field.attname) for field in fields] for claim in claims]
+    DamageClaim.objects.bulk_create(claims)
+    quote = connection.ops.quote_name
+    assignments = ', '.join(f'{quote(field.column)} = %s' for field in fields)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'UPDATE {quote(DamageClaim._meta.db_table)} SET {assignments} WHERE {quote(DamageClaim._meta.pk.column)} = %s',
+            [[field.get_db_prep_value(value, connection) for field, value in zip(fields, values)] + [claim.pk]
+             for claim, values in zip(claims, stamps)],
+        )
+    for claim, values in zip(claims, stamps):
+        for field, value in zip(fields, values):
+            setattr(claim, field.attname, value)
+
+
+def import_claims(stream, fmt, batch_size=1000, keep_ids=False, skip_invalid=False, dry_run=False,
+                  stdout=None):
+    """
+    Validate and insert the claims in a binary ``stream``. Returns
+    {'imported': n, 'invalid': n, 'seconds': s, 'rows_per_sec': r}.
+
+    An invalid row raises InvalidRow (batches before it stay committed)
+    unless ``skip_invalid``, which reports it to ``stdout`` and carries
+    on. With ``keep_ids``, an id that is already taken makes the row
+    invalid. ``dry_run`` validates the whole file without writing.
+    """
+    validate = ClaimRowValidator(keep_ids=keep_ids)
+    started = time.perf_counter()
+    imported = invalid = 0
+    batch = []  # (line, claim)
+
+    def reject(error):
+        nonlocal invalid
+        if not skip_invalid:
+            raise error
+        invalid += 1
+        if stdout:
+            stdout.write(f'Skipped {error}')
+
+    def taken_ids(claims):
+        ids = [claim.pk for claim in claims]
+        return set(DamageClaim.objects.filter(pk__in=ids).values_list('pk', flat=True))
+
+    def flush():
+        nonlocal imported
+        if keep_ids:
+            taken = taken_ids(claim for _, claim in batch)
+            kept = []
+            for line, claim in batch:
+                if claim.pk in taken:
+                    reject(InvalidRow(line, f'id: claim {claim.pk} already exists'))
+                    continue
+                # Later rows of this batch must not reuse the id either
+                taken.add(claim.pk)
+                kept.append((line, claim))
+            batch[:] = kept
+        claims = [claim for _, claim in batch]
+        if claims and not dry_run:
+            try:
+                # One transaction per batch: the write lock is released
+                # between batches, and a failed insert rolls back only its
+                # own batch
+                with transaction.atomic():
+                    insert_claims(claims)
+            except IntegrityError as e:
+                raise InvalidRow(batch[0][0], f'rows up to line {batch[-1][0]} not imported: {e}')
+            # With DEBUG on, connection.queries keeps the last 9000 INSERTs,
+            # hundreds of MB at this size
+            reset_queries()
+        imported += len(claims)
+        batch.clear()
+
+    for line, row in READERS[fmt](stream):
+        try:
+            if isinstance(row, InvalidRow):
+                raise row
+            batch.append((line, validate(line, row)))
+        except InvalidRow as e:
+            reject(e)
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'imported': imported,
+        'invalid': invalid,
+        'seconds': round(elapsed, 2),
+        'rows_per_sec': round(imported / elapsed) if elapsed else 0,
+    }
@@ -3,8 +3,11 @@ from . import views
 
 urlpatterns = [
     path('analyze/', views.analyze_damage, name='analyze_damage'),
+    path('analyze/batch/', views.analyze_damage_batch, name='analyze_damage_batch'),
+    path('analyze/queue/', views.analyze_damage_async, name='analyze_damage_async'),
     path('submit/', views.submit_claim, name='submit_claim'),
     path('status/<int:claim_id>/', views.get_claim_status, name='get_claim_status'),
     path('damage-types/', views.get_damage_types, name='get_damage_types'),
+    path('export/', views.export_claims, name='export_claims'),
     path('rejection-reasons/', views.get_rejection_reasons, name='get_rejection_reasons'),
 ]
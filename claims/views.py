@@ -1,84 +1,424 @@
 import json
 import random
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
-from .models import DamageClaim, DamageType
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from core.db import read_alias
+from core.decorators import csrf_exempt, require_http_methods
+from core.metrics import span
+from .models import DamageClaim
 from core.models import InsurancePolicy, PolicyClause
+from core.reference import reference_data
+from core.responses import JsonResponse, streaming_content
+from core.search import search_clauses
+from .estimates import DAMAGE_METADATA, UnknownRegion, get_rate_table
+from .imaging import ImageRejected, ingest_image, use_limited_upload_handler
+from .jobs import ANALYSIS_QUEUE, QueueFull
+from .phash import ANALYSIS_CACHE, dhash, sign_image_hash, verified_image_hash
+from .transfer import FORMATS, export_claims as export_chunks
+
+
+def detect_damage(ingested):
+    """Run damage detection on an IngestedImage"""
+    # SIMULATED AI DETECTION
+    # In production, replace this with: model.predict(ingested.image)
+    return {
+        'damage_key': random.choice(list(DAMAGE_METADATA.keys())),
+        'severity': random.choice(['minor', 'moderate', 'severe']),
+        'confidence': random.randint(85, 99),
+    }
+
+
+def detect_damage_batch(ingested_images):
+    """Run damage detection on several IngestedImages in one call"""
+    # SIMULATED AI DETECTION
+    # In production, stack the images and run a single batched forward
+    # pass: model.predict([ingested.image for ingested in ingested_images])
+    return [detect_damage(ingested) for ingested in ingested_images]
+
+
+def detect_damage_cached(ingested):
+    """
+    Detection with a perceptual-hash cache: re-uploads and re-compressed
+    copies of a photo reuse the earlier result. Returns (detection, hash, hit).
+    """
+    image_hash = dhash(ingested.image)
+    cached = ANALYSIS_CACHE.get(image_hash)
+    if cached is not None:
+        return cached[0], image_hash, True
+    detection = detect_damage(ingested)
+    ANALYSIS_CACHE.put(image_hash, detection)
+    return detection, image_hash, False
+
+
+SEVERITY_ORDER = ['minor', 'moderate', 'severe']
+
+
+def estimate_repair(damage_key, severity, vehicle_type='car', region=None):
+    """Repair estimate in NPR for one damage type at a given severity"""
+    return get_rate_table().quote(damage_key, severity, vehicle_type, region)
+
+
+DOCUMENTS_NEEDED = [
+    'Bluebook (Original)',
+    'Driving License',
+    'Photos of spot',
+]
+
+
+def run_analysis(ingested, policy_id=None, vehicle_type='car', region=None):
+    """
+    Detect damage on an IngestedImage, match it with Policy Clauses and
+    price the repair in NPR. Used by the background workers (claims.jobs);
+    analyze_damage runs the two halves in different threads.
+    """
+    return finish_analysis(*run_detection(ingested), policy_id=policy_id, vehicle_type=vehicle_type,
+                           region=region)
+
+
+def run_detection(ingested):
+    """Step 1 of run_analysis, CPU only (no database), so it can run in any thread"""
+    # 1. AI DETECTION (skipped for photos we have already analysed)
+    with span('detect'):
+        return detect_damage_cached(ingested)
+
+
+def finish_analysis(detection, image_hash, from_cache, policy_id=None, vehicle_type='car', region=None):
+    """Steps 2 and 3 of run_analysis; the clause search queries the database"""
+    detected_key = detection['damage_key']
+    meta = DAMAGE_METADATA[detected_key]
+    severity = detection['severity']
+    confidence = detection['confidence']
+
+    # 2. DYNAMIC CLAUSE MATCHING
+    # Ranked full-text search over clause titles, descriptions and conditions
+    with span('clauses'):
+        relevant_clauses = search_clauses(detected_key.replace('_', ' '), policy_id=policy_id)
+
+    # 3. CALCULATION LOGIC
+    with span('estimate'):
+        estimated_total = estimate_repair(detected_key, severity, vehicle_type, region)
+
+    return {
+        'analysis': {
+            'damage_type': meta['name'],
+            'severity': severity,
+            'confidence': f"{confidence}%",
+            'is_covered': meta['covered']
+        },
+        'estimate': {
+            'amount': estimated_total,
+            'currency': 'NPR',
+            'note': 'Estimated based on standard Nepal workshop rates.'
+        },
+        'clauses': relevant_clauses,
+        'image_hash': image_hash,
+        'from_cache': from_cache,
+    }
 
-# Configuration for simulated AI Analysis
-DAMAGE_METADATA = {
-    'bumper_damage': {'name': 'Bumper Damage', 'covered': True, 'base_cost': 12000},
-    'windshield_damage': {'name': 'Windshield Damage', 'covered': True, 'base_cost': 15000},
-    'wheel_damage': {'name': 'Wheel/Rim Damage', 'covered': False, 'base_cost': 8000},
-    'door_damage': {'name': 'Door Damage', 'covered': True, 'base_cost': 18000},
-}
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def analyze_damage(request):
+async def analyze_damage(request):
     """
     Analyzes uploaded image, matches it with database Policy Clauses,
     and returns a repair estimate in NPR.
     """
     try:
-        image = request.FILES.get('image')
+        # Stream the upload to a size-limited temp file instead of memory
+        upload_handler = use_limited_upload_handler(request)
+        with span('upload'):
+            image = request.FILES.get('image')
+        if upload_handler.exceeded:
+            return JsonResponse({'success': False, 'error': 'Image file is too large'}, status=413)
         if not image:
             return JsonResponse({'success': False, 'error': 'No image provided'}, status=400)
+        try:
+            region = get_rate_table().normalize_region(request.POST.get('region'))
+        except UnknownRegion as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+        # Decode off the event loop at reduced resolution, without EXIF
+        try:
+            with span('ingest'):
+                ingested = await sync_to_async(ingest_image, thread_sensitive=False)(image)
+        except ImageRejected as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=e.status)
+
+        # Detection is CPU work and stays off the thread-sensitive executor.
+        # Clause search queries the database, so it runs on the thread whose
+        # connection Django manages (closed or reused per CONN_MAX_AGE)
+        detected = await sync_to_async(run_detection, thread_sensitive=False)(ingested)
+        # Ranked clause search can be limited to the user's policy; the
+        # estimate depends on vehicle type and region
+        policy_id = request.POST.get('policy_id')
+        result = await sync_to_async(finish_analysis)(
+            *detected,
+            policy_id=int(policy_id) if policy_id and policy_id.isdigit() else None,
+            vehicle_type=request.POST.get('vehicle_type') or 'car',
+            region=region,
+        )
+
+        return JsonResponse({
+            'success': True,
+            **result,
+            'image_token': sign_image_hash(result['image_hash']),
+            'documents_needed': DOCUMENTS_NEEDED,
+        })
+
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+def ingest_and_hash(uploaded_file):
+    """Preprocess one photo of a batch; returns (IngestedImage, hash) or the ImageRejected"""
+    try:
+        ingested = ingest_image(uploaded_file)
+    except ImageRejected as e:
+        return e
+    return ingested, dhash(ingested.image)
+
+
+def run_batch_analysis(uploaded_files, policy_id=None, vehicle_type='car', region=None):
+    """
+    Analyse all photos of a claim together: preprocessing runs in a thread
+    pool (Pillow releases the GIL while decoding and resizing), uncached
+    photos go through one batched detection call, each detected damage
+    type is searched once, and photos of the same damage are priced once
+    at the worst severity seen.
+    """
+    return finish_batch_analysis(*run_batch_detection(uploaded_files), policy_id=policy_id,
+                                 vehicle_type=vehicle_type, region=region)
+
 
-        # 1. SIMULATE AI DETECTION
-        # In production, replace this with: model.predict(image)
-        detected_key = random.choice(list(DAMAGE_METADATA.keys()))
-        meta = DAMAGE_METADATA[detected_key]
-        severity = random.choice(['minor', 'moderate', 'severe'])
-        confidence = random.randint(85, 99)
+def run_batch_detection(uploaded_files):
+    """
+    The CPU-only part of run_batch_analysis (no database): returns
+    (photos, damages) with per-photo results and the worst severity and
+    photo count per damage key.
+    """
+    workers = min(len(uploaded_files), getattr(settings, 'DAMAGE_BATCH_WORKERS', 4)) or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        prepared = list(pool.map(ingest_and_hash, uploaded_files))
+
+    photos = []
+    detections = {}  # image hash -> detection
+    uncached = {}  # image hash -> IngestedImage, one per distinct photo
+    for uploaded_file, item in zip(uploaded_files, prepared):
+        if isinstance(item, ImageRejected):
+            photos.append({'name': uploaded_file.name, 'error': str(item)})
+            continue
+        ingested, image_hash = item
+        photos.append({'name': uploaded_file.name, 'image_hash': image_hash,
+                       'image_token': sign_image_hash(image_hash)})
+        if image_hash in detections or image_hash in uncached:
+            continue
+        cached = ANALYSIS_CACHE.get(image_hash)
+        if cached is not None:
+            detections[image_hash] = cached[0]
+        else:
+            uncached[image_hash] = ingested
 
-        # 2. DYNAMIC CLAUSE MATCHING
-        # We query the Core app models to find real clauses matching the damage
-        relevant_clauses = PolicyClause.objects.filter(
-            title__icontains=detected_key.replace('_', ' ')
-        ).values('clause_number', 'title', 'description', 'is_covered')
+    if uncached:
+        for image_hash, detection in zip(uncached, detect_damage_batch(list(uncached.values()))):
+            ANALYSIS_CACHE.put(image_hash, detection)
+            detections[image_hash] = detection
 
-        # 3. CALCULATION LOGIC
-        severity_multiplier = {'minor': 0.5, 'moderate': 1.0, 'severe': 2.5}
-        estimated_total = meta['base_cost'] * severity_multiplier[severity]
+    damages = {}
+    for photo in photos:
+        if 'error' in photo:
+            continue
+        detection = detections[photo['image_hash']]
+        key, severity = detection['damage_key'], detection['severity']
+        meta = DAMAGE_METADATA[key]
+        photo['from_cache'] = photo['image_hash'] not in uncached
+        photo['analysis'] = {
+            'damage_type': meta['name'],
+            'severity': severity,
+            'confidence': f"{detection['confidence']}%",
+            'is_covered': meta['covered'],
+        }
+        damage = damages.setdefault(key, {'severity': severity, 'photos': 0})
+        damage['photos'] += 1
+        if SEVERITY_ORDER.index(severity) > SEVERITY_ORDER.index(damage['severity']):
+            damage['severity'] = severity
+    return photos, damages
+
+
+def finish_batch_analysis(photos, damages, policy_id=None, vehicle_type='car', region=None):
+    """Clause search (database) and pricing for run_batch_detection's results"""
+    # One clause search per distinct damage type, not per photo
+    clauses = {
+        DAMAGE_METADATA[key]['name']: search_clauses(key.replace('_', ' '), policy_id=policy_id)
+        for key in damages
+    }
+
+    # All damaged parts priced in one vectorised lookup
+    amounts, total = get_rate_table().quote_parts(
+        [(key, damage['severity']) for key, damage in damages.items()], vehicle_type, region
+    )
+    summary = []
+    covered_total = 0
+    for (key, damage), amount in zip(damages.items(), amounts):
+        meta = DAMAGE_METADATA[key]
+        if meta['covered']:
+            covered_total += amount
+        summary.append({
+            'damage_type': meta['name'],
+            'severity': damage['severity'],
+            'is_covered': meta['covered'],
+            'photos': damage['photos'],
+            'amount': amount,
+        })
+
+    return {
+        'photos': photos,
+        'damages': summary,
+        'clauses': clauses,
+        'estimate': {
+            'amount': total,
+            'covered_amount': round(covered_total, 2),
+            'currency': 'NPR',
+            'note': 'Each damage type is priced once, at the worst severity seen across photos.'
+        },
+    }
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def analyze_damage_batch(request):
+    """
+    Analyzes all photos of a claim (multipart field ``images``, repeated)
+    in one request and returns per-photo results plus one aggregated
+    estimate in NPR.
+    """
+    try:
+        upload_handler = use_limited_upload_handler(request)
+        images = request.FILES.getlist('images')
+        if upload_handler.exceeded:
+            return JsonResponse({'success': False, 'error': 'Image file is too large'}, status=413)
+        if not images:
+            return JsonResponse({'success': False, 'error': 'No images provided'}, status=400)
+        max_images = getattr(settings, 'DAMAGE_BATCH_MAX_IMAGES', 20)
+        if len(images) > max_images:
+            return JsonResponse(
+                {'success': False, 'error': f'At most {max_images} images per request'}, status=400
+            )
+        try:
+            region = get_rate_table().normalize_region(request.POST.get('region'))
+        except UnknownRegion as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+        # CPU-bound detection off the thread-sensitive executor, database
+        # work on it (see analyze_damage)
+        detected = await sync_to_async(run_batch_detection, thread_sensitive=False)(images)
+        policy_id = request.POST.get('policy_id')
+        result = await sync_to_async(finish_batch_analysis)(
+            *detected,
+            policy_id=int(policy_id) if policy_id and policy_id.isdigit() else None,
+            vehicle_type=request.POST.get('vehicle_type') or 'car',
+            region=region,
+        )
+        if not result['damages']:
+            return JsonResponse({'success': False, 'error': 'No usable images', 'photos': result['photos']}, status=400)
 
         return JsonResponse({
             'success': True,
-            'analysis': {
-                'damage_type': meta['name'],
-                'severity': severity,
-                'confidence': f"{confidence}%",
-                'is_covered': meta['covered']
-            },
-            'estimate': {
-                'amount': estimated_total,
-                'currency': 'NPR',
-                'note': 'Estimated based on standard Nepal workshop rates.'
-            },
-            'clauses': list(relevant_clauses),
-            'documents_needed': [
-                'Bluebook (Original)', 
-                'Driving License', 
-                'Photos of spot'
-            ]
+            **result,
+            'documents_needed': DOCUMENTS_NEEDED,
         })
 
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
+
+def queue_full_response():
+    response = JsonResponse(
+        {'success': False, 'error': 'Analysis queue is full, please retry shortly'}, status=429
+    )
+    response['Retry-After'] = '5'
+    return response
+
+
+def create_queued_claim(ingested, fields):
+    """Save the processed photo on a new claim marked for background analysis"""
+    return DamageClaim.objects.create(
+        damage_image=ingested.to_content_file(),
+        analysis_status='queued',
+        status='pending',
+        **fields,
+    )
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def analyze_damage_async(request):
+    """
+    Accepts a damage photo (plus optional claim details), queues it for
+    background analysis and returns the claim id at once. Poll
+    status/<claim_id>/ for the result.
+    """
+    try:
+        # Cheap early refusal before reading the upload
+        if not await sync_to_async(ANALYSIS_QUEUE.has_room)():
+            return queue_full_response()
+
+        upload_handler = use_limited_upload_handler(request)
+        image = request.FILES.get('image')
+        if upload_handler.exceeded:
+            return JsonResponse({'success': False, 'error': 'Image file is too large'}, status=413)
+        if not image:
+            return JsonResponse({'success': False, 'error': 'No image provided'}, status=400)
+
+        try:
+            ingested = await sync_to_async(ingest_image, thread_sensitive=False)(image)
+        except ImageRejected as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=e.status)
+
+        fields = {
+            name: request.POST.get(name, '')
+            for name in ('full_name', 'email', 'phone', 'vehicle_number', 'damage_description')
+        }
+        fields['vehicle_type'] = request.POST.get('vehicle_type') or 'car'
+        policy_id = request.POST.get('policy_id')
+        if policy_id and policy_id.isdigit():
+            fields['policy_id'] = int(policy_id)
+
+        claim = await sync_to_async(create_queued_claim)(ingested, fields)
+        try:
+            ANALYSIS_QUEUE.submit(claim.id)
+        except QueueFull:
+            await DamageClaim.objects.filter(pk=claim.id).adelete()
+            return queue_full_response()
+
+        return JsonResponse({
+            'success': True,
+            'claim_id': claim.id,
+            'analysis_status': claim.analysis_status,
+            'status_url': reverse('get_claim_status', args=[claim.id]),
+        }, status=202)
+
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
-def submit_claim(request):
+async def submit_claim(request):
     """Saves the final claim to the database."""
     try:
         data = json.loads(request.body)
-        claim = DamageClaim.objects.create(
+        claim = await DamageClaim.objects.acreate(
             full_name=data.get('full_name'),
             vehicle_number=data.get('vehicle_number'),
             email=data.get('email'),
             phone=data.get('phone'),
             damage_description=data.get('damage_description'),
+            # Only a hash this server computed and signed in analyze_damage
+            image_hash=verified_image_hash(data.get('image_token')),
             status='pending'
         )
         return JsonResponse({'success': True, 'claim_id': claim.id})
@@ -88,5 +428,84 @@ def submit_claim(request):
 @require_http_methods(["GET"])
 def get_damage_types(request):
     """Returns list for frontend dropdowns."""
-    types = DamageType.objects.all().values('name', 'typically_covered')
-    return JsonResponse({'damage_types': list(types)})
\ No newline at end of file
+    return JsonResponse({'damage_types': list(reference_data().damage_types)})
+
+@require_http_methods(["GET"])
+def get_claim_status(request, claim_id):
+    """Returns the current status of a submitted claim."""
+    try:
+        claim = DamageClaim.objects.get(id=claim_id)
+        data = {
+            'success': True,
+            'claim_id': claim.id,
+            'status': claim.status,
+            'status_display': claim.get_status_display(),
+            'eligibility_reason': claim.eligibility_reason,
+            'analysis_status': claim.analysis_status,
+        }
+        if claim.analysis_status == 'done':
+            data.update(claim.ai_analysis)
+            data['clauses'] = claim.matched_clauses
+        elif claim.analysis_status == 'failed':
+            data['analysis_error'] = claim.ai_analysis.get('error', '')
+        return JsonResponse(data)
+    except DamageClaim.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Claim not found'}, status=404)
+
+
+# Common claim rejection reasons shown in the transparency section
+REJECTION_REASONS = [
+    {
+        'reason': 'Policy Exclusions',
+        'description': 'The damage falls under an exclusion listed in your policy document.',
+        'how_to_avoid': 'Read the exclusions section of your policy before you need to claim.',
+    },
+    {
+        'reason': 'Late Reporting',
+        'description': 'The insurer was notified more than 24-48 hours after the incident.',
+        'how_to_avoid': 'Call your insurer hotline immediately, even before collecting documents.',
+    },
+    {
+        'reason': 'Missing Documents',
+        'description': 'The claim file is incomplete or documents are expired.',
+        'how_to_avoid': 'Keep your Bluebook, license and policy copies ready and up to date.',
+    },
+    {
+        'reason': 'Pre-existing Damage',
+        'description': 'The damage existed before the policy start date.',
+        'how_to_avoid': 'Photograph your vehicle when buying or renewing the policy.',
+    },
+    {
+        'reason': 'Unauthorized Repairs',
+        'description': 'Repairs were started before the surveyor inspected the vehicle.',
+        'how_to_avoid': 'Wait for the survey and written approval before repairing.',
+    },
+    {
+        'reason': 'Drunk Driving',
+        'description': 'The incident happened under the influence of alcohol.',
+        'how_to_avoid': 'Never drive after drinking; such claims are always rejected.',
+    },
+]
+
+
+@require_http_methods(["GET"])
+def get_rejection_reasons(request):
+    """Returns common rejection reasons for the transparency section."""
+    return JsonResponse({'rejection_reasons': REJECTION_REASONS})
+
+
+@staff_member_required
+@require_http_methods(["GET"])
+def export_claims(request):
+    """Admin-only streaming export of every claim as CSV or NDJSON (?format=, optional ?status=)"""
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in FORMATS:
+        return JsonResponse({'error': f"format must be one of: {', '.join(FORMATS)}"}, status=400)
+    queryset = None
+    if request.GET.get('status'):
+        queryset = DamageClaim.objects.using(read_alias()).filter(status=request.GET['status'])
+    chunks = export_chunks(fmt, queryset, chunk_size=getattr(settings, 'CLAIMS_EXPORT_CHUNK_SIZE', 2000))
+    response = StreamingHttpResponse(streaming_content(request, chunks), content_type=FORMATS[fmt])
+    stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+    response['Content-Disposition'] = f'attachment; filename="claims-{stamp}.{fmt}"'
+    return response
@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.db import connection
 from .models import InsurancePolicy, PolicyClause
+from .search import get_clause_index
 
 
 class PolicyClauseInline(admin.TabularInline):
@@ -20,3 +22,14 @@ class PolicyClauseAdmin(admin.ModelAdmin):
     list_display = ['clause_number', 'title', 'policy', 'is_covered']
     list_filter = ['is_covered', 'policy']
     search_fields = ['title', 'description']
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the clause full-text index instead of LIKE '%term%' scans
+        if not search_term.strip():
+            return queryset, False
+        max_ids = connection.features.max_query_params or 10000
+        hits = get_clause_index().search(search_term, limit=max_ids + 1)
+        if len(hits) > max_ids:
+            # Too many matches for one IN list: let the database search them all
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(id__in=[hit.clause_id for hit in hits]), False
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .db import configure_sqlite
+        from .metrics import install_db_wrapper, metrics_enabled
+
+        connection_created.connect(configure_sqlite, dispatch_uid='core.db.configure_sqlite')
+        if metrics_enabled():
+            connection_created.connect(install_db_wrapper, dispatch_uid='core.metrics.db_wrapper')
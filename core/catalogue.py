@@ -0,0 +1,97 @@
+"""
+Versioned response cache for the policy catalogue API.
+
+Cached responses are keyed by the catalogue version and the ETag, which
+already covers the request's filters/page and the catalogue fingerprint.
+The version is bumped by the InsurancePolicy / PolicyClause signal
+handlers, so every cached page is dropped on a save. The fingerprint
+(policy and clause counts and the latest policy ``updated_at`` across
+the whole catalogue, see ``core.reference``) additionally keeps another
+process's stale cache from being served when the cache backend is
+per-process.
+
+``cached_page`` applies the same version to whole rendered pages (home,
+about): the key adds the active language and the static manifest hash, so
+a policy change, another language or a new ``build_static`` each render
+the page afresh.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.utils.translation import get_language
+
+VERSION_KEY = 'policies:version'
+
+
+def _cache():
+    return caches[getattr(settings, 'POLICY_CACHE_ALIAS', 'default')]
+
+
+def catalogue_version():
+    version = _cache().get(VERSION_KEY)
+    if version is None:
+        _cache().add(VERSION_KEY, 1, None)
+        version = _cache().get(VERSION_KEY, 1)
+    return version
+
+
+def bump_catalogue_version():
+    """Invalidate every cached catalogue response"""
+    try:
+        _cache().incr(VERSION_KEY)
+    except ValueError:
+        # Key missing (first save, or evicted): any new value invalidates
+        _cache().set(VERSION_KEY, catalogue_version() + 1, None)
+
+
+def cache_key(etag):
+    return f'policies:{catalogue_version()}:{etag}'
+
+
+def get_cached(etag):
+    return _cache().get(cache_key(etag))
+
+
+def set_cached(etag, content):
+    _cache().set(cache_key(etag), content, getattr(settings, 'POLICY_CACHE_TIMEOUT', 300))
+
+
+def page_cache_key(name):
+    manifest = getattr(staticfiles_storage, 'manifest_hash', '')
+    return f'pages:{catalogue_version()}:{manifest}:{name}:{get_language()}'
+
+
+def cached_page(view):
+    """
+    Cache a view's rendered page. Only for pages that are the same for
+    every visitor in a language: no user, session, CSRF token or query
+    string may affect the output.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+            return view(request, *args, **kwargs)
+        key = page_cache_key(view.__name__)
+        cached = _cache().get(key)
+        if cached is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+            etag = quote_etag(hashlib.sha1(response.content).hexdigest())
+            cached = (response.content, response['Content-Type'], etag)
+            _cache().set(key, cached, getattr(settings, 'PAGE_CACHE_TIMEOUT', 600))
+        content, content_type, etag = cached
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    return wrapper
@@ -0,0 +1,46 @@
+"""
+SQLite connection tuning and read routing.
+
+``configure_sqlite`` runs on every new SQLite connection (wired to
+``connection_created`` in ``CoreConfig.ready``) and applies
+``SQLITE_PRAGMAS``. The defaults put the database in WAL mode so readers
+never block the writer, wait on locks instead of failing with "database
+is locked", and keep hot pages in memory:
+
+``journal_mode=wal``
+    Readers see the last committed snapshot while a write is in progress.
+``synchronous=normal``
+    Safe in WAL mode: a power cut can lose the last commits but never
+    corrupts the database.
+``busy_timeout``
+    Milliseconds a connection waits for a lock before raising.
+``mmap_size`` / ``cache_size``
+    Memory-mapped reads and a larger page cache (negative = KiB).
+
+The ``READ_DATABASE_ALIAS`` connection points at the same file and is
+opened with ``query_only``; read-heavy endpoints send their queries there
+via ``read_alias()`` so they never queue behind write transactions on the
+default connection.
+"""
+from django.conf import settings
+from django.db import connections
+
+
+def read_alias():
+    """Database alias for read-only endpoint queries"""
+    alias = getattr(settings, 'READ_DATABASE_ALIAS', 'default')
+    return alias if alias in connections.settings else 'default'
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created receiver applying SQLITE_PRAGMAS (and query_only on the read alias)"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    if connection.alias != 'default' and connection.alias == getattr(settings, 'READ_DATABASE_ALIAS', None):
+        # journal_mode is a property of the file; the read connection
+        # must not try to change it
+        pragmas.pop('journal_mode', None)
+        pragmas['query_only'] = 'on'
+    for name, value in pragmas.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,30 @@
+"""Hot policy queries checked by ``manage.py check_query_plans``"""
+from .models import PolicyClause
+from .query_audit import hot_query
+
+
+@hot_query('core.clauses.by_policy_covered')
+def clauses_by_policy_covered():
+    return PolicyClause.objects.filter(policy_id=1, is_covered=True)
+
+
+@hot_query('core.admin.clauses_filter_excluded')
+def admin_clauses_filter_excluded():
+    return PolicyClause.objects.filter(is_covered=False).order_by('-pk')[:100]
+
+
+@hot_query('core.admin.clauses_filter_covered',
+           allow_scan='Most clauses are covered, so a newest-first scan fills the page almost at once')
+def admin_clauses_filter_covered():
+    return PolicyClause.objects.filter(is_covered=True).order_by('-pk')[:100]
+
+
+@hot_query('core.admin.clauses_filter_policy')
+def admin_clauses_filter_policy():
+    return PolicyClause.objects.filter(policy_id=1).order_by('-pk')[:100]
+
+
+@hot_query('core.search.clause_rows')
+def clause_rows():
+    return PolicyClause.objects.filter(id__in=[1, 2, 3]).values('id', 'clause_number', 'title')
+
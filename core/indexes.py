@@ -0,0 +1,25 @@
+"""
+Index types shared by the apps' ``Meta.indexes``.
+"""
+from django.db import models
+from django.db.models import F
+from django.db.models.functions import Collate
+
+
+class CaseInsensitiveIndex(models.Index):
+    """
+    Index usable by case-insensitive prefix lookups (``istartswith``,
+    admin ``^field`` search). Django runs those as ``LIKE`` on SQLite,
+    which can only use an index built with the NOCASE collation; other
+    databases get a plain index on the same fields.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor != 'sqlite':
+            return super().create_sql(model, schema_editor, using=using, **kwargs)
+        nocase = models.Index(
+            *[Collate(F(field), 'NOCASE') for field in self.fields],
+            name=self.name,
+            condition=self.condition,
+        )
+        return nocase.create_sql(model, schema_editor, using=using, **kwargs)
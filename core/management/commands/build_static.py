@@ -0,0 +1,48 @@
+import os
+
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from core.storage import PrecompressedManifestStaticFilesStorage, available_encodings, is_project_asset
+
+SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+
+class Command(BaseCommand):
+    help = 'Collect static files minified, content-hashed and precompressed (gzip/brotli) into STATIC_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true', help='Delete STATIC_ROOT contents first')
+        parser.add_argument('--all', action='store_true', help='List app files (admin, DRF) too')
+
+    def handle(self, *args, **options):
+        call_command('collectstatic', interactive=False, clear=options['clear'], verbosity=0)
+        storage = staticfiles_storage._wrapped
+        if not isinstance(storage, PrecompressedManifestStaticFilesStorage):
+            raise CommandError(
+                "STORAGES['staticfiles'] must be core.storage.PrecompressedManifestStaticFilesStorage"
+            )
+        encodings = [encoding for encoding in SUFFIXES if encoding in available_encodings()]
+        if 'br' not in encodings:
+            self.stdout.write('brotli is not installed (pip install brotli): writing gzip variants only')
+
+        columns = ['source', 'built'] + encodings
+        self.stdout.write(f"{'file':<40}" + ''.join(f'{column:>10}' for column in columns))
+        totals = dict.fromkeys(columns, 0)
+        for name, hashed in sorted(storage.hashed_files.items()):
+            source = finders.find(name)
+            if not source:
+                continue
+            sizes = {'source': os.path.getsize(source), 'built': storage.size(hashed)}
+            for encoding in encodings:
+                variant = hashed + SUFFIXES[encoding]
+                # Not compressed (or no smaller): clients download the built file
+                sizes[encoding] = storage.size(variant) if storage.exists(variant) else sizes['built']
+            for column in columns:
+                totals[column] += sizes[column]
+            if options['all'] or is_project_asset(name):
+                self.stdout.write(f'{hashed:<40}' + ''.join(f'{sizes[column]:>10}' for column in columns))
+        self.stdout.write(f"{'all files':<40}" + ''.join(f'{totals[column]:>10}' for column in columns))
+        self.stdout.write(self.style.SUCCESS(f'Built {len(storage.hashed_files)} files into {storage.location}'))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.query_audit import audit, discover, partial_indexes, supported
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN every registered hot query (hot_queries modules) and fail on full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--show-plans', action='store_true', help='Print every query plan')
+
+    def handle(self, *args, **options):
+        if not supported(options['database']):
+            vendor = connections[options['database']].vendor
+            self.stdout.write(self.style.WARNING(
+                f'Skipped: the query plan audit reads SQLite query plans; {options["database"]} is {vendor}'
+            ))
+            return
+        failures = []
+        partial = partial_indexes(options['database'])
+        for name, query in sorted(discover().items()):
+            result = audit(query, using=options['database'], partial=partial)
+            if result.scans and not query.allow_scan:
+                failures.append(name)
+                status = self.style.ERROR('FULL SCAN')
+            elif result.scans:
+                status = self.style.WARNING('scan ok')
+            else:
+                status = self.style.SUCCESS('ok')
+            self.stdout.write(f'{status:>20}  {name}')
+            if result.scans and query.allow_scan:
+                self.stdout.write(f'{"":>11}{query.allow_scan}')
+            for line in result.sorts:
+                self.stdout.write(self.style.WARNING(f'{"":>11}{line}'))
+            if options['show_plans'] or (result.scans and not query.allow_scan):
+                for line in result.plan:
+                    self.stdout.write(f'{"":>11}| {line}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} hot query(s) do full scans: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS(f'All {len(discover())} hot queries are index-backed'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from core.search import get_clause_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the policy clause search index from the PolicyClause table'
+
+    def handle(self, *args, **options):
+        index = get_clause_index()
+        index.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt clause index ({type(index).__name__})'))
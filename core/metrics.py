@@ -0,0 +1,179 @@
+"""
+Request metrics: fixed-bucket histograms, named spans and DB timing.
+
+``core.middleware.MetricsMiddleware`` measures every request (wall time,
+DB query count and time, request and response bytes) per resolved view,
+and views mark their main stages with ``span('name')``. Everything lands
+in process-local histograms rendered in Prometheus text format by the
+admin-only ``/metrics/`` endpoint, and each response gets a
+``Server-Timing`` header with its DB time and spans.
+
+DB queries are counted by an execute wrapper installed on every new
+connection; it only does work while a request is being measured, and
+contextvars carry the request into ``sync_to_async`` threads. With
+``METRICS_ENABLED = False`` the middleware removes itself, no wrapper is
+installed and ``span()`` returns at once.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def metrics_enabled():
+    return getattr(settings, 'METRICS_ENABLED', False)
+
+
+class Histogram:
+    """Prometheus-style histogram with fixed upper bounds, one series per label tuple"""
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [per-bucket counts (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total) in sorted(self.snapshot().items()):
+            label_text = ','.join(
+                f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)
+            )
+            prefix = f'{label_text},' if label_text else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return '\n'.join(lines)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Request wall time by view', ('view', 'method', 'status'), LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries run per request', ('view',), QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in database queries per request', ('view',), LATENCY_BUCKETS,
+)
+REQUEST_SIZE = Histogram(
+    'http_request_size_bytes', 'Request body size (Content-Length)', ('view',), SIZE_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Response body size (streaming responses excluded)', ('view',), SIZE_BUCKETS,
+)
+SPAN_DURATION = Histogram(
+    'span_duration_seconds', 'Duration of named spans inside views', ('span',), LATENCY_BUCKETS,
+)
+
+HISTOGRAMS = [REQUEST_DURATION, REQUEST_DB_QUERIES, REQUEST_DB_DURATION, REQUEST_SIZE, RESPONSE_SIZE, SPAN_DURATION]
+
+
+class RequestStats:
+    """Counters for the request being measured"""
+    __slots__ = ('start', 'db_queries', 'db_time', 'spans')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.spans = []
+
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def begin_request():
+    """Start measuring a request; returns (stats, token for end_request)"""
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+@contextmanager
+def span(name):
+    """Time a named stage of the current request (a no-op when metrics are off)"""
+    if not metrics_enabled():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        SPAN_DURATION.observe((name,), duration)
+        stats = _current.get()
+        if stats is not None:
+            stats.spans.append((name, duration))
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """``connection.execute_wrappers`` hook counting queries of measured requests"""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def install_db_wrapper(sender, connection, **kwargs):
+    """connection_created receiver adding the wrapper to each new connection"""
+    if db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_execute_wrapper)
+
+
+def server_timing(stats):
+    """Server-Timing header value for a finished request"""
+    entries = [f'db;dur={stats.db_time * 1000:.1f};desc="{stats.db_queries} queries"']
+    entries.extend(f'{name};dur={duration * 1000:.1f}' for name, duration in stats.spans)
+    return ', '.join(entries)
+
+
+def render_metrics():
+    """All histograms in Prometheus text exposition format"""
+    return '\n'.join(histogram.render() for histogram in HISTOGRAMS) + '\n'
+
+
+def reset_metrics():
+    for histogram in HISTOGRAMS:
+        histogram.clear()
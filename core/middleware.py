@@ -0,0 +1,209 @@
+"""Project middleware"""
+import mimetypes
+import os
+import time
+from stat import S_ISREG
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from . import metrics
+from .storage import ENCODINGS, HASHED_NAME_RE
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+class MetricsMiddleware:
+    """
+    Record wall time, DB queries, and request/response bytes per view into
+    the histograms in ``core.metrics``. Removes itself from the stack when
+    ``METRICS_ENABLED`` is off. Works under WSGI and ASGI.
+
+    The ``Server-Timing`` header exposes DB query counts and timings, so it
+    is only sent with ``METRICS_SERVER_TIMING`` or DEBUG on, or to staff.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics.metrics_enabled():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats, token = metrics.begin_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        self.record(request, response, stats)
+        if server_timing_forced() or is_staff(request):
+            response['Server-Timing'] = metrics.server_timing(stats)
+        return response
+
+    async def __acall__(self, request):
+        stats, token = metrics.begin_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        self.record(request, response, stats)
+        # Loading request.user can query the session and user tables
+        if server_timing_forced() or await sync_to_async(is_staff)(request):
+            response['Server-Timing'] = metrics.server_timing(stats)
+        return response
+
+    def record(self, request, response, stats):
+        duration = time.perf_counter() - stats.start
+        match = request.resolver_match
+        # The URL name keeps label cardinality bounded (no ids or paths)
+        view = match.view_name if match else 'unresolved'
+        metrics.REQUEST_DURATION.observe((view, request.method, str(response.status_code)), duration)
+        metrics.REQUEST_DB_QUERIES.observe((view,), stats.db_queries)
+        metrics.REQUEST_DB_DURATION.observe((view,), stats.db_time)
+        try:
+            request_bytes = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            request_bytes = 0
+        metrics.REQUEST_SIZE.observe((view,), request_bytes)
+        if not response.streaming:
+            metrics.RESPONSE_SIZE.observe((view,), len(response.content))
+
+
+def server_timing_forced():
+    return getattr(settings, 'METRICS_SERVER_TIMING', False) or settings.DEBUG
+
+
+def is_staff(request):
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_staff)
+
+
+class StaticFilesMiddleware:
+    """
+    Serve the files ``build_static`` collects into STATIC_ROOT, without
+    needing DEBUG or a separate web server. Picks the ``.br`` or ``.gz``
+    sibling the client accepts (see ``core.storage``); content-hashed names
+    are cached for a year as immutable, anything else revalidates by ETag.
+    Requests for files that are not in STATIC_ROOT fall through to the URL
+    resolver. Disabled with ``STATIC_SERVE_ENABLED = False`` or when
+    STATIC_URL points at another host (a CDN).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        prefix = settings.STATIC_URL or ''
+        if not getattr(settings, 'STATIC_SERVE_ENABLED', True) or not settings.STATIC_ROOT or '://' in prefix:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.root = str(settings.STATIC_ROOT)
+        self.prefix = prefix if prefix.startswith('/') else '/' + prefix
+        # Hashed names never change on disk, so their lookups are kept
+        self.immutable_files = {}
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.serve(request)
+        return response if response is not None else self.get_response(request)
+
+    async def __acall__(self, request):
+        response = self.serve(request)
+        return response if response is not None else await self.get_response(request)
+
+    def serve(self, request):
+        if request.method not in ('GET', 'HEAD') or not request.path_info.startswith(self.prefix):
+            return None
+        name = request.path_info[len(self.prefix):]
+        immutable = bool(HASHED_NAME_RE.search(name))
+        variants = self.immutable_files.get(name) if immutable else None
+        if variants is None:
+            variants = self.find(name)
+            if variants is None:
+                return None
+            if immutable:
+                self.immutable_files[name] = variants
+
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        encoding, path, size, mtime = next(
+            variant for variant in variants if variant[0] is None or variant[0] in accepted
+        )
+        etag = quote_etag(f'{int(mtime):x}-{size:x}' + (f'-{encoding}' if encoding else ''))
+        if immutable:
+            cache_control = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            cache_control = 'public, max-age=0, must-revalidate'
+        response = get_conditional_response(request, etag=etag, last_modified=int(mtime))
+        if response is not None:
+            response['Cache-Control'] = cache_control
+            response['ETag'] = etag
+            return response
+
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/javascript', 'image/svg+xml'):
+            content_type += '; charset=utf-8'
+        response = FileResponse(open(path, 'rb'), content_type=content_type, filename=os.path.basename(name))
+        response['Cache-Control'] = cache_control
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(mtime)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if len(variants) > 1:
+            patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+    def find(self, name):
+        """[(encoding, path, size, mtime), ...] best encoding first, or None if not a collected file"""
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not S_ISREG(stat.st_mode):
+            return None
+        variants = []
+        for suffix, encoding in ENCODINGS.items():
+            try:
+                compressed = os.stat(path + suffix)
+            except OSError:
+                continue
+            variants.append((encoding, path + suffix, compressed.st_size, compressed.st_mtime))
+        variants.append((None, path, stat.st_size, stat.st_mtime))
+        return variants
+
+
+def accepted_encodings(header):
+    """Content codings an Accept-Encoding header allows (q > 0)"""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        q = params.strip().lower()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding)
+    if '*' in accepted:
+        accepted.update(ENCODINGS.values())
+    return accepted
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InsurancePolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('policy_type', models.CharField(choices=[('vehicle', 'Vehicle Insurance'), ('health', 'Health Insurance'), ('property', 'Property Insurance'), ('life', 'Life Insurance')], max_length=20)),
+                ('provider', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('coverage_details', models.JSONField(default=dict)),
+                ('exclusions', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PolicyClause',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clause_number', models.CharField(max_length=50)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('is_covered', models.BooleanField(default=True)),
+                ('conditions', models.TextField(blank=True)),
+                ('policy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='clauses', to='core.insurancepolicy')),
+            ],
+        ),
+    ]
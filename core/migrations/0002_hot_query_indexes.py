@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='policyclause',
+            index=models.Index(condition=models.Q(('is_covered', True)), fields=['policy'], name='clause_policy_covered_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='policyclause',
+            index=models.Index(condition=models.Q(('is_covered', False)), fields=['id'], name='clause_excluded_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='insurancepolicy',
+            index=models.Index(fields=['policy_type', 'provider', 'updated_at'], name='policy_catalogue_idx'),
+        ),
+    ]
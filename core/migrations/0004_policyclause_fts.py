@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# FTS5 index over policy clauses, used by core.search.FTS5ClauseIndex. SQLite
+# builds without FTS5 and other databases skip it and use the in-memory index.
+CREATE_SQL = [
+    'CREATE VIRTUAL TABLE IF NOT EXISTS core_policyclause_fts '
+    'USING fts5(title, description, conditions, policy_id)',
+    # Earlier versions created and filled the table at runtime
+    'DELETE FROM core_policyclause_fts',
+    'INSERT INTO core_policyclause_fts (rowid, title, description, conditions, policy_id) '
+    'SELECT id, title, description, conditions, policy_id FROM core_policyclause',
+    "INSERT INTO core_policyclause_fts (core_policyclause_fts) VALUES ('optimize')",
+]
+DROP_SQL = ['DROP TABLE IF EXISTS core_policyclause_fts']
+
+
+def fts5_available(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+class SQLiteFTS5RunSQL(migrations.RunSQL):
+    """RunSQL that only runs on SQLite builds with FTS5"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if fts5_available(schema_editor.connection):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if fts5_available(schema_editor.connection):
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_policy_catalogue_index'),
+    ]
+
+    operations = [
+        SQLiteFTS5RunSQL(CREATE_SQL, DROP_SQL),
+    ]
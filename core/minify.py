@@ -0,0 +1,167 @@
+"""
+Conservative CSS and JavaScript minifiers for the static build.
+
+Both strip comments and collapse whitespace without parsing the language,
+so they never rename, reorder or rewrite code. Strings, template literals
+and regular expression literals are copied verbatim. The JS minifier keeps
+a newline wherever the source had one unless the previous or next token
+makes it unnecessary (after ``{ ; , ( [``, before ``) ] } , ; .``), so
+automatic semicolon insertion behaves exactly as before. Both are
+idempotent: minifying minified output changes nothing, which matters
+because ``ManifestStaticFilesStorage`` saves each file more than once.
+"""
+import re
+
+WORD = re.compile(r'[\w$\\]')
+
+# After these, a "/" starts a regular expression rather than a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'throw', 'new', 'delete'}
+NEWLINE_AFTER = set('{;,([')
+NEWLINE_BEFORE = set(')]},;.')
+
+# CSS punctuation that never needs surrounding whitespace
+CSS_TIGHT = set('{};,>')
+
+
+def _skip_string(source, i):
+    """Index just past the quoted string or template literal starting at i"""
+    quote, n = source[i], len(source)
+    i += 1
+    depth = 0
+    while i < n:
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if quote == '`':
+            if c == '$' and source.startswith('${', i):
+                depth += 1
+                i += 2
+                continue
+            if depth and c == '{':
+                depth += 1
+            elif depth and c == '}':
+                depth -= 1
+            elif c == '`' and not depth:
+                return i + 1
+        elif c == quote or c == '\n':
+            return i + 1
+        i += 1
+    return n
+
+
+def _skip_regex(source, i):
+    """Index just past the regular expression literal starting at i"""
+    n = len(source)
+    i += 1
+    in_class = False
+    while i < n:
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            while i < n and WORD.match(source[i]):
+                i += 1
+            return i
+        elif c == '\n':
+            return i
+        i += 1
+    return n
+
+
+def _regex_allowed(out):
+    text = ''.join(out[-12:]).rstrip()
+    if not text:
+        return True
+    if text[-1] in REGEX_PRECEDERS:
+        return True
+    word = re.search(r'[\w$]+$', text)
+    return bool(word) and word.group() in REGEX_KEYWORDS
+
+
+def minify_js(source):
+    out = []
+    pending = ''  # whitespace seen since the last token: '', ' ' or '\n'
+    i, n = 0, len(source)
+    while i < n:
+        c = source[i]
+        if c in ' \t\r\n\f\v':
+            start = i
+            while i < n and source[i] in ' \t\r\n\f\v':
+                i += 1
+            pending = '\n' if '\n' in source[start:i] or pending == '\n' else ' '
+            continue
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            if '\n' in source[i:end]:
+                pending = '\n'
+            elif not pending:
+                pending = ' '
+            i = end
+            continue
+
+        if c in '\'"`':
+            end = _skip_string(source, i)
+        elif c == '/' and _regex_allowed(out):
+            end = _skip_regex(source, i)
+        else:
+            end = i + 1
+        token = source[i:end]
+
+        last = out[-1][-1] if out else ''
+        if pending and last:
+            if pending == '\n':
+                if last not in NEWLINE_AFTER and c not in NEWLINE_BEFORE:
+                    out.append('\n')
+            elif (WORD.match(last) and WORD.match(c)) or (last in '+-' and c == last):
+                out.append(' ')
+        pending = ''
+        out.append(token)
+        i = end
+    return ''.join(out) + '\n'
+
+
+def minify_css(source):
+    out = []
+    pending = False
+    i, n = 0, len(source)
+    while i < n:
+        c = source[i]
+        if c in ' \t\r\n\f':
+            while i < n and source[i] in ' \t\r\n\f':
+                i += 1
+            pending = True
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            pending = True
+            continue
+
+        if c in '\'"':
+            end = _skip_string(source, i)
+        else:
+            end = i + 1
+        token = source[i:end]
+
+        last = out[-1][-1] if out else ''
+        if pending and last and last not in CSS_TIGHT and last != ':' and c not in CSS_TIGHT:
+            out.append(' ')
+        pending = False
+        if c == '}' and last == ';':
+            out.pop()
+        out.append(token)
+        i = end
+    return ''.join(out) + '\n'
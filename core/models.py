@@ -18,6 +18,13 @@ class InsurancePolicy(models.Model):
     exclusions = models.JSONField(default=list)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Covers the admin's type / provider filters; the catalogue API
+        # reads the in-memory reference data (core/reference.py)
+        indexes = [
+            models.Index(fields=['policy_type', 'provider', 'updated_at'], name='policy_catalogue_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.provider}"
@@ -31,6 +38,15 @@ class PolicyClause(models.Model):
     description = models.TextField()
     is_covered = models.BooleanField(default=True)
     conditions = models.TextField(blank=True)
+
+    class Meta:
+        # Partial rather than composite: Django renders boolean filters as
+        # bare `is_covered` / `NOT is_covered` terms, which SQLite can only
+        # match against an index built with the same condition
+        indexes = [
+            models.Index(fields=['policy'], condition=models.Q(is_covered=True), name='clause_policy_covered_idx'),
+            models.Index(fields=['id'], condition=models.Q(is_covered=False), name='clause_excluded_idx'),
+        ]
     
     def __str__(self):
         return f"{self.clause_number}: {self.title}"
@@ -0,0 +1,85 @@
+"""
+Registry of hot queries whose plans must stay index-backed.
+
+Apps list their hot queries in a ``hot_queries`` module using the
+``hot_query`` decorator; each registered function returns the QuerySet
+the endpoint or admin page runs. ``python manage.py check_query_plans``
+EXPLAINs every one and fails on full table scans.
+"""
+from collections import namedtuple
+
+from django.db import NotSupportedError, connections
+from django.utils.module_loading import autodiscover_modules
+
+
+HotQuery = namedtuple('HotQuery', ['name', 'build', 'allow_scan'])
+PlanResult = namedtuple('PlanResult', ['query', 'sql', 'plan', 'scans', 'sorts'])
+
+HOT_QUERIES = {}
+
+
+def hot_query(name, allow_scan=None):
+    """
+    Register a function returning a QuerySet as a hot query. ``allow_scan``
+    is the reason a scan is acceptable (e.g. a rowid-ordered scan that
+    stops at the LIMIT); leave it None to forbid full scans.
+    """
+    def register(build):
+        HOT_QUERIES[name] = HotQuery(name, build, allow_scan)
+        return build
+    return register
+
+
+def discover():
+    autodiscover_modules('hot_queries')
+    return HOT_QUERIES
+
+
+def supported(using='default'):
+    """The audit reads SQLite's EXPLAIN QUERY PLAN output and schema tables"""
+    return connections[using].vendor == 'sqlite'
+
+
+def explain(queryset, using='default'):
+    """Return the EXPLAIN QUERY PLAN detail lines for a QuerySet (SQLite)"""
+    connection = connections[using]
+    if not supported(using):
+        raise NotSupportedError(f'Query plan audit supports SQLite only, not {connection.vendor}')
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return sql, [row[-1] for row in cursor.fetchall()]
+
+
+def partial_indexes(using='default'):
+    """Names of partial (``WHERE ...``) indexes in the database"""
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        tables = [row[0] for row in cursor.fetchall()]
+        names = set()
+        for table in tables:
+            cursor.execute(f'PRAGMA index_list("{table}")')
+            # Columns: seq, name, unique, origin, partial
+            names.update(row[1] for row in cursor.fetchall() if row[4])
+    return names
+
+
+def is_full_scan(line, partial):
+    """
+    "SCAN t", "SCAN t USING INDEX i" and covering-index scans visit every
+    row, except that a partial index only holds rows matching its WHERE
+    clause. "SEARCH" is an index range or point lookup.
+    """
+    if not line.startswith('SCAN '):
+        return False
+    words = line.split()
+    return not ('INDEX' in words and words[-1] in partial)
+
+
+def audit(query, using='default', partial=None):
+    if partial is None:
+        partial = partial_indexes(using)
+    sql, plan = explain(query.build(), using=using)
+    scans = [line for line in plan if is_full_scan(line, partial)]
+    sorts = [line for line in plan if line.startswith('USE TEMP B-TREE')]
+    return PlanResult(query, sql, plan, scans, sorts)
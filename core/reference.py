@@ -0,0 +1,138 @@
+"""
+Process-local cache of the reference tables: damage types, insurance
+policies and policy clauses.
+
+``reference_data()`` returns a ``ReferenceData`` snapshot of all three
+tables, loaded with one query each, so the endpoints that only read them
+(damage types, the policy catalogue, clause rows for photo analysis) run
+no queries of their own. A snapshot is never modified; a reload builds a
+new one and swaps the module reference, so a request keeps a consistent
+view even while another thread reloads.
+
+Invalidation: the signal handlers in core/signals.py call
+``bump_reference_version()`` when a save or delete commits. That drops
+this process's snapshot and increments a version key in the
+``REFERENCE_CACHE_ALIAS`` cache. Other workers compare the key with their
+snapshot's version at most every ``REFERENCE_CACHE_CHECK_INTERVAL``
+seconds, so with a shared cache backend they reload within that interval.
+A per-process backend (LocMemCache) cannot carry the bump between
+workers; ``REFERENCE_CACHE_MAX_AGE`` bounds how stale they get.
+
+Snapshots load on first use rather than in ``AppConfig.ready()``: a query
+there would run in every management command, including ``migrate`` on an
+empty database.
+"""
+import hashlib
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+
+from .db import read_alias
+
+VERSION_KEY = 'reference:version'
+CLAUSE_FIELDS = ('id', 'policy_id', 'clause_number', 'title', 'description', 'is_covered')
+
+
+class ReferenceData:
+    """One immutable snapshot of the reference tables (treat every field as read-only)"""
+    __slots__ = (
+        'version', 'loaded_at', 'damage_types', 'policies', 'clauses', 'clauses_by_policy', 'fingerprint',
+    )
+
+    def __init__(self, version, damage_types, policies, clauses):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        # ({'name', 'typically_covered'}, ...) in primary key order
+        self.damage_types = tuple(damage_types)
+        # ({'id', 'name', 'policy_type', 'policy_type_display', 'provider', 'description', 'updated_at'}, ...)
+        # in id order
+        self.policies = tuple(policies)
+        # clause id -> {CLAUSE_FIELDS}
+        self.clauses = {clause['id']: clause for clause in clauses}
+        self.clauses_by_policy = {}
+        for clause in self.clauses.values():
+            self.clauses_by_policy.setdefault(clause['policy_id'], []).append(clause)
+        # The same data gives the same fingerprint in every process, so
+        # ETags built from it stay valid across workers and reloads
+        last_update = max((policy['updated_at'] for policy in self.policies), default=None)
+        self.fingerprint = hashlib.sha1(
+            f"{len(self.policies)}:{len(self.clauses)}:{last_update.isoformat() if last_update else ''}".encode()
+        ).hexdigest()
+
+
+def _cache():
+    return caches[getattr(settings, 'REFERENCE_CACHE_ALIAS', 'default')]
+
+
+def reference_version():
+    version = _cache().get(VERSION_KEY)
+    if version is None:
+        _cache().add(VERSION_KEY, 1, None)
+        version = _cache().get(VERSION_KEY, 1)
+    return version
+
+
+def load_reference_data(version):
+    DamageType = apps.get_model('claims', 'DamageType')
+    InsurancePolicy = apps.get_model('core', 'InsurancePolicy')
+    PolicyClause = apps.get_model('core', 'PolicyClause')
+    alias = read_alias()
+
+    damage_types = DamageType.objects.using(alias).order_by('pk').values('name', 'typically_covered')
+    type_labels = dict(InsurancePolicy.POLICY_TYPES)
+    policies = [
+        dict(policy, policy_type_display=type_labels.get(policy['policy_type'], policy['policy_type']))
+        for policy in InsurancePolicy.objects.using(alias).order_by('id').values(
+            'id', 'name', 'policy_type', 'provider', 'description', 'updated_at',
+        )
+    ]
+    clauses = PolicyClause.objects.using(alias).order_by('id').values(*CLAUSE_FIELDS).iterator(chunk_size=2000)
+    return ReferenceData(version, damage_types, policies, clauses)
+
+
+_snapshot = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def reference_data():
+    """The current snapshot, reloading it if another process changed the tables"""
+    global _snapshot, _checked_at
+    snapshot = _snapshot
+    now = time.monotonic()
+    if snapshot is not None and now - _checked_at < getattr(settings, 'REFERENCE_CACHE_CHECK_INTERVAL', 1.0):
+        return snapshot
+    with _lock:
+        snapshot = _snapshot
+        # Read the version before loading: a bump during the load leaves
+        # this snapshot labelled old, so the next check reloads it
+        version = reference_version()
+        if (snapshot is None or snapshot.version != version
+                or now - snapshot.loaded_at > getattr(settings, 'REFERENCE_CACHE_MAX_AGE', 300)):
+            snapshot = _snapshot = load_reference_data(version)
+        _checked_at = now
+    return snapshot
+
+
+def reset_reference_data():
+    """Forget this process's snapshot so the next call reloads it (used by tests)"""
+    global _snapshot, _checked_at
+    with _lock:
+        _snapshot = None
+        _checked_at = 0.0
+
+
+def bump_reference_version():
+    """Drop the snapshot here and tell other processes to reload theirs"""
+    global _snapshot
+    # Under the lock, so a reload already in progress cannot put its
+    # (possibly older) snapshot back after this
+    with _lock:
+        try:
+            _cache().incr(VERSION_KEY)
+        except ValueError:
+            _cache().set(VERSION_KEY, reference_version() + 1, None)
+        _snapshot = None
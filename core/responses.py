@@ -0,0 +1,135 @@
+"""
+JSON responses with a pluggable encoder.
+
+``dumps`` serializes with orjson when it is installed and with the stdlib
+``json`` module otherwise (``JSON_BACKEND`` = 'auto', 'orjson' or
+'stdlib'). Both backends write compact UTF-8 that parses to the same
+values, and handle the types views return directly:
+
+* datetimes, dates and times as ``isoformat()`` strings
+  (``2024-05-01T09:30:00.123456+00:00``),
+* Decimals and UUIDs as strings, lazy translations as text,
+* ``values()`` / ``values_list()`` querysets, generators and other
+  iterables as arrays, numpy scalars and arrays as numbers.
+
+The bytes can differ in how floats with an exponent are spelled: the
+stdlib writes ``1e16`` as ``1e+16`` and ``1e-07``, orjson as ``1e16`` and
+``1e-7``.
+
+``loads`` parses with orjson when it is installed.
+
+``JsonResponse`` is a drop-in for Django's.
+
+``streaming_content`` adapts a sync generator for StreamingHttpResponse
+under ASGI, where Django would otherwise read it into a list before
+sending anything.
+"""
+import datetime
+import decimal
+import json
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse
+from django.utils.functional import Promise
+
+CONTENT_TYPE = 'application/json'
+
+
+def _default(obj):
+    """Types neither backend serializes by itself"""
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID, Promise)):
+        return str(obj)
+    if hasattr(obj, 'tolist'):
+        # numpy scalars and arrays
+        return obj.tolist()
+    if hasattr(obj, '__iter__') and not isinstance(obj, (str, bytes, dict)):
+        # QuerySets, generators, sets, tuples
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _stdlib_dumps(data):
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _orjson_dumps():
+    import orjson
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(data):
+        return orjson.dumps(data, default=_default, option=options)
+    return dumps
+
+
+BACKENDS = {'orjson': _orjson_dumps, 'stdlib': lambda: _stdlib_dumps}
+_encoders = {}
+
+
+def get_encoder(backend=None):
+    """The dumps function of a backend ('auto' picks orjson when installed)"""
+    backend = backend or getattr(settings, 'JSON_BACKEND', 'auto')
+    encoder = _encoders.get(backend)
+    if encoder is None:
+        if backend == 'auto':
+            try:
+                encoder = _orjson_dumps()
+            except ImportError:
+                encoder = _stdlib_dumps
+        elif backend in BACKENDS:
+            try:
+                encoder = BACKENDS[backend]()
+            except ImportError:
+                raise ImproperlyConfigured(f"JSON_BACKEND = '{backend}' needs the {backend} package")
+        else:
+            raise ImproperlyConfigured(f'Unknown JSON_BACKEND: {backend}')
+        _encoders[backend] = encoder
+    return encoder
+
+
+def dumps(data, backend=None):
+    """Serialize ``data`` to JSON bytes"""
+    return get_encoder(backend)(data)
+
+
+try:
+    from orjson import loads
+except ImportError:
+    loads = json.loads
+
+
+class JsonResponse(HttpResponse):
+    """``django.http.JsonResponse`` serialized with ``dumps``"""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError('In order to allow non-dict objects to be serialized set the safe parameter to False.')
+        kwargs.setdefault('content_type', CONTENT_TYPE)
+        super().__init__(content=dumps(data), **kwargs)
+
+
+async def _aiter_sync(iterator):
+    """Pull each item of a sync iterator in a worker thread"""
+    sentinel = object()
+    try:
+        while (item := await sync_to_async(next)(iterator, sentinel)) is not sentinel:
+            yield item
+    finally:
+        if hasattr(iterator, 'close'):
+            await sync_to_async(iterator.close)()
+
+
+def streaming_content(request, iterable):
+    """
+    ``iterable`` as StreamingHttpResponse content for this request: as is
+    under WSGI, pulled chunk by chunk from a worker thread under ASGI.
+    """
+    if isinstance(request, ASGIRequest):
+        return _aiter_sync(iter(iterable))
+    return iterable
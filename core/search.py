@@ -0,0 +1,238 @@
+"""
+Full-text search over policy clauses.
+
+Clauses are indexed on ``title``, ``description`` and ``conditions`` and
+ranked with BM25 (title hits weigh most). On SQLite builds with FTS5 the
+index is an FTS5 virtual table living next to the clause table (created
+and filled by migration core 0004); anywhere else a pure-Python inverted
+index is kept in process memory. Both are kept
+in sync by the PolicyClause signal handlers in ``core.signals``.
+
+The in-memory fallback is per process: a worker only sees changes saved
+through its own ORM calls until it rebuilds (``rebuild_clause_index``).
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict, namedtuple
+
+from django.conf import settings
+from django.db import connection
+
+from .models import PolicyClause
+from .reference import CLAUSE_FIELDS, reference_data
+
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Relative weight of a hit in each indexed field
+FIELD_WEIGHTS = {'title': 10.0, 'description': 1.0, 'conditions': 2.0}
+
+ClauseHit = namedtuple('ClauseHit', ['clause_id', 'score'])
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class FTS5ClauseIndex:
+    """Clause index backed by an SQLite FTS5 virtual table"""
+    table = 'core_policyclause_fts'
+
+    @classmethod
+    def available(cls):
+        """Whether the migration created the FTS table (it skips builds without FTS5)"""
+        if connection.vendor != 'sqlite':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [cls.table])
+            return cursor.fetchone() is not None
+
+    def _fill(self, cursor):
+        cursor.execute(
+            f'INSERT INTO {self.table} (rowid, title, description, conditions, policy_id) '
+            f'SELECT id, title, description, conditions, policy_id FROM {PolicyClause._meta.db_table}'
+        )
+        cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+
+    def index(self, clause):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [clause.pk])
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, description, conditions, policy_id) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                [clause.pk, clause.title, clause.description, clause.conditions, clause.policy_id],
+            )
+
+    def remove(self, clause_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [clause_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            self._fill(cursor)
+
+    def search(self, query, policy_id=None, limit=10, match_all=True):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # Quote every term so user input can't inject FTS5 query syntax, and
+        # keep text terms off the policy_id column
+        expression = (' AND ' if match_all else ' OR ').join(f'"{term}"' for term in terms)
+        expression = f'{{title description conditions}} : ({expression})'
+        if policy_id is not None:
+            # policy_id is an indexed column so the policy filter narrows the
+            # candidate set before ranking instead of after it
+            expression += f' AND policy_id : "{int(policy_id)}"'
+        weights = ', '.join(str(FIELD_WEIGHTS[field]) for field in ('title', 'description', 'conditions'))
+        sql = (
+            f'SELECT rowid, bm25({self.table}, {weights}, 0.0) AS score FROM {self.table} '
+            f'WHERE {self.table} MATCH %s ORDER BY score LIMIT %s'
+        )
+        params = [expression, limit]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            # FTS5's bm25() is negative, lower is better
+            return [ClauseHit(row[0], -row[1]) for row in cursor.fetchall()]
+
+
+class InvertedClauseIndex:
+    """Pure-Python BM25 inverted index, used when FTS5 is unavailable"""
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = defaultdict(dict)  # term -> {clause_id: weighted tf}
+        self._lengths = {}
+        self._terms = {}
+        self._policies = {}
+        self._total_length = 0.0
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.rebuild()
+
+    def _add(self, clause_id, policy_id, fields):
+        counts = Counter()
+        for field, text in fields.items():
+            for term in tokenize(text or ''):
+                counts[term] += FIELD_WEIGHTS[field]
+        for term, weight in counts.items():
+            self._postings[term][clause_id] = weight
+        length = sum(counts.values())
+        self._lengths[clause_id] = length
+        self._terms[clause_id] = tuple(counts)
+        self._policies[clause_id] = policy_id
+        self._total_length += length
+
+    def _discard(self, clause_id):
+        for term in self._terms.pop(clause_id, ()):
+            postings = self._postings[term]
+            postings.pop(clause_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(clause_id, 0)
+        self._policies.pop(clause_id, None)
+
+    def index(self, clause):
+        with self._lock:
+            self._ensure_loaded()
+            self._discard(clause.pk)
+            self._add(clause.pk, clause.policy_id, {
+                'title': clause.title,
+                'description': clause.description,
+                'conditions': clause.conditions,
+            })
+
+    def remove(self, clause_id):
+        with self._lock:
+            self._ensure_loaded()
+            self._discard(clause_id)
+
+    def rebuild(self):
+        with self._lock:
+            self._postings.clear()
+            self._lengths.clear()
+            self._terms.clear()
+            self._policies.clear()
+            self._total_length = 0.0
+            rows = PolicyClause.objects.values_list(
+                'id', 'policy_id', 'title', 'description', 'conditions'
+            ).iterator(chunk_size=2000)
+            for clause_id, policy_id, title, description, conditions in rows:
+                self._add(clause_id, policy_id, {
+                    'title': title, 'description': description, 'conditions': conditions,
+                })
+            self._loaded = True
+
+    def search(self, query, policy_id=None, limit=10, match_all=True):
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            self._ensure_loaded()
+            postings = [self._postings.get(term, {}) for term in terms]
+            if match_all:
+                if not all(postings):
+                    return []
+                postings.sort(key=len)
+                candidates = set(postings[0]).intersection(*postings[1:])
+            else:
+                candidates = set().union(*postings)
+            if policy_id is not None:
+                candidates = {c for c in candidates if self._policies.get(c) == policy_id}
+
+            total = len(self._lengths)
+            average_length = self._total_length / total if total else 1.0
+            scores = Counter()
+            for term_postings in postings:
+                if not term_postings:
+                    continue
+                idf = math.log1p((total - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+                for clause_id in candidates.intersection(term_postings):
+                    tf = term_postings[clause_id]
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[clause_id] / average_length)
+                    scores[clause_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            return [ClauseHit(clause_id, score) for clause_id, score in scores.most_common(limit)]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_clause_index():
+    """Return the process-wide clause index, choosing the backend on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                backend = getattr(settings, 'CLAUSE_SEARCH_BACKEND', 'auto')
+                if backend == 'fts5' or (backend == 'auto' and FTS5ClauseIndex.available()):
+                    _index = FTS5ClauseIndex()
+                else:
+                    _index = InvertedClauseIndex()
+    return _index
+
+
+def search_clauses(query, policy_id=None, limit=10, match_all=True,
+                   fields=('clause_number', 'title', 'description', 'is_covered')):
+    """Return ranked clause rows (dicts of ``fields``) matching a free-text query"""
+    hits = get_clause_index().search(query, policy_id=policy_id, limit=limit, match_all=match_all)
+    if not hits:
+        return []
+    clauses = reference_data().clauses if set(fields) <= set(CLAUSE_FIELDS) else {}
+    rows = {
+        hit.clause_id: {field: clauses[hit.clause_id][field] for field in fields}
+        for hit in hits if hit.clause_id in clauses
+    }
+    # The index can be ahead of this process's snapshot for up to
+    # REFERENCE_CACHE_CHECK_INTERVAL after another worker's save
+    missing = [hit.clause_id for hit in hits if hit.clause_id not in rows]
+    if missing:
+        for row in PolicyClause.objects.filter(id__in=missing).values('id', *fields):
+            rows[row.pop('id')] = row
+    return [rows[hit.clause_id] for hit in hits if hit.clause_id in rows]
@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .catalogue import bump_catalogue_version
+from .models import InsurancePolicy, PolicyClause
+from .reference import bump_reference_version
+from .search import get_clause_index
+
+
+@receiver(post_save, sender=PolicyClause)
+def index_policy_clause(sender, instance, raw=False, **kwargs):
+    """Keep the clause search index in sync with saved clauses"""
+    if not raw:
+        get_clause_index().index(instance)
+
+
+@receiver(post_delete, sender=PolicyClause)
+def unindex_policy_clause(sender, instance, **kwargs):
+    get_clause_index().remove(instance.pk)
+
+
+@receiver(post_save, sender=PolicyClause)
+@receiver(post_delete, sender=PolicyClause)
+def touch_clause_policy(sender, instance, **kwargs):
+    """A clause change is a change of its policy for catalogue ETags"""
+    InsurancePolicy.objects.filter(pk=instance.policy_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=InsurancePolicy)
+@receiver(post_delete, sender=InsurancePolicy)
+@receiver(post_save, sender=PolicyClause)
+@receiver(post_delete, sender=PolicyClause)
+def invalidate_policy_catalogue(sender, **kwargs):
+    bump_catalogue_version()
+
+
+@receiver(post_save, sender='claims.DamageType')
+@receiver(post_delete, sender='claims.DamageType')
+@receiver(post_save, sender=InsurancePolicy)
+@receiver(post_delete, sender=InsurancePolicy)
+@receiver(post_save, sender=PolicyClause)
+@receiver(post_delete, sender=PolicyClause)
+def invalidate_reference_data(sender, **kwargs):
+    # After commit: a worker reloading earlier would cache the old rows
+    # under the new version
+    transaction.on_commit(bump_reference_version)
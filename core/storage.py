@@ -0,0 +1,122 @@
+"""
+Static files storage: minified, content-hashed and precompressed.
+
+``collectstatic`` (or ``manage.py build_static``) with
+``PrecompressedManifestStaticFilesStorage`` writes, for every collected
+file:
+
+* the original name (``css/style.css``), minified if it is CSS or JS
+  from STATICFILES_DIRS (app files such as the admin's are copied as is),
+* a content-hashed copy (``css/style.1a2b3c4d5e6f.css``) that
+  ``{% static %}`` links to, and
+* ``.gz`` and ``.br`` siblings of each compressible file, kept only when
+  smaller than the file itself. Brotli needs the ``brotli`` (or
+  ``brotlicffi``) package and is skipped without it.
+
+``core.middleware.StaticFilesMiddleware`` serves these with the encoding
+the client accepts. Because the hash changes whenever the content does,
+hashed names are cached by browsers for a year without revalidation.
+"""
+import gzip
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .minify import minify_css, minify_js
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.txt', '.html', '.xml', '.map', '.ico', '.ttf', '.otf'}
+# Suffix -> Content-Encoding of the precompressed siblings, best first
+ENCODINGS = {'.br': 'br', '.gz': 'gzip'}
+# Names collectstatic gave a content hash (style.1a2b3c4d5e6f.css)
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}(\.[^./]+)$')
+
+
+def brotli_module():
+    """The brotli bindings if installed, else None"""
+    try:
+        import brotli
+    except ImportError:
+        try:
+            import brotlicffi as brotli
+        except ImportError:
+            return None
+    return brotli
+
+
+def compress(data, encoding):
+    if encoding == 'gzip':
+        # mtime=0 keeps the output identical between builds
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli_module().compress(data, quality=11)
+
+
+def is_project_asset(name):
+    """Whether ``name`` comes from STATICFILES_DIRS (not an app's bundled, often pre-minified, files)"""
+    if '.min.' in name:
+        return False
+    return bool(finders.get_finder('django.contrib.staticfiles.finders.FileSystemFinder').find(name))
+
+
+def available_encodings():
+    encodings = ['gzip']
+    if getattr(settings, 'STATIC_BROTLI', True) and brotli_module():
+        encodings.insert(0, 'br')
+    return encodings
+
+
+class PrecompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that minifies CSS/JS and writes .gz/.br variants"""
+
+    def minified(self, name, content):
+        """``content`` minified if ``name`` (plain or hashed) is a project CSS/JS file, else unchanged"""
+        minify = MINIFIERS.get(os.path.splitext(name)[1])
+        if not minify or not getattr(settings, 'STATIC_MINIFY', True):
+            return content
+        if not is_project_asset(HASHED_NAME_RE.sub(r'\1', name)):
+            return content
+        content.seek(0)
+        return ContentFile(minify(content.read().decode('utf-8')).encode('utf-8'))
+
+    def file_hash(self, name, content=None):
+        # Hash what is served, so a comment-only edit keeps the old URL
+        if name and content is not None:
+            content = self.minified(name, content)
+        return super().file_hash(name, content)
+
+    def _save(self, name, content):
+        return super()._save(name, self.minified(name, content))
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        encodings = available_encodings()
+        for name in {*paths, *self.hashed_files.values()}:
+            if os.path.splitext(name)[1] not in COMPRESSIBLE:
+                continue
+            with self.open(name) as f:
+                data = f.read()
+            for suffix, encoding in ENCODINGS.items():
+                variant = name + suffix
+                if self.exists(variant):
+                    self.delete(variant)
+                if encoding not in encodings:
+                    continue
+                compressed = compress(data, encoding)
+                if len(compressed) < len(data):
+                    self._save(variant, ContentFile(compressed))
+
+    def url(self, name, force=False):
+        try:
+            return super().url(name, force)
+        except ValueError:
+            if self.hashed_files:
+                raise
+            # Before the first build_static there is no manifest; link the
+            # plain file rather than failing every page that uses {% static %}
+            return self._url(lambda name: name, name, force)
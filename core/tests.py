@@ -0,0 +1,153 @@
+import io
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import metrics
+from .models import InsurancePolicy, PolicyClause
+from .reference import bump_reference_version, reset_reference_data
+from .responses import dumps, loads
+
+
+# The read alias is a second connection, which cannot see a TestCase's
+# uncommitted rows; send its queries to the default one instead
+@override_settings(READ_DATABASE_ALIAS='default')
+class QueryCountTestCase(TestCase):
+    """
+    Base for tests that pin how many queries a page runs. Every page is
+    requested against a small and a larger dataset from ``seed(rows)``, so
+    a count that grows with the data (an N+1) fails. Requests come from a
+    staff user, so API counts include loading the session and user for the
+    Server-Timing check.
+    """
+    ROW_COUNTS = (2, 6)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        reset_reference_data()
+
+    def seed(self, rows):
+        """Replace the page's data with ``rows`` rows; returns the ids its URL needs"""
+        raise NotImplementedError
+
+    def assertPageQueries(self, num, url):
+        for rows in self.ROW_COUNTS:
+            ids = self.seed(rows)
+            # Measure the uncached path: response caches, the reference data
+            # snapshot (bulk_create sends no signals) and content types
+            cache.clear()
+            bump_reference_version()
+            ContentType.objects.clear_cache()
+            with self.subTest(rows=rows), self.assertNumQueries(num):
+                response = self.client.get(url.format(**ids))
+                self.assertEqual(response.status_code, 200)
+
+
+def seed_policies(rows):
+    """``rows`` policies with three clauses each"""
+    PolicyClause.objects.all().delete()
+    InsurancePolicy.objects.all().delete()
+    policies = InsurancePolicy.objects.bulk_create([
+        InsurancePolicy(name=f'Policy {i}', policy_type='vehicle', provider=f'Insurer {i}',
+                        description='', coverage_details={'limit': i}, exclusions=['racing'])
+        for i in range(rows)
+    ])
+    PolicyClause.objects.bulk_create([
+        PolicyClause(policy=policy, clause_number=f'{policy.pk}.{j}', title=f'Clause {j}',
+                     description='', is_covered=j % 2 == 0)
+        for policy in policies for j in range(3)
+    ])
+    return policies
+
+
+class PolicyQueryCountTests(QueryCountTestCase):
+    """Policy admin pages and the policy catalogue run a fixed number of queries"""
+
+    def seed(self, rows):
+        return {'policy_pk': seed_policies(rows)[0].pk}
+
+    def test_admin_policies(self):
+        self.assertPageQueries(6, '/admin/core/insurancepolicy/')
+
+    def test_admin_policy_detail(self):
+        self.assertPageQueries(7, '/admin/core/insurancepolicy/{policy_pk}/change/')
+
+    def test_admin_clauses(self):
+        self.assertPageQueries(6, '/admin/core/policyclause/')
+
+    def test_api_policies(self):
+        self.assertPageQueries(5, '/api/policies/')
+
+    def test_api_policies_with_clauses(self):
+        self.assertPageQueries(5, '/api/policies/?include=clauses')
+
+
+@override_settings(DEBUG=False, METRICS_ENABLED=True, METRICS_SERVER_TIMING=False, READ_DATABASE_ALIAS='default')
+class ServerTimingTests(TestCase):
+    """The Server-Timing header is only sent when allowed"""
+
+    def setUp(self):
+        # Start from no reference snapshot, no cached pages and empty histograms
+        reset_reference_data()
+        cache.clear()
+        metrics.reset_metrics()
+
+    def get(self):
+        return self.client.get('/api/claims/damage-types/')
+
+    def test_hidden_from_anonymous_users(self):
+        self.assertNotIn('Server-Timing', self.get())
+
+    def test_sent_to_staff(self):
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.assertIn('Server-Timing', self.get())
+
+    def test_sent_with_setting_or_debug(self):
+        for flag in ('METRICS_SERVER_TIMING', 'DEBUG'):
+            with self.subTest(flag), self.settings(**{flag: True}):
+                self.assertIn('Server-Timing', self.get())
+
+
+class JsonBackendTests(SimpleTestCase):
+    """The stdlib and orjson backends encode the same values"""
+
+    DATA = {
+        'when': datetime(2024, 5, 1, 9, 30, 0, 123456, tzinfo=timezone.utc),
+        'amount': Decimal('45250.50'), 'name': 'Sita Sharma Nepālī', 'ids': (1, 2, 3),
+        'ratio': 0.1, 'nothing': None,
+    }
+
+    def test_same_bytes(self):
+        self.assertEqual(dumps(self.DATA, 'stdlib'), dumps(self.DATA, 'orjson'))
+
+    def test_exponent_floats_parse_to_the_same_value(self):
+        data = {'big': 1e16, 'small': 1e-7}
+        self.assertEqual(dumps(data, 'stdlib'), b'{"big":1e+16,"small":1e-07}')
+        self.assertEqual(dumps(data, 'orjson'), b'{"big":1e16,"small":1e-7}')
+        self.assertEqual(loads(dumps(data, 'stdlib')), loads(dumps(data, 'orjson')))
+
+
+class QueryPlanAuditTests(TestCase):
+    """check_query_plans audits SQLite and skips other databases"""
+
+    def test_hot_queries_are_index_backed(self):
+        out = io.StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertIn('hot queries are index-backed', out.getvalue())
+
+    def test_other_vendors_are_skipped(self):
+        out = io.StringIO()
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            call_command('check_query_plans', stdout=out)
+        self.assertIn('Skipped', out.getvalue())
@@ -5,4 +5,5 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('about/', views.about, name='about'),
     path('api/policies/', views.api_policies, name='api_policies'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
@@ -1,28 +1,120 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.contrib.admin.views.decorators import staff_member_required
 from django.shortcuts import render
-from django.http import JsonResponse
-from .models import InsurancePolicy
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from .catalogue import cached_page, get_cached, set_cached
+from .metrics import render_metrics
+from .reference import reference_data
+from .responses import JsonResponse, dumps
 
 
+@cached_page
 def home(request):
     """Render the main landing page"""
     return render(request, 'core/home.html')
 
 
+@cached_page
 def about(request):
     """Render the about page"""
     return render(request, 'core/about.html')
 
 
+POLICIES_DEFAULT_LIMIT = 50
+POLICIES_MAX_LIMIT = 200
+
+
 def api_policies(request):
-    """API endpoint to get all policies"""
-    policies = InsurancePolicy.objects.all()
+    """
+    API endpoint to list insurance policies.
+
+    Filters: ``policy_type``, ``provider``. Pagination: ``limit`` with
+    either ``offset`` or the keyset cursor ``after=<last policy id>``.
+    ``include=clauses`` adds each policy's clauses. Responses carry a
+    strong ETag and unchanged catalogues answer ``If-None-Match`` with 304.
+    Reads the in-memory reference data (core/reference.py), not the database.
+    """
+    try:
+        limit = min(int(request.GET.get('limit', POLICIES_DEFAULT_LIMIT)), POLICIES_MAX_LIMIT)
+        offset = int(request.GET.get('offset', 0))
+        after = int(request.GET.get('after', 0))
+    except ValueError:
+        return JsonResponse({'error': 'limit, offset and after must be integers'}, status=400)
+    if limit < 1 or offset < 0 or after < 0:
+        return JsonResponse({'error': 'limit must be >= 1, offset and after >= 0'}, status=400)
+    if offset and after:
+        return JsonResponse({'error': 'Use either offset or after, not both'}, status=400)
+    include_clauses = request.GET.get('include') == 'clauses'
+
+    catalogue = reference_data()
+    policies = catalogue.policies
+    policy_type = request.GET.get('policy_type')
+    if policy_type:
+        policies = [policy for policy in policies if policy['policy_type'] == policy_type]
+    provider = request.GET.get('provider')
+    if provider:
+        policies = [policy for policy in policies if policy['provider'] == provider]
+
+    params = urlencode(sorted({
+        'policy_type': policy_type or '', 'provider': provider or '', 'limit': limit,
+        'offset': offset, 'after': after, 'include': 'clauses' if include_clauses else '',
+    }.items()))
+    etag = quote_etag(hashlib.sha1(f'{catalogue.fingerprint}:{params}'.encode()).hexdigest())
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    content = get_cached(etag)
+    if content is None:
+        content = render_policies(catalogue, policies, limit, offset, after, include_clauses)
+        set_cached(etag, content)
+    response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def render_policies(catalogue, policies, limit, offset, after, include_clauses):
+    """Serialize one page of the (filtered) catalogue policies, in id order, to JSON bytes"""
+    total = len(policies)
+    if after:
+        policies = [policy for policy in policies if policy['id'] > after]
+    page = policies[offset:offset + limit + 1]
+    has_more = len(page) > limit
+    page = page[:limit]
+
     data = []
-    for policy in policies:
-        data.append({
-            'id': policy.id,
-            'name': policy.name,
-            'policy_type': policy.get_policy_type_display(),
-            'provider': policy.provider,
-            'description': policy.description,
-        })
-    return JsonResponse({'policies': data})
+    for policy in page:
+        item = {
+            'id': policy['id'],
+            'name': policy['name'],
+            'policy_type': policy['policy_type_display'],
+            'provider': policy['provider'],
+            'description': policy['description'],
+        }
+        if include_clauses:
+            item['clauses'] = [
+                {
+                    'clause_number': clause['clause_number'],
+                    'title': clause['title'],
+                    'is_covered': clause['is_covered'],
+                }
+                for clause in catalogue.clauses_by_policy.get(policy['id'], ())
+            ]
+        data.append(item)
+    return dumps({
+        'policies': data,
+        'count': total,
+        'has_more': has_more,
+        'next_after': page[-1]['id'] if page else after,
+    })
+
+
+@staff_member_required
+def metrics(request):
+    """Admin-only request metrics in Prometheus text format"""
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
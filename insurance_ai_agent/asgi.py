@@ -0,0 +1,11 @@
+"""
+ASGI config for Insurance AI Agent project.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'insurance_ai_agent.settings')
+
+application = get_asgi_application()
@@ -38,8 +38,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -72,13 +74,45 @@ WSGI_APPLICATION = 'insurance_ai_agent.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Production SQLite tuning: persistent connections, the SQLITE_PRAGMAS below
+# (WAL and friends) and a read-only alias for read-heavy endpoints. Off by
+# default so local setups keep Django's defaults; set DJANGO_SQLITE_TUNING=1
+# in the environment to turn it on.
+SQLITE_TUNING = os.environ.get('DJANGO_SQLITE_TUNING', '').lower() in ('1', 'true', 'yes')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
 }
 
+if SQLITE_TUNING:
+    # Reuse connections across requests, checking them before reuse
+    DATABASES['default'].update(CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=True)
+    # Same file, opened query_only; chat history and the policy catalogue
+    # read through it (core.db.read_alias)
+    DATABASES['readonly'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Ignored (reads use 'default') while that alias is not configured
+READ_DATABASE_ALIAS = 'readonly'
+
+# Applied to every SQLite connection on connect (see core/db.py)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,  # ms
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # KiB
+    'temp_store': 'memory',
+} if SQLITE_TUNING else {}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -120,15 +154,122 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# `python manage.py build_static` collects CSS/JS minified and content-hashed,
+# with .gz/.br copies (brotli needs the brotli package), and
+# core.middleware.StaticFilesMiddleware serves them from STATIC_ROOT with
+# far-future cache headers, in production as well as under DEBUG
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.storage.PrecompressedManifestStaticFilesStorage'},
+}
+STATIC_MINIFY = True
+STATIC_BROTLI = True
+STATIC_SERVE_ENABLED = True
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Damage photo ingestion limits (see claims/imaging.py)
+DAMAGE_IMAGE_MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+DAMAGE_IMAGE_MAX_PIXELS = 40_000_000
+DAMAGE_IMAGE_ANALYSIS_SIZE = 1024
+# Seconds an analyze response's image_token stays valid for submit_claim
+DAMAGE_IMAGE_TOKEN_MAX_AGE = 86400
+
+# Multi-photo analysis (analyze/batch/): photos per request and the number of
+# threads decoding them in parallel
+DAMAGE_BATCH_MAX_IMAGES = 20
+DAMAGE_BATCH_WORKERS = 4
+
+# JSON file overriding the repair rate table in claims/estimates.py (None = built-in rates)
+DAMAGE_RATE_TABLE_PATH = None
+
+# Perceptual-hash cache: photos within this many bits (of 64) of an already
+# analysed photo reuse its analysis
+DAMAGE_PHASH_MAX_DISTANCE = 6
+DAMAGE_PHASH_CACHE_SIZE = 10000
+
+# Background damage analysis (claims.jobs). 'memory' keeps queued jobs in
+# process; 'database' uses the claims table as a durable queue that
+# separate `run_analysis_workers` processes can also drain.
+CLAIMS_ANALYSIS_QUEUE_BACKEND = 'memory'
+CLAIMS_ANALYSIS_WORKERS = 2
+CLAIMS_ANALYSIS_QUEUE_SIZE = 100  # waiting jobs before uploads get 429
+CLAIMS_ANALYSIS_POLL_INTERVAL = 1.0
+CLAIMS_ANALYSIS_LEASE_SECONDS = 300  # a running job older than this is retried
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Policy clause search: 'auto' uses SQLite FTS5 when available and an
+# in-process inverted index otherwise; 'fts5' or 'python' forces one
+CLAUSE_SEARCH_BACKEND = 'auto'
+
+# Chat assistant retrieval index (built with `python manage.py build_chat_index`)
+CHAT_RETRIEVAL_INDEX_PATH = BASE_DIR / 'chat_index.npz'
+CHAT_RETRIEVAL_MIN_CONFIDENCE = 0.4
+CHAT_RETRIEVAL_MIN_SCORE = 1.0
+# Intents matched only through their response text (no keyword in common
+# with the message) need this many distinct matching terms
+CHAT_RETRIEVAL_MIN_TERMS = 2
+
+# Chat response cache: in-process LRU size, plus an optional shared tier
+# (a CACHES alias such as 'default') so workers reuse each other's lookups
+CHAT_RESPONSE_CACHE_SIZE = 1024
+CHAT_RESPONSE_CACHE_ALIAS = None
+CHAT_RESPONSE_CACHE_TIMEOUT = 3600
+
+# Request metrics (latency / DB / size histograms per view, Server-Timing
+# headers), exposed to staff at /metrics/ in Prometheus text format
+METRICS_ENABLED = True
+# Send the Server-Timing header (DB queries and time) on every response;
+# otherwise only with DEBUG on or to staff users
+METRICS_SERVER_TIMING = False
+
+# Chat retention (`manage.py archive_chat_sessions`): sessions idle this
+# long are moved to compressed NDJSON files, 'gzip' or 'zstd' (needs the
+# zstandard package), in batches of CHAT_RETENTION_BATCH_SIZE sessions
+CHAT_RETENTION_DAYS = 90
+CHAT_RETENTION_BATCH_SIZE = 200
+CHAT_ARCHIVE_DIR = BASE_DIR / 'chat_archive'
+CHAT_ARCHIVE_COMPRESSION = 'gzip'
+
+# Policy catalogue API response cache (a CACHES alias); entries are dropped
+# whenever a policy or clause is saved
+POLICY_CACHE_ALIAS = 'default'
+POLICY_CACHE_TIMEOUT = 300
+
+# In-process snapshot of the damage type, policy and clause tables
+# (core/reference.py). Saves bump a version key in this CACHES alias; other
+# workers check it every CHECK_INTERVAL seconds and reload after MAX_AGE
+# regardless (the only refresh when the cache is per-process LocMemCache)
+REFERENCE_CACHE_ALIAS = 'default'
+REFERENCE_CACHE_CHECK_INTERVAL = 1.0
+REFERENCE_CACHE_MAX_AGE = 300
+
+# Full-page cache for home and about (same cache as the policy catalogue,
+# dropped on every policy or clause save)
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_TIMEOUT = 600
+
+# Chat write-behind buffering: queue turns in memory and write them in
+# batches. Faster, but queued turns are lost if the worker crashes; see
+# chat/persistence.py before enabling.
+CHAT_WRITE_BEHIND_ENABLED = False
+CHAT_WRITE_BEHIND_BATCH_SIZE = 100
+CHAT_WRITE_BEHIND_INTERVAL = 1.0
+
+# JSON encoder for API responses (core/responses.py): 'auto' uses orjson
+# when installed, else the stdlib json module; 'orjson' or 'stdlib' forces one
+JSON_BACKEND = 'auto'
+
+# Rows fetched and encoded at a time by the claims export (claims/transfer.py);
+# export memory grows with this, about 8 KB per row
+CLAIMS_EXPORT_CHUNK_SIZE = 2000
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -354,10 +354,11 @@ async function sendMessage() {
     const typingIndicator = addTypingIndicator();
     
     try {
-        const response = await fetch('/api/chat/message/', {
+        const response = await fetch('/api/chat/message/stream/', {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream'
             },
             body: JSON.stringify({
                 session_id: chatSessionId,
@@ -365,16 +366,33 @@ async function sendMessage() {
             })
         });
         
-        const data = await response.json();
+        if (!response.ok || !response.body) {
+            const data = await response.json();
+            throw new Error(data.error || 'Failed to get response');
+        }
         
-        // Remove typing indicator
-        typingIndicator.remove();
+        // Render tokens as they arrive; the typing indicator stays until the first one
+        let botContent = null;
+        let botText = '';
         
-        if (data.success) {
-            chatSessionId = data.session_id;
-            addMessageToChat('bot', data.response);
-        } else {
-            throw new Error(data.error || 'Failed to get response');
+        for await (const event of readServerSentEvents(response)) {
+            if (event.type === 'session') {
+                chatSessionId = event.data.session_id;
+            } else if (event.type === 'token') {
+                if (!botContent) {
+                    typingIndicator.remove();
+                    botContent = addMessageToChat('bot', '');
+                }
+                botText += event.data.delta;
+                botContent.innerHTML = formatMessageContent(botText);
+                chatMessages.scrollTop = chatMessages.scrollHeight;
+            } else if (event.type === 'error') {
+                throw new Error(event.data.error || 'Failed to get response');
+            }
+        }
+        
+        if (!botContent) {
+            throw new Error('Empty response');
         }
     } catch (error) {
         typingIndicator.remove();
@@ -383,6 +401,42 @@ async function sendMessage() {
     }
 }
 
+async function* readServerSentEvents(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let type = 'message';
+            let data = '';
+            frame.split('\n').forEach(line => {
+                if (line.startsWith('event:')) type = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            yield { type, data: data ? JSON.parse(data) : {} };
+        }
+    }
+}
+
+function formatMessageContent(content) {
+    // Convert newlines to HTML
+    const formattedContent = content
+        .replace(/\n\n/g, '</p><p>')
+        .replace(/\n/g, '<br>');
+    
+    return `<p>${formattedContent}</p>`;
+}
+
 function addMessageToChat(type, content) {
     const chatMessages = document.getElementById('chatMessages');
     
@@ -396,12 +450,7 @@ function addMessageToChat(type, content) {
     const contentDiv = document.createElement('div');
     contentDiv.className = 'message-content';
     
-    // Convert newlines to HTML
-    const formattedContent = content
-        .replace(/\n\n/g, '</p><p>')
-        .replace(/\n/g, '<br>');
-    
-    contentDiv.innerHTML = `<p>${formattedContent}</p>`;
+    contentDiv.innerHTML = formatMessageContent(content);
     
     messageDiv.appendChild(avatarDiv);
     messageDiv.appendChild(contentDiv);
@@ -409,6 +458,8 @@ function addMessageToChat(type, content) {
     
     // Scroll to bottom
     chatMessages.scrollTop = chatMessages.scrollHeight;
+    
+    return contentDiv;
 }
 
 function addTypingIndicator() {
@@ -570,6 +621,7 @@ async function submitClaim() {
         claimData.damage_severity = currentAnalysis.analysis.severity;
         claimData.ai_analysis = currentAnalysis.analysis;
         claimData.matched_clauses = currentAnalysis.relevant_clauses;
+        claimData.image_token = currentAnalysis.image_token;
         claimData.eligibility_reason = currentAnalysis.eligibility.reason;
         claimData.status = currentAnalysis.eligibility.eligible === true ? 'eligible' : 
                           currentAnalysis.eligibility.eligible === false ? 'not_eligible' : 'needs_info';